@@ -0,0 +1,24 @@
+"""Micro-benchmark for utils.duration, which runs on every time-based command and autocomplete keystroke.
+
+Run from the repository root: python -m benchmarks.bench_duration
+"""
+import timeit
+
+from utils.duration import format_duration, parse_duration
+
+SAMPLES = ['90', '30m', '1w2d3h', '2 days 4 hours', '1h30m15s', 'PT1H30M', 'P1W2DT12H']
+NUMBER = 100_000
+
+
+def main():
+    for sample in SAMPLES:
+        seconds = timeit.timeit(lambda: parse_duration(sample), number=NUMBER)
+        print(f"parse_duration({sample!r:18}) {seconds / NUMBER * 1e6:6.2f} µs/call")
+
+    delta = parse_duration('1w2d3h4m5s')
+    seconds = timeit.timeit(lambda: format_duration(delta), number=NUMBER)
+    print(f"format_duration{'':13} {seconds / NUMBER * 1e6:6.2f} µs/call")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,12 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 import os
 from dotenv import load_dotenv
 import logging
 import sys
 import asyncio
+from utils.duration import InvalidDuration
 
 # Configure logging
 logging.basicConfig(
@@ -51,12 +53,23 @@ class ModBot(commands.Bot):
         ]
 
     async def setup_hook(self):
+        self.tree.on_error = self.on_app_command_error
         for ext in self.initial_extensions:
             await self.load_extension(ext)
         
         await self.tree.sync()
         print(f"Synced slash commands for {self.user}")
 
+    async def on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        # Invalid option values (e.g. an unparseable duration) are the user's mistake, so tell them why
+        if isinstance(error, InvalidDuration):
+            if interaction.response.is_done():
+                await interaction.followup.send(str(error), ephemeral=True)
+            else:
+                await interaction.response.send_message(str(error), ephemeral=True)
+            return
+        logger.error(f"Error in command {interaction.command.name if interaction.command else None}: {error}", exc_info=error)
+
     async def on_ready(self):
         print(f'{self.user} has connected to Discord!')
         print(f'Serving {len(self.guilds)} guilds')
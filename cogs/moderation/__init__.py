@@ -2,6 +2,8 @@ from discord.ext import commands
 
 async def setup(bot: commands.Bot):
     # Import all moderation cogs
+    from .scheduler import ScheduledActions
+    from .jobs import Jobs
     from .kick import Kick
     from .ban import Ban
     from .unban import Unban
@@ -14,8 +16,14 @@ async def setup(bot: commands.Bot):
     from .softban import Softban
     from .slowmode import Slowmode
     from .nickname import Nickname
+    from .temprole import TempRole
+    from .mass_actions import MassActions
+    from .ban_sync import BanSync
+    from .bulk_roles import BulkRoles
 
-    # Add all cogs to the bot
+    # Add all cogs to the bot (the scheduler and job pool first, so other cogs can register handlers on them)
+    await bot.add_cog(ScheduledActions(bot))
+    await bot.add_cog(Jobs(bot))
     await bot.add_cog(Kick(bot))
     await bot.add_cog(Ban(bot))
     await bot.add_cog(Unban(bot))
@@ -28,3 +36,7 @@ async def setup(bot: commands.Bot):
     await bot.add_cog(Softban(bot))
     await bot.add_cog(Slowmode(bot))
     await bot.add_cog(Nickname(bot))
+    await bot.add_cog(TempRole(bot))
+    await bot.add_cog(MassActions(bot))
+    await bot.add_cog(BanSync(bot))
+    await bot.add_cog(BulkRoles(bot))
@@ -26,6 +26,7 @@ class Ban(commands.Cog):
 
         try:
             await member.ban(reason=reason, delete_message_days=delete_messages)
+            await self.config.add_case(interaction.guild.id, 'ban', member.id, interaction.user.id, reason)
             embed = discord.Embed(
                 title="Member Banned",
                 description=f"{member.mention} has been banned by {interaction.user.mention}",
@@ -0,0 +1,100 @@
+import discord
+from discord.ext import commands, tasks
+import datetime
+from utils.config_manager import ConfigManager
+from utils.metrics import metrics
+from utils.prefix_index import PrefixIndex
+import asyncio
+
+def ban_index_entry(user_id: int, username: str) -> tuple:
+    return user_id, (str(user_id), username), f"{username or 'Unknown user'} ({user_id})"
+
+class BanSync(commands.Cog):
+    """Keeps the ``bans`` mirror table, and an in-memory prefix index of it, in step with each guild's ban list"""
+
+    # Ban entries written per statement during reconciliation (also the REST page size)
+    RECONCILE_BATCH = 1000
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+        # guild_id -> PrefixIndex over banned user IDs and names, built on first use
+        self.indexes = {}
+        self.index_builds = {}
+        self.reconcile.start()
+
+    def cog_unload(self):
+        self.reconcile.cancel()
+
+    def ban_index(self, guild_id: int):
+        """The guild's ban index, or None while it is still being loaded from the mirror"""
+        index = self.indexes.get(guild_id)
+        if index is None and guild_id not in self.index_builds:
+            self.index_builds[guild_id] = asyncio.create_task(self._build_index(guild_id))
+        return index
+
+    async def _build_index(self, guild_id: int):
+        try:
+            rows = await self.config.get_bans(guild_id)
+            self.indexes.setdefault(guild_id, PrefixIndex.build(ban_index_entry(row['user_id'], row['username']) for row in rows))
+        finally:
+            self.index_builds.pop(guild_id, None)
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        try:
+            await self.config.upsert_bans(guild.id, [(user.id, user.name, None)])
+            if guild.id in self.indexes:
+                self.indexes[guild.id].add(*ban_index_entry(user.id, user.name))
+        except Exception as e:
+            print(f"Error in ban mirror on_member_ban: {e}")
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        try:
+            await self.config.remove_ban(guild.id, user.id)
+            if guild.id in self.indexes:
+                self.indexes[guild.id].remove(user.id)
+        except Exception as e:
+            print(f"Error in ban mirror on_member_unban: {e}")
+
+    async def reconcile_guild(self, guild: discord.Guild) -> int:
+        """Page through the guild's full ban list into the mirror and drop entries that are gone"""
+        started = datetime.datetime.now(datetime.timezone.utc)
+        batch = []
+        seen = 0
+        async for entry in guild.bans(limit=None):
+            batch.append((entry.user.id, entry.user.name, entry.reason))
+            if len(batch) >= self.RECONCILE_BATCH:
+                if not await self.config.upsert_bans(guild.id, batch, started):
+                    return seen  # Don't prune after a partial sync
+                seen += len(batch)
+                batch = []
+        if batch and not await self.config.upsert_bans(guild.id, batch, started):
+            return seen
+        seen += len(batch)
+
+        # Rows touched by gateway events during the sync carry a later synced_at and survive
+        await self.config.prune_bans(guild.id, started)
+        # Rebuild the index from the reconciled mirror the next time it is needed
+        self.indexes.pop(guild.id, None)
+        return seen
+
+    @tasks.loop(hours=6)
+    async def reconcile(self):
+        for guild in list(self.bot.guilds):
+            if not guild.me.guild_permissions.ban_members:
+                continue
+            try:
+                with metrics.timer("ban_sync.reconcile"):
+                    await self.reconcile_guild(guild)
+            except Exception as e:
+                print(f"Error reconciling bans for guild {guild.id}: {e}")
+
+    @reconcile.before_loop
+    async def before_reconcile(self):
+        await self.bot.wait_until_ready()
+
+async def setup(bot):
+    await bot.add_cog(BanSync(bot))
@@ -0,0 +1,225 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+from bisect import bisect_right
+from utils.config_manager import ConfigManager
+from utils.jobs import JobCancelled
+from utils.pacing import Pacer, call_paced
+import asyncio
+
+class BulkRoles(commands.Cog):
+    # Members scanned between checkpoints
+    CHUNK = 500
+
+    # Subcommands can't carry their own default permissions, so the group gets manager_command's
+    role = app_commands.Group(
+        name="role",
+        description="Manage roles in bulk",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_channels=True, manage_roles=True)
+    )
+    role_all = app_commands.Group(name="all", description="Add or remove a role for every matching member", parent=role)
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+
+    @property
+    def jobs(self):
+        return self.bot.get_cog("Jobs").manager
+
+    async def cog_load(self):
+        self.jobs.register('role_all', self.run_role_all)
+
+    def cog_unload(self):
+        jobs = self.bot.get_cog("Jobs")
+        if jobs:
+            jobs.manager.unregister('role_all')
+
+    @staticmethod
+    def _matches(member: discord.Member, params: dict) -> bool:
+        if member.bot and not params['include_bots']:
+            return False
+        if params['without_role_id'] and member.get_role(params['without_role_id']):
+            return False
+        return True
+
+    async def run_role_all(self, job):
+        """Job handler: walk matching members in ID order, calling the API only for members whose roles change"""
+        guild = job.guild
+        params = job.params
+        add = params['action'] == 'add'
+        role = guild.get_role(params['role_id'])
+        if role is None:
+            raise RuntimeError("The role no longer exists")
+        if not guild.chunked:
+            await guild.chunk()
+
+        # Walk the smallest member set that can match instead of the whole guild
+        if params['has_role_id']:
+            has_role = guild.get_role(params['has_role_id'])
+            source = has_role.members if has_role else []
+        elif not add:
+            source = role.members
+        else:
+            source = guild.members
+        member_ids = sorted(member.id for member in source)
+
+        state = job.state
+        changed, unchanged, failed = state.get('changed', 0), state.get('unchanged', 0), state.get('failed', 0)
+        pacer = Pacer()
+        reason = params['reason']
+        cancelled = False
+        try:
+            position = bisect_right(member_ids, state.get('last_member_id', 0))
+            for start in range(position, len(member_ids), self.CHUNK):
+                chunk = member_ids[start:start + self.CHUNK]
+                for member_id in chunk:
+                    member = guild.get_member(member_id)
+                    if member is None or not self._matches(member, params):
+                        continue
+                    if (member.get_role(role.id) is not None) == add:
+                        unchanged += 1
+                        continue
+                    try:
+                        if add:
+                            await call_paced(pacer, lambda: member.add_roles(role, reason=reason))
+                        else:
+                            await call_paced(pacer, lambda: member.remove_roles(role, reason=reason))
+                        changed += 1
+                    except discord.HTTPException:
+                        failed += 1
+                await job.checkpoint(
+                    done=start + len(chunk), total=len(member_ids),
+                    last_member_id=chunk[-1], changed=changed, unchanged=unchanged, failed=failed
+                )
+        except JobCancelled:
+            cancelled = True
+
+        log_embed = discord.Embed(
+            description=(
+                f"{'added' if add else 'removed'} {role.mention} {'to' if add else 'from'} {changed} members"
+                f"{' (cancelled)' if cancelled else ''}"
+            ),
+            color=discord.Color.blue(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        log_embed.add_field(name="Already Set", value=str(unchanged))
+        if failed:
+            log_embed.add_field(name="Failed", value=str(failed))
+        log_embed.add_field(name="Reason", value=reason)
+        log_embed.add_field(name="Job", value=f"#{job.id}")
+        moderator = guild.get_member(job.created_by) or self.bot.user
+        log_embed.set_author(
+            name=moderator.display_name,
+            icon_url=moderator.display_avatar.url
+        )
+        await self.config.send_log(guild, log_embed)
+
+        if cancelled:
+            raise JobCancelled()
+
+    async def _start(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        role: discord.Role,
+        has_role: discord.Role,
+        without_role: discord.Role,
+        include_bots: bool,
+        reason: str
+    ):
+        try:
+            guild = interaction.guild
+            if role.is_default() or role.managed:
+                await interaction.response.send_message("That role can't be assigned manually.", ephemeral=True)
+                return
+            if role >= guild.me.top_role:
+                await interaction.response.send_message("That role is above my highest role.", ephemeral=True)
+                return
+            if interaction.user.id != guild.owner_id and role >= interaction.user.top_role:
+                await interaction.response.send_message("You cannot manage this role due to role hierarchy.", ephemeral=True)
+                return
+            if await self.config.get_jobs(guild.id, active_only=True, kinds=['role_all'], limit=1):
+                await interaction.response.send_message("A bulk role update is already running in this server.", ephemeral=True)
+                return
+
+            reason = reason or f"Bulk role {action}"
+            job = await self.jobs.submit(
+                guild.id, 'role_all',
+                {
+                    'action': action,
+                    'role_id': role.id,
+                    'has_role_id': has_role.id if has_role else None,
+                    'without_role_id': without_role.id if without_role else None,
+                    'include_bots': include_bots,
+                    'reason': reason
+                },
+                created_by=interaction.user.id
+            )
+            if job is None:
+                await interaction.response.send_message("Could not start the role update. Please try again.", ephemeral=True)
+                return
+
+            filters = [f"with {has_role.mention}" if has_role else "in the server"]
+            if without_role:
+                filters.append(f"without {without_role.mention}")
+            if not include_bots:
+                filters.append("excluding bots")
+            embed = discord.Embed(
+                title="Bulk Role Update Started",
+                description=(
+                    f"{'Adding' if action == 'add' else 'Removing'} {role.mention} {'to' if action == 'add' else 'from'} "
+                    f"every member {', '.join(filters)} as job `#{job['id']}`. Members who already "
+                    f"{'have' if action == 'add' else 'lack'} the role are skipped."
+                ),
+                color=discord.Color.blue()
+            )
+            embed.add_field(name="Reason", value=reason)
+            await interaction.response.send_message(embed=embed)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @role_all.command(name="add", description="Give a role to every matching member")
+    @app_commands.describe(
+        role="The role to add",
+        has_role="Only members who have this role",
+        without_role="Skip members who have this role",
+        include_bots="Include bot accounts (default false)",
+        reason="Reason for the change"
+    )
+    async def add(
+        self,
+        interaction: discord.Interaction,
+        role: discord.Role,
+        has_role: discord.Role = None,
+        without_role: discord.Role = None,
+        include_bots: bool = False,
+        reason: str = None
+    ):
+        await self._start(interaction, 'add', role, has_role, without_role, include_bots, reason)
+
+    @role_all.command(name="remove", description="Remove a role from every matching member")
+    @app_commands.describe(
+        role="The role to remove",
+        has_role="Only members who have this role",
+        without_role="Skip members who have this role",
+        include_bots="Include bot accounts (default false)",
+        reason="Reason for the change"
+    )
+    async def remove(
+        self,
+        interaction: discord.Interaction,
+        role: discord.Role,
+        has_role: discord.Role = None,
+        without_role: discord.Role = None,
+        include_bots: bool = False,
+        reason: str = None
+    ):
+        await self._start(interaction, 'remove', role, has_role, without_role, include_bots, reason)
+
+async def setup(bot):
+    await bot.add_cog(BulkRoles(bot))
@@ -2,30 +2,139 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import datetime
+from typing import Literal
 from utils.config_manager import ConfigManager
 from utils.command_permissions import mod_command
+from utils.concurrency import run_bounded
+from utils.duration import Duration, format_duration
+from utils.jobs import JobCancelled, JobLeaseLost
+from utils.purge import PurgeFilter, PurgeProgress, extract_ids, purge_channel
+from utils.transcript import TranscriptWriter
 import asyncio
 
+class PurgeView(discord.ui.View):
+    """Cancel button shown on a running purge's progress message"""
+
+    def __init__(self, moderator_id: int, cancel: asyncio.Event):
+        super().__init__(timeout=None)
+        self.moderator_id = moderator_id
+        self.cancel = cancel
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.moderator_id:
+            await interaction.response.send_message("Only the moderator who started this purge can cancel it.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger)
+    async def cancel_purge(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cancel.set()
+        button.disabled = True
+        await interaction.response.edit_message(view=self)
+
 class Clear(commands.Cog):
+    # Messages examined per /purge at most, however sparse the matches are
+    PURGE_MAX_SCAN = 20000
+    # Messages examined per channel by /purgeuser, and channels scanned at once
+    PURGE_USER_MAX_SCAN = 5000
+    PURGE_USER_CONCURRENCY = 5
+    # Seconds between progress message edits
+    PROGRESS_INTERVAL = 3
+
     def __init__(self, bot):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
+        # Channel ids with a /purge in progress
+        self.running = set()
+
+    @property
+    def jobs(self):
+        return self.bot.get_cog("Jobs").manager
+
+    async def cog_load(self):
+        self.jobs.register('purgeuser', self.run_purgeuser)
+
+    def cog_unload(self):
+        jobs = self.bot.get_cog("Jobs")
+        if jobs:
+            jobs.manager.unregister('purgeuser')
+
+    def _purge_embed(self, progress: PurgeProgress, title: str, description: str, finished: bool = False, cancelled: bool = False) -> discord.Embed:
+        status = "Cancelled" if cancelled else "Complete" if finished else "In Progress"
+        embed = discord.Embed(
+            title=f"{title} {status}",
+            description=description,
+            color=discord.Color.blue() if finished else discord.Color.orange(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        embed.add_field(name="Scanned", value=f"{progress.scanned:,}")
+        embed.add_field(name="Deleted", value=f"{progress.deleted:,}")
+        if progress.failed:
+            embed.add_field(name="Failed", value=f"{progress.failed:,}")
+        return embed
+
+    async def send_purge_log(self, guild: discord.Guild, log_embed: discord.Embed, transcript: TranscriptWriter, filename: str):
+        """Send the log entry with the transcript, if one was requested, attached
+
+        A transcript too large for one upload follows in extra log messages, one per part.
+        The transcript's temp files are closed afterwards, whether or not they were sent.
+        """
+        try:
+            files = []
+            if transcript:
+                files = await transcript.close(filename)
+                if len(files) > 1:
+                    log_embed.add_field(name="Transcript", value=f"{len(files)} parts")
+                if transcript.truncated:
+                    log_embed.add_field(
+                        name="Not Recorded",
+                        value=f"{transcript.unrecorded:,} deleted messages are missing from the transcript"
+                    )
+            await self.config.send_log(guild, log_embed, files[0] if files else None)
+            for number, file in enumerate(files[1:], start=2):
+                part_embed = discord.Embed(
+                    description=f"transcript part {number}/{len(files)}: {log_embed.description}",
+                    color=log_embed.color,
+                    timestamp=log_embed.timestamp
+                )
+                if log_embed.author:
+                    part_embed.set_author(name=log_embed.author.name, icon_url=log_embed.author.icon_url)
+                await self.config.send_log(guild, part_embed, file)
+        finally:
+            if transcript:
+                transcript.discard()
+
+    async def track_progress(self, interaction: discord.Interaction, job: asyncio.Task, render):
+        """Edit the interaction response with ``render()`` every few seconds until ``job`` finishes"""
+        while not job.done():
+            await asyncio.wait({job}, timeout=self.PROGRESS_INTERVAL)
+            if not job.done():
+                try:
+                    await interaction.edit_original_response(embed=render())
+                except discord.HTTPException:
+                    pass
+        return await job
 
     @app_commands.command(name="clear", description="Clear a specified number of messages from the channel")
     @app_commands.describe(
         amount="Number of messages to clear (1-100)",
-        reason="Reason for clearing messages"
+        reason="Reason for clearing messages",
+        transcript="Attach a transcript of the deleted messages to the log entry"
     )
     @mod_command()
-    async def clear(self, interaction: discord.Interaction, amount: int, reason: str = None):
+    async def clear(self, interaction: discord.Interaction, amount: int, reason: str = None, transcript: Literal['jsonl', 'html'] = None):
         if amount < 1 or amount > 100:
             await interaction.response.send_message("Please provide a number between 1 and 100.", ephemeral=True)
             return
 
+        writer = None
         try:
             await interaction.response.defer(ephemeral=True)
             deleted = await interaction.channel.purge(limit=amount)
+            if transcript:
+                writer = TranscriptWriter(transcript, f"Messages cleared from #{interaction.channel.name}", interaction.guild.filesize_limit)
+                await writer.write(deleted)
             
             embed = discord.Embed(
                 title="Messages Cleared",
@@ -49,12 +158,262 @@ class Clear(commands.Cog):
                 name=interaction.user.display_name,
                 icon_url=interaction.user.display_avatar.url
             )
-            await self.config.send_log(interaction.guild, log_embed)
+            await self.send_purge_log(interaction.guild, log_embed, writer, f"clear-{interaction.channel.id}")
 
         except discord.Forbidden:
             await interaction.followup.send("I don't have permission to delete messages in this channel.", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+        finally:
+            if writer:
+                writer.discard()
+
+    @app_commands.command(name="purge", description="Delete recent messages that match filters")
+    @app_commands.describe(
+        amount="Maximum number of messages to delete (1-10000)",
+        users="Only messages from these users (mentions or IDs)",
+        bots="Only messages from bots",
+        links="Only messages containing links",
+        attachments="Only messages with attachments",
+        contains="Only messages containing this text",
+        within="Only messages from the last ..., e.g. 30m or 2h",
+        reason="Reason for purging messages",
+        transcript="Attach a transcript of the deleted messages to the log entry"
+    )
+    @mod_command()
+    async def purge(
+        self,
+        interaction: discord.Interaction,
+        amount: app_commands.Range[int, 1, 10000],
+        users: str = None,
+        bots: bool = False,
+        links: bool = False,
+        attachments: bool = False,
+        contains: str = None,
+        within: Duration = None,
+        reason: str = None,
+        transcript: Literal['jsonl', 'html'] = None
+    ):
+        channel = interaction.channel
+        if channel.id in self.running:
+            await interaction.response.send_message("A purge is already running in this channel.", ephemeral=True)
+            return
+
+        self.running.add(channel.id)
+        writer = None
+        try:
+            check = PurgeFilter(extract_ids(users), bots, links, attachments, contains)
+            after = datetime.datetime.now(datetime.timezone.utc) - within if within else None
+            description = f"Purging up to {amount:,} messages in {channel.mention}: {check.describe()}"
+            if within:
+                description += f" from the last {format_duration(within)}"
+
+            progress = PurgeProgress()
+            cancel = asyncio.Event()
+            writer = TranscriptWriter(transcript, f"Messages purged from #{channel.name}", interaction.guild.filesize_limit) if transcript else None
+            view = PurgeView(interaction.user.id, cancel)
+            await interaction.response.send_message(
+                embed=self._purge_embed(progress, "Purge", description), view=view, ephemeral=True
+            )
+
+            job = asyncio.create_task(purge_channel(
+                channel, check, amount,
+                after=after, max_scan=self.PURGE_MAX_SCAN, progress=progress, cancel=cancel,
+                on_deleted=writer.write if writer else None
+            ))
+            error = None
+            try:
+                await self.track_progress(interaction, job, lambda: self._purge_embed(progress, "Purge", description))
+            except discord.Forbidden:
+                error = "I don't have permission to delete messages in this channel."
+            except Exception as e:
+                error = f"An error occurred: {str(e)}"
+
+            view.stop()
+            try:
+                await interaction.edit_original_response(
+                    embed=self._purge_embed(progress, "Purge", description, finished=True, cancelled=cancel.is_set()),
+                    view=None
+                )
+                if error:
+                    await interaction.followup.send(error, ephemeral=True)
+            except discord.HTTPException:
+                # The interaction token expires after 15 minutes; the log entry still records the purge
+                pass
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"purged {progress.deleted} messages in {channel.mention} ({check.describe()})",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            if reason:
+                log_embed.add_field(name="Reason", value=reason)
+            if error:
+                log_embed.add_field(name="Status", value=f"Stopped early: {error}")
+            elif cancel.is_set():
+                log_embed.add_field(name="Status", value="Cancelled")
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.send_purge_log(interaction.guild, log_embed, writer, f"purge-{channel.id}")
+
+        except Exception as e:
+            try:
+                if interaction.response.is_done():
+                    await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+                else:
+                    await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+            except discord.HTTPException:
+                print(f"Error in /purge: {str(e)}")
+        finally:
+            self.running.discard(channel.id)
+            if writer:
+                writer.discard()
+
+    async def run_purgeuser(self, job):
+        """Job handler: purge a user's messages channel by channel, checkpointing after each channel"""
+        guild = job.guild
+        params = job.params
+        state = job.state
+        after = datetime.datetime.fromisoformat(params['after'])
+        me = guild.me
+        channels = [
+            channel for channel in [*guild.text_channels, *guild.voice_channels, *guild.threads]
+            if channel.permissions_for(me).read_message_history and channel.permissions_for(me).manage_messages
+        ]
+        done_ids = set(state.get('done_channels', []))
+        failed_ids = set(state.get('failed_channels', []))
+        check = PurgeFilter([params['user_id']])
+
+        progress = PurgeProgress()
+        progress.scanned = state.get('scanned', 0)
+        progress.deleted = state.get('deleted', 0)
+        progress.failed = state.get('failed', 0)
+        writer = TranscriptWriter(params['transcript'], f"Messages purged from {params['user']}", guild.filesize_limit) if params['transcript'] else None
+        if writer:
+            # The transcript written before a restart was lost with that process
+            writer.unrecorded = progress.deleted
+
+        try:
+            async def purge_one(channel):
+                # Each channel's history scan stops at the ``after`` snowflake
+                try:
+                    await purge_channel(
+                        channel, check, self.PURGE_USER_MAX_SCAN,
+                        after=after, max_scan=self.PURGE_USER_MAX_SCAN, progress=progress, cancel=job.cancelled,
+                        on_deleted=writer.write if writer else None
+                    )
+                except Exception:
+                    failed_ids.add(channel.id)
+                else:
+                    if job.cancelled.is_set():
+                        # Stopped part way through; a resumed job scans the channel again
+                        return
+                    done_ids.add(channel.id)
+                try:
+                    await job.checkpoint(
+                        done=len(done_ids), total=len(channels),
+                        done_channels=sorted(done_ids), failed_channels=sorted(failed_ids),
+                        scanned=progress.scanned, deleted=progress.deleted, failed=progress.failed
+                    )
+                except (JobCancelled, JobLeaseLost):
+                    # job.cancelled is now set, so the other channels stop after their current chunk
+                    pass
+
+            remaining = [channel for channel in channels if channel.id not in done_ids and channel.id not in failed_ids]
+            await run_bounded(remaining, purge_one, self.PURGE_USER_CONCURRENCY)
+            if job.lease_lost:
+                raise JobLeaseLost()
+            cancelled = job.cancelled.is_set()
+
+            case_id = await self.config.add_case(
+                guild.id, 'purgeuser', params['user_id'], job.created_by, params['reason'],
+                {
+                    'deleted': progress.deleted,
+                    'channels': len(done_ids),
+                    'failed_channels': len(failed_ids),
+                    'since': params['after'],
+                    'cancelled': cancelled,
+                    'job_id': job.id
+                }
+            )
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"purged {progress.deleted} messages from <@{params['user_id']}> across {len(done_ids)} channels",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            if params['reason']:
+                log_embed.add_field(name="Reason", value=params['reason'])
+            if failed_ids:
+                log_embed.add_field(name="Failed Channels", value=str(len(failed_ids)))
+            if cancelled:
+                log_embed.add_field(name="Status", value="Cancelled")
+            if case_id:
+                log_embed.add_field(name="Case", value=f"#{case_id}")
+            log_embed.add_field(name="Job", value=f"#{job.id}")
+            moderator = guild.get_member(job.created_by) or self.bot.user
+            log_embed.set_author(
+                name=moderator.display_name,
+                icon_url=moderator.display_avatar.url
+            )
+            await self.send_purge_log(guild, log_embed, writer, f"purgeuser-{params['user_id']}")
+        finally:
+            if writer:
+                writer.discard()
+
+        if cancelled:
+            raise JobCancelled()
+
+    @app_commands.command(name="purgeuser", description="Delete a user's recent messages in every channel")
+    @app_commands.describe(
+        member="The user whose messages to delete",
+        since="How far back to look, e.g. 30m, 6h or 2d (default 1 day)",
+        reason="Reason for purging messages",
+        transcript="Attach a transcript of the deleted messages to the log entry"
+    )
+    @mod_command()
+    async def purgeuser(self, interaction: discord.Interaction, member: discord.User, since: Duration = None, reason: str = None, transcript: Literal['jsonl', 'html'] = None):
+        try:
+            guild = interaction.guild
+            if await self.config.get_jobs(guild.id, active_only=True, kinds=['purgeuser'], limit=1):
+                await interaction.response.send_message("A user purge is already running in this server.", ephemeral=True)
+                return
+
+            since = since or datetime.timedelta(days=1)
+            after = datetime.datetime.now(datetime.timezone.utc) - since
+            job = await self.jobs.submit(
+                guild.id, 'purgeuser',
+                {
+                    'user_id': member.id,
+                    'user': str(member),
+                    'after': after.isoformat(),
+                    'reason': reason,
+                    'transcript': transcript
+                },
+                created_by=interaction.user.id
+            )
+            if job is None:
+                await interaction.response.send_message("Could not start the purge. Please try again.", ephemeral=True)
+                return
+
+            embed = discord.Embed(
+                title="User Purge Started",
+                description=(
+                    f"Purging messages from {member.mention} in the last {format_duration(since)} as job `#{job['id']}`. "
+                    f"The result is posted to the log channel; use `/jobs cancel` to stop it."
+                ),
+                color=discord.Color.blue()
+            )
+            if reason:
+                embed.add_field(name="Reason", value=reason)
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(Clear(bot))
@@ -0,0 +1,104 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+from utils.config_manager import ConfigManager
+from utils.jobs import JobManager
+import asyncio
+
+STATUS_ICONS = {
+    'pending': "⏳",
+    'running': "▶️",
+    'completed': "✅",
+    'cancelled': "⏹️",
+    'failed': "❌"
+}
+
+class Jobs(commands.Cog):
+    """Owns the background job pool; other cogs register their job kinds on it in cog_load."""
+
+    # Subcommands can't carry their own default permissions, so the group gets mod_command's
+    jobs = app_commands.Group(
+        name="jobs",
+        description="View and cancel background moderation jobs",
+        guild_only=True,
+        default_permissions=discord.Permissions(
+            kick_members=True,
+            ban_members=True,
+            manage_messages=True,
+            moderate_members=True
+        )
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+        self.manager = JobManager(bot, self.config)
+        self.manager.start()
+
+    def cog_unload(self):
+        self.manager.stop()
+
+    @staticmethod
+    def _job_line(job: dict) -> str:
+        progress = f"{job['done']}/{job['total']}" if job['total'] is not None else str(job['done'])
+        line = (
+            f"{STATUS_ICONS.get(job['status'], '')} `#{job['id']}` **{job['kind']}** {job['status']} ({progress})"
+            f" • <@{job['created_by']}> {discord.utils.format_dt(job['created_at'], style='R')}"
+        )
+        if job['status'] == 'running' and job['cancel_requested']:
+            line += " • cancelling"
+        if job['error']:
+            line += f"\n> {job['error'][:200]}"
+        return line
+
+    @jobs.command(name="list", description="Show this server's recent background jobs")
+    async def list_jobs(self, interaction: discord.Interaction):
+        try:
+            jobs = await self.config.get_jobs(interaction.guild.id)
+            embed = discord.Embed(
+                title="Background Jobs",
+                description="\n".join(self._job_line(job) for job in jobs) or "No jobs have been run in this server.",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @jobs.command(name="cancel", description="Cancel a pending or running background job")
+    @app_commands.describe(
+        job_id="The ID of the job (see /jobs list)"
+    )
+    async def cancel(self, interaction: discord.Interaction, job_id: int):
+        try:
+            kind = await self.manager.cancel(interaction.guild.id, job_id)
+            if kind is None:
+                await interaction.response.send_message(f"There is no pending or running job `#{job_id}` in this server.", ephemeral=True)
+                return
+
+            embed = discord.Embed(
+                title="Job Cancelled",
+                description=f"Job `#{job_id}` ({kind}) will stop after its current step.",
+                color=discord.Color.orange()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            log_embed = discord.Embed(
+                description=f"cancelled job `#{job_id}` ({kind})",
+                color=discord.Color.orange(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Jobs(bot))
@@ -26,6 +26,7 @@ class Kick(commands.Cog):
 
         try:
             await member.kick(reason=reason)
+            await self.config.add_case(interaction.guild.id, 'kick', member.id, interaction.user.id, reason)
             embed = discord.Embed(
                 title="Member Kicked",
                 description=f"{member.mention} has been kicked by {interaction.user.mention}",
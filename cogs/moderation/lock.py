@@ -4,44 +4,121 @@ from discord.ext import commands
 import datetime
 from utils.config_manager import ConfigManager
 from utils.command_permissions import mod_command
+from utils.duration import Duration, format_duration
+from utils.concurrency import run_bounded
+from utils.pacing import Pacer, call_paced
 import asyncio
 
 class Lock(commands.Cog):
+    # The @everyone permissions a lock denies; their previous values are what gets saved
+    LOCK_PERMISSIONS = (
+        'send_messages',
+        'add_reactions',
+        'create_public_threads',
+        'create_private_threads',
+        'send_messages_in_threads'
+    )
+    LOCKDOWN_CONCURRENCY = 4
+
     def __init__(self, bot):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
-        self.channel_permissions = {}
+        # Guilds with a lockdown or unlockdown in progress
+        self.running = set()
+
+    @property
+    def scheduler(self):
+        return self.bot.get_cog("ScheduledActions").scheduler
+
+    async def cog_load(self):
+        self.scheduler.register('unlock', self.scheduled_unlock)
+
+    def cog_unload(self):
+        scheduled_actions = self.bot.get_cog("ScheduledActions")
+        if scheduled_actions:
+            scheduled_actions.scheduler.unregister('unlock')
+
+    def _snapshot(self, channel: discord.TextChannel) -> dict:
+        overwrite = channel.overwrites_for(channel.guild.default_role)
+        return {perm_name: getattr(overwrite, perm_name) for perm_name in self.LOCK_PERMISSIONS}
+
+    async def _apply_lock(self, channel: discord.TextChannel, reason: str = None):
+        # Only touch the lock permissions; anything else on the overwrite stays as it is
+        everyone_role = channel.guild.default_role
+        overwrite = channel.overwrites_for(everyone_role)
+        overwrite.update(**{perm_name: False for perm_name in self.LOCK_PERMISSIONS})
+        await channel.set_permissions(everyone_role, overwrite=overwrite, reason=reason)
+
+    async def _restore_permissions(self, channel: discord.TextChannel, stored_permissions: dict = None, reason: str = None):
+        everyone_role = channel.guild.default_role
+        overwrite = channel.overwrites_for(everyone_role)
+        if stored_permissions is not None:
+            overwrite.update(**stored_permissions)
+        else:
+            # If no stored permissions, just remove restrictions
+            overwrite.update(**{perm_name: None for perm_name in self.LOCK_PERMISSIONS})
+
+        # An overwrite that only existed for the lock is removed rather than left empty
+        await channel.set_permissions(everyone_role, overwrite=None if overwrite.is_empty() else overwrite, reason=reason)
+
+    async def scheduled_unlock(self, guild: discord.Guild, payload: dict):
+        """Scheduled 'unlock' handler"""
+        channel = guild.get_channel(payload['channel_id'])
+        if not channel:
+            await self.config.remove_channel_locks(guild.id, [payload['channel_id']])
+            return
+
+        # A database error raises here, so the scheduler retries instead of treating the channel as unlocked.
+        # Actions scheduled before snapshots were persisted carry the permissions in the payload
+        permissions = await self.config.get_channel_lock(guild.id, channel.id)
+        if permissions is None:
+            permissions = payload.get('permissions')
+        if permissions is None:
+            return  # Already unlocked
+
+        await self._restore_permissions(channel, permissions)
+        await self.config.remove_channel_locks(guild.id, [channel.id])
+
+        log_embed = discord.Embed(
+            description=f"unlocked {channel.mention} (scheduled)",
+            color=discord.Color.green(),
+            timestamp=datetime.datetime.now()
+        )
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        self.scheduler.logs.add(guild, log_embed)
 
     @app_commands.command(name="lock", description="Lock a channel")
     @app_commands.describe(
         channel="The channel to lock (defaults to current channel)",
-        reason="Reason for locking the channel"
+        reason="Reason for locking the channel",
+        duration="Unlock automatically after this long, e.g. 30m or 2h"
     )
     @mod_command()
-    async def lock(self, interaction: discord.Interaction, channel: discord.TextChannel = None, reason: str = None):
+    async def lock(self, interaction: discord.Interaction, channel: discord.TextChannel = None, reason: str = None, duration: Duration = None):
         try:
             channel = channel or interaction.channel
-            everyone_role = channel.guild.default_role
-
-            # Store current @everyone permissions
-            current_overwrite = channel.overwrites_for(everyone_role)
-            self.channel_permissions[channel.id] = {
-                "send_messages": current_overwrite.send_messages,
-                "add_reactions": current_overwrite.add_reactions,
-                "create_public_threads": current_overwrite.create_public_threads,
-                "create_private_threads": current_overwrite.create_private_threads,
-                "send_messages_in_threads": current_overwrite.send_messages_in_threads
-            }
 
-            # Lock the channel by setting @everyone permissions
-            await channel.set_permissions(everyone_role,
-                send_messages=False,
-                add_reactions=False,
-                create_public_threads=False,
-                create_private_threads=False,
-                send_messages_in_threads=False
-            )
+            # Save current @everyone permissions before changing anything, so they survive a restart
+            if not await self.config.save_channel_locks(channel.guild.id, {channel.id: self._snapshot(channel)}):
+                await interaction.response.send_message("Could not save the channel's current permissions, so it was not locked.", ephemeral=True)
+                return
+
+            await self._apply_lock(channel, reason)
+
+            unlock_at = None
+            if duration:
+                unlock_at = datetime.datetime.now(datetime.timezone.utc) + duration
+                await self.scheduler.schedule(
+                    channel.guild.id,
+                    'unlock',
+                    unlock_at,
+                    {'channel_id': channel.id},
+                    key=f"unlock:{channel.id}"
+                )
             
             # Send confirmation
             embed = discord.Embed(
@@ -52,12 +129,14 @@ class Lock(commands.Cog):
             )
             if reason:
                 embed.add_field(name="Reason", value=reason)
+            if unlock_at:
+                embed.add_field(name="Unlocks", value=discord.utils.format_dt(unlock_at, style='R'))
             
             await interaction.response.send_message(embed=embed)
 
             # Create log embed
             log_embed = discord.Embed(
-                description=f"locked {channel.mention}",
+                description=f"locked {channel.mention}{f' for {format_duration(duration)}' if duration else ''}",
                 color=discord.Color.red(),
                 timestamp=datetime.datetime.now()
             )
@@ -84,31 +163,11 @@ class Lock(commands.Cog):
     async def unlock(self, interaction: discord.Interaction, channel: discord.TextChannel = None, reason: str = None):
         try:
             channel = channel or interaction.channel
-            everyone_role = channel.guild.default_role
-
-            # Restore original @everyone permissions if they exist
-            if channel.id in self.channel_permissions:
-                stored_permissions = self.channel_permissions[channel.id]
-                
-                # Create overwrite object with stored permissions
-                overwrite = discord.PermissionOverwrite()
-                for perm_name, value in stored_permissions.items():
-                    setattr(overwrite, perm_name, value)
-                
-                # Apply the stored permissions
-                await channel.set_permissions(everyone_role, overwrite=overwrite)
-                
-                # Clear stored permissions
-                del self.channel_permissions[channel.id]
-            else:
-                # If no stored permissions, just remove restrictions
-                await channel.set_permissions(everyone_role,
-                    send_messages=None,
-                    add_reactions=None,
-                    create_public_threads=None,
-                    create_private_threads=None,
-                    send_messages_in_threads=None
-                )
+
+            # Restore original @everyone permissions if they exist, then drop the stored copy
+            await self._restore_permissions(channel, await self.config.get_channel_lock(channel.guild.id, channel.id), reason)
+            await self.config.remove_channel_locks(channel.guild.id, [channel.id])
+            await self.scheduler.cancel(f"unlock:{channel.id}")
             
             # Send confirmation
             embed = discord.Embed(
@@ -142,5 +201,148 @@ class Lock(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
+    async def _run_channels(self, channels: list, call) -> list:
+        """Apply ``call(channel)`` to every channel with bounded parallelism; returns the channels that failed"""
+        pacer = Pacer()
+
+        async def worker(channel):
+            await call_paced(pacer, lambda: call(channel))
+
+        results = await run_bounded(channels, worker, self.LOCKDOWN_CONCURRENCY)
+        return [channel for channel, result in results if isinstance(result, Exception)]
+
+    def _lockdown_embed(self, title: str, color: discord.Color, counts: dict) -> discord.Embed:
+        embed = discord.Embed(title=title, color=color, timestamp=datetime.datetime.now())
+        for name, count in counts.items():
+            if count:
+                embed.add_field(name=name, value=str(count))
+        return embed
+
+    @app_commands.command(name="lockdown", description="Lock every text channel in the server or a category")
+    @app_commands.describe(
+        category="Only lock the channels in this category",
+        reason="Reason for the lockdown"
+    )
+    @mod_command()
+    async def lockdown(self, interaction: discord.Interaction, category: discord.CategoryChannel = None, reason: str = None):
+        try:
+            guild = interaction.guild
+            if guild.id in self.running:
+                await interaction.response.send_message("A lockdown or unlockdown is already in progress in this server.", ephemeral=True)
+                return
+
+            self.running.add(guild.id)
+            try:
+                await interaction.response.defer(thinking=True)
+
+                channels = category.text_channels if category else guild.text_channels
+                manageable = [channel for channel in channels if channel.permissions_for(guild.me).manage_roles]
+                # Channels that are already locked keep their original snapshot and are left alone
+                locked = await self.config.get_channel_locks(guild.id)
+                targets = [channel for channel in manageable if channel.id not in locked]
+
+                # Snapshots are saved before any channel changes, so a crash mid-way can still be undone
+                if not await self.config.save_channel_locks(guild.id, {channel.id: self._snapshot(channel) for channel in targets}, lockdown=True):
+                    await interaction.followup.send("Could not save the channels' current permissions, so nothing was locked.", ephemeral=True)
+                    return
+
+                failed = await self._run_channels(targets, lambda channel: self._apply_lock(channel, reason or "Lockdown"))
+                await self.config.remove_channel_locks(guild.id, [channel.id for channel in failed])
+            finally:
+                self.running.discard(guild.id)
+
+            scope = category.mention if category else "the server"
+            counts = {
+                "Locked": len(targets) - len(failed),
+                "Already locked": len(manageable) - len(targets),
+                "No permission": len(channels) - len(manageable),
+                "Failed": len(failed)
+            }
+            embed = self._lockdown_embed("Lockdown Started", discord.Color.red(), counts)
+            embed.description = f"Text channels in {scope} have been locked."
+            if reason:
+                embed.add_field(name="Reason", value=reason, inline=False)
+            await interaction.followup.send(embed=embed)
+
+            log_embed = self._lockdown_embed(None, discord.Color.red(), counts)
+            log_embed.description = f"started a lockdown of {scope}"
+            if reason:
+                log_embed.add_field(name="Reason", value=reason, inline=False)
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(guild, log_embed)
+
+        except Exception as e:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(name="unlockdown", description="Unlock the channels locked by /lockdown")
+    @app_commands.describe(
+        category="Only unlock the channels in this category",
+        reason="Reason for ending the lockdown"
+    )
+    @mod_command()
+    async def unlockdown(self, interaction: discord.Interaction, category: discord.CategoryChannel = None, reason: str = None):
+        try:
+            guild = interaction.guild
+            if guild.id in self.running:
+                await interaction.response.send_message("A lockdown or unlockdown is already in progress in this server.", ephemeral=True)
+                return
+
+            self.running.add(guild.id)
+            try:
+                await interaction.response.defer(thinking=True)
+
+                snapshots = await self.config.get_channel_locks(guild.id, lockdown=True)
+                channels, missing = [], []
+                for channel_id in snapshots:
+                    channel = guild.get_channel(channel_id)
+                    if channel is None:
+                        missing.append(channel_id)
+                    elif not category or channel.category_id == category.id:
+                        channels.append(channel)
+
+                if not channels and not missing:
+                    await interaction.followup.send("There are no channels locked by a lockdown.", ephemeral=True)
+                    return
+
+                failed = await self._run_channels(
+                    channels,
+                    lambda channel: self._restore_permissions(channel, snapshots[channel.id], reason or "Lockdown ended")
+                )
+                # Failed channels keep their snapshot so the unlockdown can be retried
+                restored = [channel.id for channel in channels if channel not in failed]
+                await self.config.remove_channel_locks(guild.id, restored + missing)
+            finally:
+                self.running.discard(guild.id)
+
+            scope = category.mention if category else "the server"
+            counts = {"Unlocked": len(restored), "Failed": len(failed)}
+            embed = self._lockdown_embed("Lockdown Ended", discord.Color.green(), counts)
+            embed.description = f"Locked channels in {scope} have been restored."
+            if reason:
+                embed.add_field(name="Reason", value=reason, inline=False)
+            await interaction.followup.send(embed=embed)
+
+            log_embed = self._lockdown_embed(None, discord.Color.green(), counts)
+            log_embed.description = f"ended the lockdown of {scope}"
+            if reason:
+                log_embed.add_field(name="Reason", value=reason, inline=False)
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(guild, log_embed)
+
+        except Exception as e:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Lock(bot))
@@ -0,0 +1,261 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+import time
+from utils.config_manager import ConfigManager
+from utils.command_permissions import mod_command
+from utils.concurrency import run_bounded
+from utils.jobs import JobCancelled
+from utils.pacing import Pacer, call_paced
+from utils.purge import extract_ids
+import asyncio
+
+class MassActions(commands.Cog):
+    CONCURRENCY = 4
+    MAX_TARGETS = 5000
+    MAX_FILE_BYTES = 1024 * 1024
+    # Targets handled between checkpoints
+    CHUNK = 50
+    # Seconds between progress message edits
+    PROGRESS_INTERVAL = 3
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+
+    @property
+    def jobs(self):
+        return self.bot.get_cog("Jobs").manager
+
+    async def cog_load(self):
+        self.jobs.register('massban', self.run_mass_action)
+        self.jobs.register('masskick', self.run_mass_action)
+
+    def cog_unload(self):
+        jobs = self.bot.get_cog("Jobs")
+        if jobs:
+            jobs.manager.unregister('massban')
+            jobs.manager.unregister('masskick')
+
+    async def collect_ids(self, ids: str, file: discord.Attachment) -> list:
+        """Unique IDs from the inline text and attachment, in the order given"""
+        text = ids or ""
+        if file:
+            if file.size > self.MAX_FILE_BYTES:
+                raise ValueError("The attached file is larger than 1 MB.")
+            text += "\n" + (await file.read()).decode('utf-8', errors='ignore')
+        return extract_ids(text)
+
+    def _can_target(self, interaction: discord.Interaction, user_id: int) -> bool:
+        guild = interaction.guild
+        if user_id in (guild.me.id, interaction.user.id, guild.owner_id):
+            return False
+        member = guild.get_member(user_id)
+        if member is None:
+            return True
+        if member.top_role >= guild.me.top_role:
+            return False
+        return interaction.user.id == guild.owner_id or member.top_role < interaction.user.top_role
+
+    def _progress_embed(self, verb: str, total: int, done: int, failed: int, skipped: int, finished: bool = False, cancelled: bool = False) -> discord.Embed:
+        state = 'Cancelled' if cancelled else 'Complete' if finished else 'In Progress'
+        embed = discord.Embed(
+            title=f"Mass {verb.capitalize()} {state}",
+            description=f"{done + failed}/{total} processed",
+            color=discord.Color.red() if finished else discord.Color.orange(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        embed.add_field(name=verb.capitalize(), value=str(done))
+        embed.add_field(name="Failed", value=str(failed))
+        embed.add_field(name="Skipped", value=str(skipped))
+        return embed
+
+    async def _progress_message(self, interaction: discord.Interaction, embed: discord.Embed):
+        await interaction.response.send_message(embed=embed)
+        message = await interaction.original_response()
+        try:
+            # A channel message can be edited after the 15 minute interaction token expires
+            return await interaction.channel.fetch_message(message.id)
+        except discord.HTTPException:
+            return message
+
+    async def _edit_progress(self, guild: discord.Guild, params: dict, embed: discord.Embed):
+        channel = guild.get_channel_or_thread(params['channel_id'])
+        if channel is None:
+            return
+        try:
+            await channel.get_partial_message(params['message_id']).edit(embed=embed)
+        except discord.HTTPException:
+            pass
+
+    def _call(self, job):
+        guild = job.guild
+        reason = job.params['reason']
+        if job.kind == 'massban':
+            delete_messages = job.params['delete_messages']
+            return lambda user_id: guild.ban(discord.Object(id=user_id), reason=reason, delete_message_days=delete_messages)
+        return lambda user_id: guild.kick(discord.Object(id=user_id), reason=reason)
+
+    async def run_mass_action(self, job):
+        """Job handler: act on the targets in chunks with bounded concurrency, checkpointing after each chunk"""
+        guild = job.guild
+        params = job.params
+        verb = "banned" if job.kind == 'massban' else "kicked"
+        targets = params['user_ids']
+        skipped = params['skipped']
+        call = self._call(job)
+        pacer = Pacer()
+        position = job.state.get('position', 0)
+        failed = job.state.get('failed_ids', [])
+        cancelled = False
+        last_edit = 0
+
+        async def worker(user_id):
+            await call_paced(pacer, lambda: call(user_id))
+
+        try:
+            for start in range(position, len(targets), self.CHUNK):
+                chunk = targets[start:start + self.CHUNK]
+                for user_id, result in await run_bounded(chunk, worker, self.CONCURRENCY):
+                    if isinstance(result, Exception):
+                        failed.append(user_id)
+                position = start + len(chunk)
+                await job.checkpoint(done=position, position=position, failed_ids=failed)
+
+                if time.monotonic() - last_edit >= self.PROGRESS_INTERVAL:
+                    last_edit = time.monotonic()
+                    await self._edit_progress(guild, params, self._progress_embed(verb, len(targets), position - len(failed), len(failed), skipped))
+        except JobCancelled:
+            cancelled = True
+
+        # Everything before the checkpoint was attempted; whatever did not fail went through
+        failed_set = set(failed)
+        done = [user_id for user_id in targets[:position] if user_id not in failed_set]
+        await self._edit_progress(guild, params, self._progress_embed(verb, len(targets), len(done), len(failed), skipped, True, cancelled))
+
+        # One case and one log entry for the whole set
+        case_id = await self.config.add_case(
+            guild.id, job.kind, None, job.created_by, params['reason'],
+            {'user_ids': done, 'failed_ids': failed, 'skipped': skipped, 'job_id': job.id}
+        )
+
+        log_embed = discord.Embed(
+            description=f"{verb} {len(done)} users in one mass action{' (cancelled)' if cancelled else ''}",
+            color=discord.Color.red(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        log_embed.add_field(name="Reason", value=params['reason'])
+        if failed:
+            log_embed.add_field(name="Failed", value=str(len(failed)))
+        if case_id:
+            log_embed.add_field(name="Case", value=f"#{case_id}")
+        log_embed.add_field(name="Job", value=f"#{job.id}")
+        moderator = guild.get_member(job.created_by) or self.bot.user
+        log_embed.set_author(
+            name=moderator.display_name,
+            icon_url=moderator.display_avatar.url
+        )
+        await self.config.send_log(guild, log_embed)
+
+        if cancelled:
+            raise JobCancelled()
+
+    async def _start(self, interaction: discord.Interaction, action: str, targets: list, skipped: int, reason: str, **params):
+        verb = "banned" if action == 'massban' else "kicked"
+        message = await self._progress_message(interaction, self._progress_embed(verb, len(targets), 0, 0, skipped))
+        job = await self.jobs.submit(
+            interaction.guild.id, action,
+            {
+                'user_ids': targets, 'skipped': skipped, 'reason': reason,
+                'channel_id': message.channel.id, 'message_id': message.id, **params
+            },
+            created_by=interaction.user.id, total=len(targets)
+        )
+        if job is None:
+            await interaction.followup.send("Could not queue the mass action. Please try again.", ephemeral=True)
+        else:
+            await interaction.followup.send(f"Running as job `#{job['id']}`; use `/jobs cancel {job['id']}` to stop it.", ephemeral=True)
+
+    async def _is_running(self, guild_id: int) -> bool:
+        return bool(await self.config.get_jobs(guild_id, active_only=True, kinds=['massban', 'masskick'], limit=1))
+
+    @app_commands.command(name="massban", description="Ban many users at once by ID")
+    @app_commands.describe(
+        ids="User IDs separated by spaces, commas or new lines",
+        file="A text file containing user IDs",
+        reason="The reason for the bans",
+        delete_messages="Number of days of messages to delete (0-7)"
+    )
+    @mod_command()
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def massban(self, interaction: discord.Interaction, ids: str = None, file: discord.Attachment = None, reason: str = None, delete_messages: app_commands.Range[int, 0, 7] = 0):
+        try:
+            if await self._is_running(interaction.guild.id):
+                await interaction.response.send_message("A mass action is already running in this server.", ephemeral=True)
+                return
+
+            user_ids = await self.collect_ids(ids, file)
+            if not user_ids:
+                await interaction.response.send_message("No user IDs were found. Provide them inline or as a text file.", ephemeral=True)
+                return
+            if len(user_ids) > self.MAX_TARGETS:
+                await interaction.response.send_message(f"At most {self.MAX_TARGETS} users can be banned at once.", ephemeral=True)
+                return
+
+            # Skip users who are already banned (per the ban mirror), and anyone the moderator or bot may not act on
+            banned = await self.config.get_banned_ids(interaction.guild.id)
+            targets = [user_id for user_id in user_ids if user_id not in banned and self._can_target(interaction, user_id)]
+            reason_text = reason or "Mass ban"
+
+            await self._start(
+                interaction, 'massban', targets, len(user_ids) - len(targets), reason_text,
+                delete_messages=delete_messages
+            )
+
+        except Exception as e:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(name="masskick", description="Kick many members at once by ID")
+    @app_commands.describe(
+        ids="User IDs separated by spaces, commas or new lines",
+        file="A text file containing user IDs",
+        reason="The reason for the kicks"
+    )
+    @mod_command()
+    @app_commands.checks.has_permissions(kick_members=True)
+    async def masskick(self, interaction: discord.Interaction, ids: str = None, file: discord.Attachment = None, reason: str = None):
+        try:
+            if await self._is_running(interaction.guild.id):
+                await interaction.response.send_message("A mass action is already running in this server.", ephemeral=True)
+                return
+
+            user_ids = await self.collect_ids(ids, file)
+            if not user_ids:
+                await interaction.response.send_message("No user IDs were found. Provide them inline or as a text file.", ephemeral=True)
+                return
+            if len(user_ids) > self.MAX_TARGETS:
+                await interaction.response.send_message(f"At most {self.MAX_TARGETS} members can be kicked at once.", ephemeral=True)
+                return
+
+            # Only current members can be kicked
+            targets = [
+                user_id for user_id in user_ids
+                if interaction.guild.get_member(user_id) and self._can_target(interaction, user_id)
+            ]
+            reason_text = reason or "Mass kick"
+
+            await self._start(interaction, 'masskick', targets, len(user_ids) - len(targets), reason_text)
+
+        except Exception as e:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(MassActions(bot))
@@ -2,15 +2,123 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import datetime
+from bisect import bisect_right
 from utils.config_manager import ConfigManager
 from utils.command_permissions import mod_command
+from utils.names import dehoisted_nickname
+from utils.pacing import Pacer, call_paced
 import asyncio
 
 class Nickname(commands.Cog):
+    # Members scanned between checkpoints
+    DEHOIST_CHUNK = 1000
+
     def __init__(self, bot):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
+        # Guilds that dehoist names as members join or change them
+        self.enforced = set()
+        # guild_id -> Pacer for member edits, shared by scans and enforcement
+        self.pacers = {}
+        self.startup = asyncio.create_task(self._load_enforced())
+
+    @property
+    def jobs(self):
+        return self.bot.get_cog("Jobs").manager
+
+    async def cog_load(self):
+        self.jobs.register('dehoist', self.run_dehoist)
+
+    def cog_unload(self):
+        self.startup.cancel()
+        jobs = self.bot.get_cog("Jobs")
+        if jobs:
+            jobs.manager.unregister('dehoist')
+
+    async def _load_enforced(self):
+        await self.bot.wait_until_ready()
+        self.enforced = await self.config.get_dehoist_guilds()
+
+    def _can_edit(self, member: discord.Member) -> bool:
+        guild = member.guild
+        return (
+            member.id != guild.owner_id
+            and member.top_role < guild.me.top_role
+            and guild.me.guild_permissions.manage_nicknames
+        )
+
+    async def dehoist_member(self, member: discord.Member, reason: str) -> bool:
+        """Clean the member's display name; returns whether an edit was made."""
+        nickname = dehoisted_nickname(member.display_name, member.name)
+        if nickname is None or not self._can_edit(member):
+            return False
+        pacer = self.pacers.setdefault(member.guild.id, Pacer())
+        await call_paced(pacer, lambda: member.edit(nick=nickname, reason=reason))
+        return True
+
+    async def run_dehoist(self, job):
+        """Job handler: scan members in ID order from the last checkpointed ID, one chunk at a time."""
+        guild = job.guild
+        if not guild.chunked:
+            await guild.chunk()
+
+        state = job.state
+        scanned, edited, failed = state.get('scanned', 0), state.get('edited', 0), state.get('failed', 0)
+        # Sorted once, so resuming is a bisect and members joining mid-scan don't shift the order
+        member_ids = sorted(member.id for member in guild.members)
+        position = bisect_right(member_ids, state.get('last_member_id', 0))
+        for start in range(position, len(member_ids), self.DEHOIST_CHUNK):
+            chunk = member_ids[start:start + self.DEHOIST_CHUNK]
+            for member_id in chunk:
+                member = guild.get_member(member_id)
+                if member is None:
+                    continue  # Left since the scan started
+                scanned += 1
+                try:
+                    if await self.dehoist_member(member, "Dehoist"):
+                        edited += 1
+                except discord.HTTPException:
+                    failed += 1
+            # Also yields to other tasks, since chunks with nothing to edit never await the API
+            await job.checkpoint(
+                done=start + len(chunk), total=len(member_ids),
+                last_member_id=chunk[-1], scanned=scanned, edited=edited, failed=failed
+            )
+
+        log_embed = discord.Embed(
+            description=f"finished a dehoist scan of {scanned} members",
+            color=discord.Color.blue(),
+            timestamp=datetime.datetime.now()
+        )
+        log_embed.add_field(name="Renamed", value=str(edited))
+        if failed:
+            log_embed.add_field(name="Failed", value=str(failed))
+        log_embed.add_field(name="Started By", value=f"<@{job.created_by}>")
+        log_embed.add_field(name="Job", value=f"#{job.id}")
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        await self.config.send_log(guild, log_embed)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.guild.id not in self.enforced or before.display_name == after.display_name:
+            return
+        try:
+            await self.dehoist_member(after, "Dehoist (enforced)")
+        except Exception as e:
+            print(f"Error enforcing dehoist: {e}")
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.guild.id not in self.enforced:
+            return
+        try:
+            await self.dehoist_member(member, "Dehoist (enforced)")
+        except Exception as e:
+            print(f"Error enforcing dehoist: {e}")
 
     @app_commands.command(name="nickname", description="Change a member's nickname")
     @app_commands.describe(
@@ -61,5 +169,63 @@ class Nickname(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
+    @app_commands.command(name="dehoist", description="Clean hoisted and unreadable names across the server")
+    @app_commands.describe(
+        scan="Scan every member now (default true)",
+        enforce="Keep cleaning names as members join or change them"
+    )
+    @mod_command()
+    async def dehoist(self, interaction: discord.Interaction, scan: bool = True, enforce: bool = None):
+        try:
+            guild = interaction.guild
+            if not scan and enforce is None:
+                await interaction.response.send_message("Nothing to do: run a scan or set enforcement.", ephemeral=True)
+                return
+            if not guild.me.guild_permissions.manage_nicknames:
+                await interaction.response.send_message("I don't have permission to manage nicknames.", ephemeral=True)
+                return
+
+            embed = discord.Embed(title="Dehoist", color=discord.Color.blue())
+            changes = []
+            if enforce is not None:
+                await self.config.set_dehoist_enforced(guild.id, enforce)
+                if enforce:
+                    self.enforced.add(guild.id)
+                else:
+                    self.enforced.discard(guild.id)
+                embed.add_field(name="Enforcement", value="Enabled" if enforce else "Disabled")
+                changes.append(f"{'enabled' if enforce else 'disabled'} dehoist enforcement")
+
+            if scan:
+                if await self.config.get_jobs(guild.id, active_only=True, kinds=['dehoist'], limit=1):
+                    embed.description = "A dehoist scan is already running in this server."
+                else:
+                    job = await self.jobs.submit(guild.id, 'dehoist', {}, created_by=interaction.user.id, total=guild.member_count)
+                    if job is None:
+                        embed.description = "Could not start the dehoist scan. Please try again."
+                    else:
+                        embed.description = (
+                            f"Scanning {guild.member_count} members as job `#{job['id']}`. Only names that actually change "
+                            "are edited; the results will be posted to the log channel."
+                        )
+                        changes.append("started a dehoist scan")
+
+            await interaction.response.send_message(embed=embed)
+
+            if changes:
+                log_embed = discord.Embed(
+                    description=" and ".join(changes),
+                    color=discord.Color.blue(),
+                    timestamp=datetime.datetime.now()
+                )
+                log_embed.set_author(
+                    name=interaction.user.display_name,
+                    icon_url=interaction.user.display_avatar.url
+                )
+                await self.config.send_log(guild, log_embed)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Nickname(bot))
@@ -0,0 +1,20 @@
+from discord.ext import commands
+from utils.config_manager import ConfigManager
+from utils.scheduler import ActionScheduler
+import asyncio
+
+class ScheduledActions(commands.Cog):
+    """Owns the scheduled action engine; other cogs register their handlers on it in cog_load."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+        self.scheduler = ActionScheduler(bot, self.config)
+        self.scheduler.start()
+
+    def cog_unload(self):
+        self.scheduler.stop()
+
+async def setup(bot):
+    await bot.add_cog(ScheduledActions(bot))
@@ -1,9 +1,13 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import datetime
+import time
 from utils.config_manager import ConfigManager
 from utils.command_permissions import mod_command
+from utils.duration import Duration, format_duration
+from utils.log_batcher import LogBatcher
+from utils.message_rate import SlowmodeController
 import asyncio
 
 class Slowmode(commands.Cog):
@@ -11,20 +15,151 @@ class Slowmode(commands.Cog):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
+        # channel_id -> (guild_id, SlowmodeController), only for channels with auto-slowmode on
+        self.auto = {}
+        self.logs = LogBatcher(self.config)
+        self.adjust_auto_slowmode.start()
+
+    @property
+    def scheduler(self):
+        return self.bot.get_cog("ScheduledActions").scheduler
+
+    async def cog_load(self):
+        self.scheduler.register('reset_slowmode', self.reset_slowmode)
+
+    def cog_unload(self):
+        self.adjust_auto_slowmode.cancel()
+        scheduled_actions = self.bot.get_cog("ScheduledActions")
+        if scheduled_actions:
+            scheduled_actions.scheduler.unregister('reset_slowmode')
+
+    async def reset_slowmode(self, guild: discord.Guild, payload: dict):
+        """Scheduled 'reset_slowmode' handler: restore the delay from before a timed slowmode"""
+        channel = guild.get_channel(payload['channel_id'])
+        if not channel:
+            return
+
+        await channel.edit(slowmode_delay=payload['delay'])
+
+        log_embed = discord.Embed(
+            description=f"restored slowmode in {channel.mention} to {payload['delay']} seconds (scheduled)",
+            color=discord.Color.blue(),
+            timestamp=datetime.datetime.now()
+        )
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        self.scheduler.logs.add(guild, log_embed)
+
+    def _evaluate(self, channel: discord.TextChannel, controller: SlowmodeController):
+        if controller.busy:
+            return
+        controller.sync(channel.slowmode_delay)
+        delay = controller.next_delay()
+        if delay is not None:
+            controller.busy = True
+            asyncio.create_task(self._apply_auto_slowmode(channel, controller, delay))
+
+    async def _apply_auto_slowmode(self, channel: discord.TextChannel, controller: SlowmodeController, delay: int):
+        try:
+            rate = controller.rate.rate()
+            await channel.edit(slowmode_delay=delay, reason="Auto-slowmode")
+
+            log_embed = discord.Embed(
+                description=(
+                    f"disabled slowmode in {channel.mention} (auto)" if delay == 0
+                    else f"set slowmode in {channel.mention} to {delay} seconds (auto)"
+                ),
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now()
+            )
+            log_embed.add_field(name="Message Rate", value=f"{rate:.2f}/s")
+            log_embed.set_author(
+                name=self.bot.user.display_name,
+                icon_url=self.bot.user.display_avatar.url
+            )
+            self.logs.add(channel.guild, log_embed)
+        except Exception as e:
+            print(f"Error in auto-slowmode: {e}")
+        finally:
+            # Failed edits wait out the cooldown too, so a missing permission is not retried on every message
+            controller.last_change = time.monotonic()
+            controller.busy = False
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        entry = self.auto.get(message.channel.id)
+        if entry is None or message.author.bot:
+            return
+        controller = entry[1]
+        controller.rate.hit()
+        self._evaluate(message.channel, controller)
+
+    @tasks.loop(seconds=15)
+    async def adjust_auto_slowmode(self):
+        # Quiet channels get no messages to react to, so the delay is lowered from here
+        for channel_id, (guild_id, controller) in list(self.auto.items()):
+            channel = self.bot.get_channel(channel_id)
+            if channel:
+                self._evaluate(channel, controller)
+            elif self._channel_deleted(guild_id):
+                self.auto.pop(channel_id, None)
+                await self.config.remove_auto_slowmode(guild_id, channel_id)
+            elif self.bot.get_guild(guild_id) is None:
+                # The bot left the guild; its settings stay in case it is added back
+                self.auto.pop(channel_id, None)
+        await self.logs.flush()
+
+    def _channel_deleted(self, guild_id: int) -> bool:
+        """Whether a channel missing from the cache was deleted.
+
+        Only a guild this process serves, and that is not in an outage, has a complete channel cache.
+        """
+        guild = self.bot.get_guild(guild_id)
+        return guild is not None and not guild.unavailable
+
+    @adjust_auto_slowmode.before_loop
+    async def before_adjust_auto_slowmode(self):
+        await self.bot.wait_until_ready()
+        for row in await self.config.get_auto_slowmodes():
+            channel = self.bot.get_channel(row['channel_id'])
+            if channel is None:
+                if self._channel_deleted(row['guild_id']):
+                    await self.config.remove_auto_slowmode(row['guild_id'], row['channel_id'])
+            elif row['channel_id'] not in self.auto:
+                self.auto[row['channel_id']] = (row['guild_id'], SlowmodeController(
+                    row['min_delay'], row['max_delay'], row['threshold'], channel.slowmode_delay
+                ))
 
     @app_commands.command(name="slowmode", description="Set the slowmode delay for the current channel")
     @app_commands.describe(
         seconds="Slowmode delay in seconds (0 to disable)",
-        reason="Reason for changing slowmode"
+        reason="Reason for changing slowmode",
+        duration="Restore the previous delay after this long, e.g. 30m or 2h"
     )
     @mod_command()
-    async def slowmode(self, interaction: discord.Interaction, seconds: int, reason: str = None):
+    async def slowmode(self, interaction: discord.Interaction, seconds: int, reason: str = None, duration: Duration = None):
         try:
             if seconds < 0:
                 await interaction.response.send_message("Slowmode delay cannot be negative.", ephemeral=True)
                 return
 
+            previous_delay = interaction.channel.slowmode_delay
             await interaction.channel.edit(slowmode_delay=seconds)
+
+            key = f"slowmode:{interaction.channel.id}"
+            if duration:
+                await self.scheduler.schedule(
+                    interaction.guild.id,
+                    'reset_slowmode',
+                    datetime.datetime.now(datetime.timezone.utc) + duration,
+                    {'channel_id': interaction.channel.id, 'delay': previous_delay},
+                    key=key
+                )
+            else:
+                # A manual change replaces any pending timed slowmode
+                await self.scheduler.cancel(key)
             
             embed = discord.Embed(
                 title="Slowmode Updated",
@@ -33,6 +168,8 @@ class Slowmode(commands.Cog):
             )
             if reason:
                 embed.add_field(name="Reason", value=reason)
+            if duration:
+                embed.add_field(name="Duration", value=format_duration(duration))
             
             await interaction.response.send_message(embed=embed)
 
@@ -55,5 +192,65 @@ class Slowmode(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
+    @app_commands.command(name="autoslowmode", description="Adjust a channel's slowmode automatically from its message rate")
+    @app_commands.describe(
+        enabled="Turn auto-slowmode on or off",
+        channel="The channel to manage (defaults to current channel)",
+        minimum="Lowest delay in seconds (default 0)",
+        maximum="Highest delay in seconds (default 30)",
+        threshold="Messages per second above which the delay is raised (default 1)"
+    )
+    @mod_command()
+    async def autoslowmode(
+        self,
+        interaction: discord.Interaction,
+        enabled: bool,
+        channel: discord.TextChannel = None,
+        minimum: app_commands.Range[int, 0, 21600] = 0,
+        maximum: app_commands.Range[int, 0, 21600] = 30,
+        threshold: app_commands.Range[float, 0.05, 100.0] = 1.0
+    ):
+        try:
+            channel = channel or interaction.channel
+
+            if enabled:
+                if minimum >= maximum:
+                    await interaction.response.send_message("The maximum delay must be greater than the minimum.", ephemeral=True)
+                    return
+                if not await self.config.set_auto_slowmode(interaction.guild.id, channel.id, minimum, maximum, threshold):
+                    await interaction.response.send_message("Could not save the auto-slowmode settings.", ephemeral=True)
+                    return
+                self.auto[channel.id] = (interaction.guild.id, SlowmodeController(minimum, maximum, threshold, channel.slowmode_delay))
+                description = f"Slowmode in {channel.mention} now adjusts between {minimum} and {maximum} seconds, rising above {threshold:g} messages per second."
+                log_description = f"enabled auto-slowmode in {channel.mention} ({minimum}-{maximum} seconds, {threshold:g} messages/s)"
+            else:
+                self.auto.pop(channel.id, None)
+                if not await self.config.remove_auto_slowmode(interaction.guild.id, channel.id):
+                    await interaction.response.send_message(f"Auto-slowmode is not enabled in {channel.mention}.", ephemeral=True)
+                    return
+                description = f"Auto-slowmode in {channel.mention} has been disabled. The current delay is left as it is."
+                log_description = f"disabled auto-slowmode in {channel.mention}"
+
+            embed = discord.Embed(
+                title="Auto-Slowmode Updated",
+                description=description,
+                color=discord.Color.blue()
+            )
+            await interaction.response.send_message(embed=embed)
+
+            log_embed = discord.Embed(
+                description=log_description,
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now()
+            )
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Slowmode(bot))
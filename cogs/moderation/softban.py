@@ -31,6 +31,7 @@ class Softban(commands.Cog):
         try:
             await member.ban(reason=f"Softban: {reason}" if reason else "Softban", delete_message_days=days)
             await member.unban(reason="Softban complete")
+            await self.config.add_case(interaction.guild.id, 'softban', member.id, interaction.user.id, reason, {'delete_message_days': days})
             
             embed = discord.Embed(
                 title="Member Softbanned",
@@ -1,48 +1,86 @@
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 from utils.config_manager import ConfigManager
 from utils.command_permissions import mod_command
 import asyncio
 import datetime
-import re
+from utils.duration import Duration, format_duration
 
 class Tempban(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
-        self.check_tempbans.start()
+        # Expired tempban ids, marked inactive in one statement per scheduler batch
+        self.expired_tempbans = []
+
+    @property
+    def scheduler(self):
+        return self.bot.get_cog("ScheduledActions").scheduler
+
+    async def cog_load(self):
+        self.scheduler.register('unban', self.expire_tempban)
+        self.scheduler.add_flush_hook(self.flush_expired_tempbans)
 
     def cog_unload(self):
-        self.check_tempbans.cancel()
-
-    def parse_time(self, time_str: str) -> datetime.timedelta:
-        """Convert a time string (e.g., '1d', '2h', '30m') to timedelta"""
-        time_units = {
-            's': 'seconds',
-            'm': 'minutes',
-            'h': 'hours',
-            'd': 'days',
-            'w': 'weeks'
-        }
-        
-        match = re.match(r'(\d+)([smhdw])', time_str.lower())
-        if not match:
-            raise ValueError("Invalid time format. Use a number followed by s/m/h/d/w (e.g., 30m, 24h, 7d)")
-        
-        amount = int(match.group(1))
-        unit = time_units[match.group(2)]
-        return datetime.timedelta(**{unit: amount})
+        scheduled_actions = self.bot.get_cog("ScheduledActions")
+        if scheduled_actions:
+            scheduled_actions.scheduler.unregister('unban')
+            scheduled_actions.scheduler.remove_flush_hook(self.flush_expired_tempbans)
+
+    async def flush_expired_tempbans(self):
+        expired, self.expired_tempbans = self.expired_tempbans, []
+        if expired:
+            await self.config.deactivate_tempbans(expired)
+
+    async def apply_tempban(self, member: discord.Member, moderator_id: int, duration: datetime.timedelta, reason: str = None) -> datetime.datetime:
+        """Ban a member, record the tempban and schedule the unban; returns the unban time."""
+        unban_time = datetime.datetime.now(datetime.timezone.utc) + duration
+
+        reason_text = reason or "No reason provided"
+        full_reason = f"{reason_text} (Temporary ban for {format_duration(duration)})"
+
+        # Add to database first
+        tempban_id = await self.config.add_tempban(
+            member.guild.id,
+            member.id,
+            moderator_id,
+            reason_text,
+            unban_time
+        )
+
+        # Ban the user
+        await member.ban(reason=full_reason)
+        await self.config.add_case(
+            member.guild.id, 'tempban', member.id, moderator_id, reason,
+            {'tempban_id': tempban_id, 'unban_time': unban_time.isoformat()}
+        )
+
+        if tempban_id is not None:
+            await self.scheduler.schedule(
+                member.guild.id,
+                'unban',
+                unban_time,
+                {
+                    'tempban_id': tempban_id,
+                    'user_id': member.id,
+                    'reason': reason_text,
+                    'banned_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    'unban_time': unban_time.isoformat()
+                },
+                key=f"tempban:{tempban_id}"
+            )
+        return unban_time
 
     @app_commands.command(name="tempban", description="Temporarily ban a member")
     @app_commands.describe(
         member="The member to temporarily ban",
-        duration="Duration in minutes",
+        duration="How long to ban for, e.g. 30m, 12h, 7d or 1w2d",
         reason="The reason for the ban"
     )
     @mod_command()
-    async def tempban(self, interaction: discord.Interaction, member: discord.Member, duration: int, reason: str = None):
+    async def tempban(self, interaction: discord.Interaction, member: discord.Member, duration: Duration, reason: str = None):
         try:
             # Check role hierarchy
             if member.top_role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
@@ -52,24 +90,7 @@ class Tempban(commands.Cog):
                 )
                 return
 
-            # Parse duration
-            time_delta = datetime.timedelta(minutes=duration)
-            unban_time = datetime.datetime.now(datetime.timezone.utc) + time_delta
-
-            reason_text = reason or "No reason provided"
-            full_reason = f"{reason_text} (Temporary ban for {duration} minutes)"
-
-            # Add to database first
-            await self.config.add_tempban(
-                interaction.guild.id,
-                member.id,
-                interaction.user.id,
-                reason_text,
-                unban_time.strftime('%Y-%m-%dT%H:%M:%S.000+00:00')
-            )
-
-            # Ban the user
-            await member.ban(reason=full_reason)
+            unban_time = await self.apply_tempban(member, interaction.user.id, duration, reason)
 
             # Send confirmation
             embed = discord.Embed(
@@ -78,7 +99,7 @@ class Tempban(commands.Cog):
                 color=discord.Color.red(),
                 timestamp=datetime.datetime.now(datetime.timezone.utc)
             )
-            embed.add_field(name="Duration", value=f"{duration} minutes")
+            embed.add_field(name="Duration", value=format_duration(duration))
             if reason:
                 embed.add_field(name="Reason", value=reason)
             await interaction.response.send_message(embed=embed)
@@ -91,7 +112,7 @@ class Tempban(commands.Cog):
                     color=discord.Color.red(),
                     timestamp=datetime.datetime.now(datetime.timezone.utc)
                 )
-                user_embed.add_field(name="Duration", value=f"{duration} minutes")
+                user_embed.add_field(name="Duration", value=format_duration(duration))
                 if reason:
                     user_embed.add_field(name="Reason", value=reason)
                 await member.send(embed=user_embed)
@@ -100,7 +121,7 @@ class Tempban(commands.Cog):
 
             # Log the ban
             log_embed = discord.Embed(
-                description=f"temporarily banned {member.mention} for {duration} minutes",
+                description=f"temporarily banned {member.mention} for {format_duration(duration)}",
                 color=discord.Color.red(),
                 timestamp=datetime.datetime.now(datetime.timezone.utc)
             )
@@ -116,44 +137,31 @@ class Tempban(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
-    @tasks.loop(minutes=1)
-    async def check_tempbans(self):
-        """Check for expired tempbans and unban users"""
+    async def expire_tempban(self, guild: discord.Guild, payload: dict):
+        """Scheduled 'unban' handler: lift an expired tempban and mark it inactive"""
+        user_id = payload['user_id']
         try:
-            expired_bans = await self.config.get_active_tempbans()
-            
-            for guild_id, user_id, mod_id, reason, unban_time, ban_time in expired_bans:
-                guild = self.bot.get_guild(guild_id)
-                if not guild:
-                    continue
-
-                # Unban the user
-                try:
-                    await guild.unban(discord.Object(id=user_id), reason="Temporary ban expired")
-                    await self.config.deactivate_tempban(guild_id, user_id)
-
-                    # Log the unban
-                    log_embed = discord.Embed(
-                        description=f"{discord.Object(id=user_id).mention} has been automatically unbanned (temporary ban expired)",
-                        color=discord.Color.green(),
-                        timestamp=datetime.datetime.now(datetime.timezone.utc)
-                    )
-                    log_embed.add_field(name="Original Ban Reason", value=reason)
-                    log_embed.add_field(name="Ban Duration", value=f"From {discord.utils.format_dt(ban_time, 'F')} to {discord.utils.format_dt(unban_time, 'F')}")
-                    log_embed.set_author(
-                        name=self.bot.user.display_name,
-                        icon_url=self.bot.user.display_avatar.url
-                    )
-                    await self.config.send_log(guild, log_embed)
-                except:
-                    continue
-
-        except Exception as e:
-            print(f"Error in check_tempbans: {e}")
-
-    @check_tempbans.before_loop
-    async def before_check_tempbans(self):
-        await self.bot.wait_until_ready()
+            await guild.unban(discord.Object(id=user_id), reason="Temporary ban expired")
+        except discord.NotFound:
+            pass  # Already unbanned by hand, or a repeat run of this action
+        if payload.get('tempban_id'):
+            self.expired_tempbans.append(payload['tempban_id'])
+
+        # Log the unban
+        banned_at = datetime.datetime.fromisoformat(payload['banned_at'])
+        unban_time = datetime.datetime.fromisoformat(payload['unban_time'])
+        log_embed = discord.Embed(
+            description=f"<@{user_id}> has been automatically unbanned (temporary ban expired)",
+            color=discord.Color.green(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        log_embed.add_field(name="Original Ban Reason", value=payload['reason'])
+        log_embed.add_field(name="Ban Duration", value=f"From {discord.utils.format_dt(banned_at, 'F')} to {discord.utils.format_dt(unban_time, 'F')}")
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        self.scheduler.logs.add(guild, log_embed)
 
 async def setup(bot):
     await bot.add_cog(Tempban(bot))
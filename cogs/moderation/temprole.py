@@ -0,0 +1,102 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+from utils.config_manager import ConfigManager
+from utils.command_permissions import manager_command
+from utils.duration import Duration, format_duration
+import asyncio
+
+class TempRole(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+
+    @property
+    def scheduler(self):
+        return self.bot.get_cog("ScheduledActions").scheduler
+
+    async def cog_load(self):
+        self.scheduler.register('remove_role', self.remove_temp_role)
+
+    def cog_unload(self):
+        scheduled_actions = self.bot.get_cog("ScheduledActions")
+        if scheduled_actions:
+            scheduled_actions.scheduler.unregister('remove_role')
+
+    @app_commands.command(name="temprole", description="Give a member a role for a limited time")
+    @app_commands.describe(
+        member="The member to give the role to",
+        role="The role to give",
+        duration="How long to keep the role, e.g. 2h, 1d or 1w",
+        reason="Reason for giving the role"
+    )
+    @manager_command()
+    async def temprole(self, interaction: discord.Interaction, member: discord.Member, role: discord.Role, duration: Duration, reason: str = None):
+        if role >= interaction.guild.me.top_role or (role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id):
+            await interaction.response.send_message("You cannot assign this role due to role hierarchy.", ephemeral=True)
+            return
+
+        try:
+            expires_at = datetime.datetime.now(datetime.timezone.utc) + duration
+            await member.add_roles(role, reason=reason)
+            await self.scheduler.schedule(
+                interaction.guild.id,
+                'remove_role',
+                expires_at,
+                {'user_id': member.id, 'role_id': role.id},
+                key=f"temprole:{interaction.guild.id}:{member.id}:{role.id}"
+            )
+
+            embed = discord.Embed(
+                title="Temporary Role Added",
+                description=f"{member.mention} has been given {role.mention} until {discord.utils.format_dt(expires_at, style='F')}",
+                color=discord.Color.blue()
+            )
+            if reason:
+                embed.add_field(name="Reason", value=reason)
+
+            await interaction.response.send_message(embed=embed)
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"gave {member.mention} {role.mention} for {format_duration(duration)}",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now()
+            )
+            if reason:
+                log_embed.add_field(name="Reason", value=reason)
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except discord.Forbidden:
+            await interaction.response.send_message("I don't have permission to manage that role.", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    async def remove_temp_role(self, guild: discord.Guild, payload: dict):
+        """Scheduled 'remove_role' handler"""
+        member = guild.get_member(payload['user_id'])
+        role = guild.get_role(payload['role_id'])
+        if not member or not role or role not in member.roles:
+            return
+
+        await member.remove_roles(role, reason="Temporary role expired")
+
+        log_embed = discord.Embed(
+            description=f"removed expired temporary role {role.mention} from {member.mention}",
+            color=discord.Color.blue(),
+            timestamp=datetime.datetime.now()
+        )
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        self.scheduler.logs.add(guild, log_embed)
+
+async def setup(bot):
+    await bot.add_cog(TempRole(bot))
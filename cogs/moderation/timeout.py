@@ -4,34 +4,83 @@ from discord.ext import commands
 import datetime
 from utils.config_manager import ConfigManager
 from utils.command_permissions import mod_command
+from utils.duration import Duration, format_duration
 import asyncio
 
+# Discord rejects timeouts longer than 28 days, so longer ones are re-applied by the scheduler
+MAX_TIMEOUT = datetime.timedelta(days=28)
+
 class Timeout(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
 
+    @property
+    def scheduler(self):
+        return self.bot.get_cog("ScheduledActions").scheduler
+
+    async def cog_load(self):
+        self.scheduler.register('extend_timeout', self.extend_timeout)
+
+    def cog_unload(self):
+        scheduled_actions = self.bot.get_cog("ScheduledActions")
+        if scheduled_actions:
+            scheduled_actions.scheduler.unregister('extend_timeout')
+
+    async def apply_timeout(self, member: discord.Member, until: datetime.datetime, reason: str = None):
+        """Time a member out until ``until``, scheduling re-application past Discord's 28-day cap."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        key = f"timeout:{member.guild.id}:{member.id}"
+        if until - now <= MAX_TIMEOUT:
+            await member.timeout(until, reason=reason)
+            await self.scheduler.cancel(key)
+            return
+
+        current_end = now + MAX_TIMEOUT
+        await member.timeout(current_end, reason=reason)
+        await self.scheduler.schedule(
+            member.guild.id,
+            'extend_timeout',
+            current_end - datetime.timedelta(minutes=10),
+            {'user_id': member.id, 'until': until.isoformat()},
+            key=key
+        )
+
+    async def extend_timeout(self, guild: discord.Guild, payload: dict):
+        """Scheduled 'extend_timeout' handler: re-apply a timeout that exceeds 28 days"""
+        member = guild.get_member(payload['user_id'])
+        if not member or not member.is_timed_out():
+            return  # Left the server or was unmuted in the meantime
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        until = datetime.datetime.fromisoformat(payload['until'])
+        current_end = min(until, now + MAX_TIMEOUT)
+        await member.timeout(current_end, reason="Extending long timeout")
+        if current_end < until:
+            return current_end - datetime.timedelta(minutes=10)
+
     @app_commands.command(name="timeout", description="Timeout a member")
     @app_commands.describe(
         member="The member to timeout",
-        duration="Duration in minutes",
+        duration="How long, e.g. 10m, 2h or 3d (longer than 28 days is re-applied automatically)",
         reason="The reason for the timeout"
     )
     @mod_command()
     @app_commands.checks.has_permissions(moderate_members=True)
-    async def timeout(self, interaction: discord.Interaction, member: discord.Member, duration: int, reason: str = None):
+    async def timeout(self, interaction: discord.Interaction, member: discord.Member, duration: Duration, reason: str = None):
         if member.top_role >= interaction.user.top_role:
             await interaction.response.send_message("You cannot timeout this user due to role hierarchy.", ephemeral=True)
             return
 
         try:
-            duration_delta = datetime.timedelta(minutes=duration)
-            await member.timeout(duration_delta, reason=reason)
+            until = datetime.datetime.now(datetime.timezone.utc) + duration
+            await self.apply_timeout(member, until, reason=reason)
+            await self.config.add_case(interaction.guild.id, 'timeout', member.id, interaction.user.id, reason, {'until': until.isoformat()})
             
             embed = discord.Embed(
                 title="Member Timed Out",
-                description=f"{member.mention} has been timed out for {duration} minutes by {interaction.user.mention}",
+                description=f"{member.mention} has been timed out for {format_duration(duration)} by {interaction.user.mention}",
                 color=discord.Color.orange()
             )
             if reason:
@@ -41,7 +90,7 @@ class Timeout(commands.Cog):
 
             # Create log embed
             log_embed = discord.Embed(
-                description=f"timed out {member.mention} for {duration} minutes",
+                description=f"timed out {member.mention} for {format_duration(duration)}",
                 color=discord.Color.orange(),
                 timestamp=datetime.datetime.now()
             )
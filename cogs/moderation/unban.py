@@ -21,14 +21,21 @@ class Unban(commands.Cog):
     async def unban(self, interaction: discord.Interaction, user_id: str, reason: str = None):
         try:
             user_id = int(user_id)
-            bans = [ban_entry async for ban_entry in interaction.guild.bans()]
-            user = discord.utils.get(bans, user__id=user_id)
-            
-            if user is None:
+            # One request for this user instead of paging through the whole ban list
+            try:
+                ban_entry = await interaction.guild.fetch_ban(discord.Object(id=user_id))
+            except discord.NotFound:
+                # The mirror was stale; on_member_unban keeps it in sync from here on
+                await self.config.remove_ban(interaction.guild.id, user_id)
+                ban_sync = self.bot.get_cog("BanSync")
+                index = ban_sync.indexes.get(interaction.guild.id) if ban_sync else None
+                if index:
+                    index.remove(user_id)
                 await interaction.response.send_message("This user is not banned.", ephemeral=True)
                 return
 
-            await interaction.guild.unban(user.user, reason=reason)
+            await interaction.guild.unban(ban_entry.user, reason=reason)
+            await self.config.add_case(interaction.guild.id, 'unban', user_id, interaction.user.id, reason)
             embed = discord.Embed(
                 title="User Unbanned",
                 description=f"<@{user_id}> has been unbanned by {interaction.user.mention}",
@@ -60,5 +67,17 @@ class Unban(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
+    @unban.autocomplete('user_id')
+    async def unban_user_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        # Served from memory; the first call in a guild starts loading the index and suggests nothing yet
+        ban_sync = self.bot.get_cog("BanSync")
+        index = ban_sync.ban_index(interaction.guild.id) if ban_sync else None
+        if index is None:
+            return []
+        return [
+            app_commands.Choice(name=label[:100], value=str(user_id))
+            for user_id, label in index.search(current.strip())
+        ]
+
 async def setup(bot):
     await bot.add_cog(Unban(bot))
@@ -29,6 +29,9 @@ class Unmute(commands.Cog):
                 return
 
             await member.timeout(None, reason=reason)
+            await self.config.add_case(interaction.guild.id, 'unmute', member.id, interaction.user.id, reason)
+            # Stop any scheduled re-application of a timeout longer than 28 days
+            await self.bot.get_cog("ScheduledActions").scheduler.cancel(f"timeout:{interaction.guild.id}:{member.id}")
             
             embed = discord.Embed(
                 title="Member Unmuted",
@@ -3,14 +3,213 @@ from discord import app_commands
 from discord.ext import commands
 import datetime
 from utils.config_manager import ConfigManager
-from utils.command_permissions import mod_command
+from utils.command_permissions import mod_command, admin_command
+from utils.duration import DurationTransformer, format_duration
+from utils.metrics import metrics
+from utils.prefix_index import PrefixIndex
 import asyncio
+import math
+from typing import Literal
+
+class WarningsView(discord.ui.View):
+    """Pages through a member's warnings, fetching each page from the database when it is first shown"""
+
+    PAGE_SIZE = 10
+    # Keeps ten fields well inside the 6,000 character embed limit
+    MAX_REASON = 300
+
+    def __init__(self, config, interaction: discord.Interaction, member: discord.Member, total: int):
+        super().__init__(timeout=180)
+        self.config = config
+        self.interaction = interaction
+        self.member = member
+        self.total = total
+        self.page_count = math.ceil(total / self.PAGE_SIZE)
+        self.page = 0
+        # pages[i] holds the rows of page i once fetched; page i + 1 starts after the last row of page i
+        self.pages = []
+
+    async def fetch_page(self, page: int) -> list:
+        while len(self.pages) <= page:
+            last = self.pages[-1][-1] if self.pages else None
+            rows = await self.config.get_warnings_page(
+                self.interaction.guild.id,
+                self.member.id,
+                self.PAGE_SIZE,
+                (last['timestamp'], last['id']) if last else None
+            )
+            self.pages.append(rows)
+            if not rows:
+                break
+        return self.pages[page] if page < len(self.pages) else []
+
+    async def render(self) -> discord.Embed:
+        rows = await self.fetch_page(self.page)
+        embed = discord.Embed(
+            title=f"Warnings for {self.member.display_name}",
+            description=f"Total Warnings: {self.total}",
+            color=discord.Color.yellow(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        embed.set_thumbnail(url=self.member.display_avatar.url)
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count}")
+
+        for warning_id, mod_id, reason, timestamp in rows:
+            moderator = self.interaction.guild.get_member(mod_id)
+            mod_name = moderator.mention if moderator else "Unknown Moderator"
+
+            if reason and len(reason) > self.MAX_REASON:
+                reason = reason[:self.MAX_REASON - 1] + "…"
+
+            time_formatted = discord.utils.format_dt(timestamp, style='F')
+            time_relative = discord.utils.format_dt(timestamp, style='R')
+
+            embed.add_field(
+                name=f"Warning #{warning_id}",
+                value=f"**Reason:** {reason}\n**Moderator:** {mod_name}\n**When:** {time_formatted} ({time_relative})",
+                inline=False
+            )
+
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.interaction.user.id:
+            await interaction.response.send_message("Only the moderator who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.interaction.edit_original_response(view=self)
+        except discord.HTTPException:
+            pass
+
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(self.page_count - 1, self.page + 1)
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
+def warning_index_entry(warning_id: int, reason: str) -> tuple:
+    return warning_id, (str(warning_id),), f"#{warning_id} · {reason or 'No reason provided'}"
 
 class Warn(commands.Cog):
+    # Warnings moved per compaction transaction, and transactions per scheduled run
+    COMPACTION_BATCH = 500
+    COMPACTION_BATCHES = 20
+    COMPACTION_INTERVAL = datetime.timedelta(hours=6)
+
     def __init__(self, bot):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
+        # guild_id -> {user_id: PrefixIndex of warning IDs}, built on first autocomplete
+        self.warning_indexes = {}
+        self.index_builds = {}
+
+    @property
+    def scheduler(self):
+        return self.bot.get_cog("ScheduledActions").scheduler
+
+    async def cog_load(self):
+        self.scheduler.register('compact_warnings', self.compact_warnings)
+
+    def cog_unload(self):
+        scheduled_actions = self.bot.get_cog("ScheduledActions")
+        if scheduled_actions:
+            scheduled_actions.scheduler.unregister('compact_warnings')
+
+    async def compact_warnings(self, guild: discord.Guild, payload: dict):
+        """Scheduled 'compact_warnings' handler: archive the guild's expired warnings in small batches"""
+        config = await self.config.get_guild_config(guild.id)
+        expiry_days = config['warning_expiry_days'] if config else 0
+        if not expiry_days:
+            return  # Expiry was turned off
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        before = now - datetime.timedelta(days=expiry_days)
+        for _ in range(self.COMPACTION_BATCHES):
+            moved = await self.config.archive_warnings(guild.id, before, self.COMPACTION_BATCH)
+            metrics.incr("warnings.archived", moved)
+            if moved:
+                self.warning_indexes.pop(guild.id, None)
+            if moved < self.COMPACTION_BATCH:
+                return now + self.COMPACTION_INTERVAL
+        # More left over; yield to other scheduled actions and continue shortly
+        return now + datetime.timedelta(minutes=1)
+
+    def warning_index(self, guild_id: int):
+        """The guild's per-member warning indexes, or None while they are still being loaded"""
+        indexes = self.warning_indexes.get(guild_id)
+        if indexes is None and guild_id not in self.index_builds:
+            self.index_builds[guild_id] = asyncio.create_task(self._build_warning_index(guild_id))
+        return indexes
+
+    async def _build_warning_index(self, guild_id: int):
+        try:
+            by_member = {}
+            for row in await self.config.get_warning_summaries(guild_id):
+                by_member.setdefault(row['user_id'], []).append(warning_index_entry(row['id'], row['reason']))
+            self.warning_indexes.setdefault(guild_id, {
+                user_id: PrefixIndex.build(entries) for user_id, entries in by_member.items()
+            })
+        finally:
+            self.index_builds.pop(guild_id, None)
+
+    @app_commands.command(name="warnexpiry", description="Set how long warnings keep counting before they are archived")
+    @app_commands.describe(
+        days="Warnings older than this many days stop counting (0 keeps them forever)"
+    )
+    @admin_command()
+    async def warnexpiry(self, interaction: discord.Interaction, days: app_commands.Range[int, 0, 3650]):
+        try:
+            if not await self.config.set_warning_expiry(interaction.guild.id, days):
+                await interaction.response.send_message("Could not save the warning expiry.", ephemeral=True)
+                return
+            key = f"compact_warnings:{interaction.guild.id}"
+            if days:
+                await self.scheduler.schedule(
+                    interaction.guild.id,
+                    'compact_warnings',
+                    datetime.datetime.now(datetime.timezone.utc),
+                    {},
+                    key=key
+                )
+                summary = f"Warnings now expire after {days} days"
+            else:
+                await self.scheduler.cancel(key)
+                summary = "Warnings no longer expire"
+
+            embed = discord.Embed(
+                title="Warning Expiry Updated",
+                description=summary,
+                color=discord.Color.green(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"updated warning expiry: {summary.lower()}",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
     @app_commands.command(name="warn", description="Warn a member")
     @app_commands.describe(
@@ -24,6 +223,9 @@ class Warn(commands.Cog):
             return
 
         try:
+            # The DM, the database write and an escalation (e.g. a tempban) can together take longer than
+            # Discord's 3 second deadline for answering
+            await interaction.response.defer()
             embed = discord.Embed(
                 title="Member Warned",
                 description=f"{member.mention} has been warned by {interaction.user.mention}",
@@ -48,7 +250,7 @@ class Warn(commands.Cog):
                 embed.add_field(name="Note", value="Could not DM user about the warning")
 
             # Add warning to database
-            warning_id = await self.config.add_warning(
+            warning_id, policy = await self.config.add_warning(
                 interaction.guild.id,
                 member.id,
                 interaction.user.id,
@@ -57,7 +259,18 @@ class Warn(commands.Cog):
 
             embed.add_field(name="Warning ID", value=f"#{warning_id}")
 
-            await interaction.response.send_message(embed=embed)
+            indexes = self.warning_indexes.get(interaction.guild.id)
+            if indexes is not None and warning_id is not None:
+                indexes.setdefault(member.id, PrefixIndex()).add(*warning_index_entry(warning_id, reason[:60] if reason else None))
+
+            if policy:
+                try:
+                    outcome = await self.escalate(member, interaction.user, policy)
+                    embed.add_field(name="Escalation", value=outcome, inline=False)
+                except discord.Forbidden:
+                    embed.add_field(name="Escalation", value=f"Could not {policy['action']} member: missing permissions", inline=False)
+
+            await interaction.followup.send(embed=embed)
 
             # Create log embed
             log_embed = discord.Embed(
@@ -74,7 +287,131 @@ class Warn(commands.Cog):
             await self.config.send_log(interaction.guild, log_embed)
 
         except discord.Forbidden:
-            await interaction.response.send_message("I don't have permission to warn that member.", ephemeral=True)
+            await interaction.followup.send("I don't have permission to warn that member.", ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+
+    async def escalate(self, member: discord.Member, moderator: discord.Member, policy) -> str:
+        """Apply the follow-up action of a triggered escalation policy and return a summary of it"""
+        action = policy['action']
+        duration = datetime.timedelta(seconds=policy['duration_seconds']) if policy['duration_seconds'] else None
+        reason = f"Automatic escalation: {policy['threshold']} warnings within {policy['window_days']} days"
+
+        if action == 'timeout':
+            until = datetime.datetime.now(datetime.timezone.utc) + duration
+            await self.bot.get_cog("Timeout").apply_timeout(member, until, reason=reason)
+            outcome = f"Timed out for {format_duration(duration)}"
+        elif action == 'tempban':
+            await self.bot.get_cog("Tempban").apply_tempban(member, moderator.id, duration, reason)
+            outcome = f"Banned for {format_duration(duration)}"
+        elif action == 'kick':
+            await member.kick(reason=reason)
+            outcome = "Kicked"
+        else:
+            await member.ban(reason=reason)
+            outcome = "Banned"
+        outcome = f"{outcome} ({policy['threshold']} warnings within {policy['window_days']} days)"
+        if action != 'tempban':
+            # Tempbans record their own case
+            await self.config.add_case(
+                member.guild.id, action, member.id, moderator.id, reason,
+                {'duration_seconds': policy['duration_seconds']} if duration else None
+            )
+
+        log_embed = discord.Embed(
+            description=f"escalated {member.mention}: {outcome}",
+            color=discord.Color.red(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        await self.config.send_log(member.guild, log_embed)
+        return outcome
+
+    @app_commands.command(name="escalation", description="Set or remove an automatic action for repeated warnings")
+    @app_commands.describe(
+        threshold="Number of warnings that triggers the action",
+        days="Only warnings from the last this many days count",
+        action="What to do when the threshold is reached, or 'off' to remove the policy",
+        duration="How long the timeout or tempban lasts, e.g. 1h or 7d"
+    )
+    @admin_command()
+    async def escalation(
+        self,
+        interaction: discord.Interaction,
+        threshold: app_commands.Range[int, 1, 100],
+        days: app_commands.Range[int, 1, 365],
+        action: Literal['timeout', 'tempban', 'kick', 'ban', 'off'],
+        duration: app_commands.Transform[datetime.timedelta, DurationTransformer(minimum=datetime.timedelta(minutes=1))] = None
+    ):
+        try:
+            if action == 'off':
+                if not await self.config.remove_escalation_policy(interaction.guild.id, threshold, days):
+                    await interaction.response.send_message("There is no policy for that threshold and window.", ephemeral=True)
+                    return
+                summary = f"Removed the policy for {threshold} warnings within {days} days"
+            else:
+                if action in ('timeout', 'tempban') and not duration:
+                    await interaction.response.send_message(f"A duration is required for {action}.", ephemeral=True)
+                    return
+                if action not in ('timeout', 'tempban'):
+                    duration = None
+                if not await self.config.set_escalation_policy(
+                    interaction.guild.id,
+                    threshold,
+                    days,
+                    action,
+                    int(duration.total_seconds()) if duration else None
+                ):
+                    await interaction.response.send_message("Could not save the escalation policy.", ephemeral=True)
+                    return
+                summary = f"{threshold} warnings within {days} days → {action}{f' for {format_duration(duration)}' if duration else ''}"
+
+            embed = discord.Embed(
+                title="Escalation Policy Updated",
+                description=summary,
+                color=discord.Color.green(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"updated escalation policies: {summary}",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(name="escalations", description="List the automatic actions for repeated warnings")
+    @mod_command()
+    async def escalations(self, interaction: discord.Interaction):
+        try:
+            policies = await self.config.get_escalation_policies(interaction.guild.id)
+            embed = discord.Embed(
+                title="Escalation Policies",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            if policies:
+                embed.description = "\n".join(
+                    f"**{policy['threshold']}** warnings within **{policy['window_days']}** days → {policy['action']}"
+                    + (f" for {format_duration(datetime.timedelta(seconds=policy['duration_seconds']))}" if policy['duration_seconds'] else "")
+                    for policy in policies
+                )
+            else:
+                embed.description = "No escalation policies are set. Use `/escalation` to add one."
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
@@ -85,9 +422,9 @@ class Warn(commands.Cog):
     @mod_command()
     async def warns(self, interaction: discord.Interaction, member: discord.Member):
         try:
-            warnings = await self.config.get_warnings(interaction.guild.id, member.id)
+            total = await self.config.count_warnings(interaction.guild.id, member.id)
 
-            if not warnings:
+            if not total:
                 embed = discord.Embed(
                     title=f"Warnings for {member.display_name}",
                     description="This member has no warnings.",
@@ -98,41 +435,25 @@ class Warn(commands.Cog):
                 await interaction.response.send_message(embed=embed)
                 return
 
-            embed = discord.Embed(
-                title=f"Warnings for {member.display_name}",
-                description=f"Total Warnings: {len(warnings)}",
-                color=discord.Color.yellow(),
-                timestamp=datetime.datetime.now(datetime.timezone.utc)
-            )
-            embed.set_thumbnail(url=member.display_avatar.url)
-
-            for warning_id, mod_id, reason, timestamp in warnings:
-                moderator = interaction.guild.get_member(mod_id)
-                mod_name = moderator.mention if moderator else "Unknown Moderator"
-                
-                time_formatted = discord.utils.format_dt(timestamp, style='F')
-                time_relative = discord.utils.format_dt(timestamp, style='R')
-                
-                embed.add_field(
-                    name=f"Warning #{warning_id}",
-                    value=f"**Reason:** {reason}\n**Moderator:** {mod_name}\n**When:** {time_formatted} ({time_relative})",
-                    inline=False
-                )
-
-            await interaction.response.send_message(embed=embed)
+            view = WarningsView(self.config, interaction, member, total)
+            embed = await view.render()
+            await interaction.response.send_message(embed=embed, view=view if view.page_count > 1 else discord.utils.MISSING)
 
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
     @app_commands.command(name="clearwarn", description="Clear a specific warning")
     @app_commands.describe(
-        id="The ID of the warning to clear"
+        id="The ID of the warning to clear",
+        member="Only suggest this member's warnings"
     )
     @mod_command()
-    async def clearwarn(self, interaction: discord.Interaction, id: int):
+    async def clearwarn(self, interaction: discord.Interaction, id: int, member: discord.Member = None):
         try:
             # Remove warning from database
-            if await self.config.remove_warning(interaction.guild.id, id):
+            if await self.config.remove_warning(id, interaction.guild.id):
+                for index in self.warning_indexes.get(interaction.guild.id, {}).values():
+                    index.remove(id)
                 # Send confirmation
                 embed = discord.Embed(
                     title="Warning Cleared",
@@ -159,6 +480,26 @@ class Warn(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
+    @clearwarn.autocomplete('id')
+    async def clearwarn_id_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        # Served from memory; the first call in a guild starts loading the index and suggests nothing yet
+        indexes = self.warning_index(interaction.guild.id)
+        if indexes is None:
+            return []
+
+        member = interaction.namespace.member
+        if member:
+            candidates = [indexes[member.id]] if member.id in indexes else []
+        else:
+            candidates = indexes.values()
+
+        results = []
+        for index in candidates:
+            results.extend(index.search(current.strip(), 25 - len(results)))
+            if len(results) >= 25:
+                break
+        return [app_commands.Choice(name=label[:100], value=warning_id) for warning_id, label in results]
+
     @app_commands.command(name="clearwarns", description="Clear all warnings from a member")
     @app_commands.describe(
         member="The member to clear all warnings from"
@@ -167,7 +508,8 @@ class Warn(commands.Cog):
     async def clearwarns(self, interaction: discord.Interaction, member: discord.Member):
         try:
             # Remove all warnings from database
-            await self.config.remove_all_warnings(interaction.guild.id, member.id)
+            await self.config.clear_warnings(interaction.guild.id, member.id)
+            self.warning_indexes.get(interaction.guild.id, {}).pop(member.id, None)
 
             # Send confirmation
             embed = discord.Embed(
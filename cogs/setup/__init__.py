@@ -8,6 +8,7 @@ async def setup(bot):
     from .events import SetupEvents
     from .setup_info import SetupInfo
     from .anti_invite import AntiInvite
+    from .raid_mode import RaidMode
 
     # Add all cogs to the bot
     await bot.add_cog(LogChannel(bot))
@@ -16,3 +17,4 @@ async def setup(bot):
     await bot.add_cog(SetupEvents(bot))
     await bot.add_cog(SetupInfo(bot))
     await bot.add_cog(AntiInvite(bot))
+    await bot.add_cog(RaidMode(bot))
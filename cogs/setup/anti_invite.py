@@ -4,16 +4,73 @@ from discord.ext import commands
 import datetime
 from utils.config_manager import ConfigManager
 from utils.command_permissions import admin_command
+from utils.cache import TTLCache, MISSING
+from utils.metrics import metrics
 import asyncio
 import re
 
+# Shortener domains cannot be resolved through the API, so their codes are kept as None
+RESOLVABLE_DOMAINS = ('discord.gg', 'discord.com/invite', 'discordapp.com/invite')
+
 class AntiInvite(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = ConfigManager()
-        self.invite_pattern = re.compile(r'(?:https?://)?(?:www\.)?(?:discord\.(?:gg|io|me|li)|discordapp\.com/invite)/[a-zA-Z0-9]+')
+        self.invite_pattern = re.compile(r'(?:https?://)?(?:www\.)?(discord\.(?:gg|io|me|li)|discord(?:app)?\.com/invite)/([a-zA-Z0-9-]+)', re.IGNORECASE)
+        # invite code -> target guild id (None for invalid or unresolvable invites)
+        self.invite_cache = TTLCache(maxsize=4096, ttl=3600)
+        self.pending_lookups = {}
         asyncio.create_task(self.config.init())
 
+    async def _fetch_invite_guild(self, code: str):
+        metrics.incr("invite_cache.api_call")
+        try:
+            invite = await self.bot.fetch_invite(code, with_counts=False, with_expiration=False)
+            guild_id = invite.guild.id if invite.guild else None
+            self.invite_cache.set(code, guild_id)
+        except discord.NotFound:
+            guild_id = None
+            self.invite_cache.set(code, None, ttl=300)
+        except discord.HTTPException:
+            # Not cached, so the next message retries; treat as disallowed meanwhile
+            guild_id = None
+        return guild_id
+
+    async def resolve_invite(self, code: str):
+        """Return the guild id an invite code points to, using at most one API call per code per TTL."""
+        guild_id = self.invite_cache.get(code)
+        if guild_id is not MISSING:
+            metrics.incr("invite_cache.hit")
+            return guild_id
+
+        metrics.incr("invite_cache.miss")
+        # Concurrent lookups of the same code share one request
+        task = self.pending_lookups.get(code)
+        if task is None:
+            task = asyncio.create_task(self._fetch_invite_guild(code))
+            self.pending_lookups[code] = task
+            task.add_done_callback(lambda _: self.pending_lookups.pop(code, None))
+        return await asyncio.shield(task)
+
+    def _cached_targets(self, invites):
+        """Split invites into cached target guild ids and codes that still need an API lookup."""
+        targets, unresolved = [], []
+        for domain, code in invites:
+            if domain.lower() not in RESOLVABLE_DOMAINS:
+                targets.append(None)
+                continue
+            guild_id = self.invite_cache.get(code)
+            if guild_id is MISSING:
+                unresolved.append(code)
+            else:
+                metrics.incr("invite_cache.hit")
+                targets.append(guild_id)
+        return targets, unresolved
+
+    @staticmethod
+    def _is_allowed(guild_id, target_guild_id, allowlist: set) -> bool:
+        return target_guild_id is not None and (target_guild_id == guild_id or target_guild_id in allowlist)
+
     @app_commands.command(name="antiinvite", description="Toggle anti-invite link feature")
     @app_commands.describe(
         enabled="Enable or disable the anti-invite system"
@@ -50,6 +107,60 @@ class AntiInvite(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
+    @app_commands.command(name="allowinvite", description="Allow or disallow invites to another server")
+    @app_commands.describe(
+        server_id="The ID of the server whose invites should be allowed (leave empty to list)",
+        allowed="Whether invites to that server are allowed"
+    )
+    @admin_command()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def allowinvite(self, interaction: discord.Interaction, server_id: str = None, allowed: bool = True):
+        try:
+            if server_id is None:
+                allowlist = await self.config.get_invite_allowlist(interaction.guild.id)
+                servers = "\n".join(f"`{target_id}`" for target_id in sorted(allowlist))
+                embed = discord.Embed(
+                    title="Allowed Invite Targets",
+                    description=f"Invites to this server are always allowed.\n{servers or 'No other servers allowed.'}",
+                    color=discord.Color.blue(),
+                    timestamp=datetime.datetime.now(datetime.timezone.utc)
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            target_id = int(server_id)
+            if allowed:
+                await self.config.add_invite_allow(interaction.guild.id, target_id)
+            elif not await self.config.remove_invite_allow(interaction.guild.id, target_id):
+                await interaction.response.send_message(f"Server `{target_id}` is not on the allowlist.", ephemeral=True)
+                return
+
+            status = "allowed" if allowed else "no longer allowed"
+            embed = discord.Embed(
+                title="Invite Allowlist Updated",
+                description=f"Invites to server `{target_id}` are now **{status}**.",
+                color=discord.Color.green() if allowed else discord.Color.red(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"{'allowed' if allowed else 'disallowed'} invites to server `{target_id}`",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except ValueError:
+            await interaction.response.send_message("Please provide a valid server ID.", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         # Ignore DMs and bot messages
@@ -57,40 +168,63 @@ class AntiInvite(commands.Cog):
             return
 
         try:
-            # Check if anti-invite is enabled
-            if not await self.config.is_anti_invite_enabled(message.guild.id):
+            # Cheap regex check first so ordinary messages never touch the database
+            invites = self.invite_pattern.findall(message.content)
+            if not invites:
                 return
 
             # Check if user has manage messages permission
             if message.author.guild_permissions.manage_messages:
                 return
 
-            # Check for discord invites
-            if self.invite_pattern.search(message.content):
-                # Delete the message
-                await message.delete()
-
-                # Send warning
-                warning = await message.channel.send(
-                    f"{message.author.mention} Discord invites are not allowed in this server!",
-                    delete_after=5
-                )
+            # Check if anti-invite is enabled
+            if not await self.config.is_anti_invite_enabled(message.guild.id):
+                return
 
-                # Log the invite link removal
-                log_embed = discord.Embed(
-                    description=f"Removed invite link from {message.author.mention} in {message.channel.mention}",
-                    color=discord.Color.orange(),
-                    timestamp=datetime.datetime.now(datetime.timezone.utc)
-                )
-                log_embed.set_author(
-                    name=self.bot.user.display_name,
-                    icon_url=self.bot.user.display_avatar.url
-                )
-                log_embed.add_field(name="Message Content", value=message.content[:1024])
-                await self.config.send_log(message.guild, log_embed)
+            allowlist = await self.config.get_invite_allowlist(message.guild.id)
+            targets, unresolved = self._cached_targets(invites)
+            if any(not self._is_allowed(message.guild.id, target, allowlist) for target in targets):
+                await self._remove_invite(message)
+            elif unresolved:
+                # Resolve unknown codes in the background so the listener returns immediately
+                asyncio.create_task(self._check_unresolved(message, unresolved, allowlist))
 
         except Exception as e:
             print(f"Error in anti-invite system: {e}")
 
+    async def _check_unresolved(self, message: discord.Message, codes: list, allowlist: set):
+        try:
+            targets = await asyncio.gather(*(self.resolve_invite(code) for code in set(codes)))
+            if any(not self._is_allowed(message.guild.id, target, allowlist) for target in targets):
+                await self._remove_invite(message)
+        except Exception as e:
+            print(f"Error resolving invites: {e}")
+
+    async def _remove_invite(self, message: discord.Message):
+        # Delete the message
+        try:
+            await message.delete()
+        except discord.NotFound:
+            return
+
+        # Send warning
+        await message.channel.send(
+            f"{message.author.mention} Discord invites are not allowed in this server!",
+            delete_after=5
+        )
+
+        # Log the invite link removal
+        log_embed = discord.Embed(
+            description=f"Removed invite link from {message.author.mention} in {message.channel.mention}",
+            color=discord.Color.orange(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        log_embed.add_field(name="Message Content", value=message.content[:1024])
+        await self.config.send_log(message.guild, log_embed)
+
 async def setup(bot):
     await bot.add_cog(AntiInvite(bot))
@@ -1,16 +1,71 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import datetime
 from utils.config_manager import ConfigManager
 from utils.command_permissions import admin_command
+from utils.role_queue import RoleAssignmentQueue
 import asyncio
 
+HEARTBEAT_KEY = 'auto_role'
+
 class AutoRole(commands.Cog):
+    # Members examined between yields to the event loop during catch-up
+    CATCH_UP_CHUNK = 1000
+
     def __init__(self, bot):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
+        self.role_queue = RoleAssignmentQueue(bot)
+        self.caught_up = False
+
+    def cog_unload(self):
+        self.heartbeat.cancel()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again after reconnects; only catch up once per process
+        if self.caught_up:
+            return
+        self.caught_up = True
+
+        try:
+            last_seen = await self.config.get_heartbeat(HEARTBEAT_KEY)
+            self.heartbeat.start()
+            if last_seen is None:
+                return  # First run, nothing was missed
+
+            for guild_id, role_id in await self.config.get_auto_role_guilds():
+                guild = self.bot.get_guild(guild_id)
+                if guild:
+                    await self.catch_up(guild, role_id, last_seen)
+        except Exception as e:
+            print(f"Error in auto-role catch-up: {e}")
+
+    async def catch_up(self, guild: discord.Guild, role_id: int, since: datetime.datetime) -> int:
+        """Queue the auto-role for members who joined after ``since`` and do not have it yet."""
+        role = guild.get_role(role_id)
+        if not role or role >= guild.me.top_role:
+            return 0
+
+        if not guild.chunked:
+            await guild.chunk()
+
+        queued = 0
+        members = guild.members
+        for start in range(0, len(members), self.CATCH_UP_CHUNK):
+            for member in members[start:start + self.CATCH_UP_CHUNK]:
+                if member.joined_at and member.joined_at > since and role not in member.roles:
+                    self.role_queue.add(member, role, reason="Auto-role catch-up")
+                    queued += 1
+            await asyncio.sleep(0)
+        return queued
+
+    @tasks.loop(minutes=1)
+    async def heartbeat(self):
+        """Record that the bot is online so catch-up knows when it went down"""
+        await self.config.touch_heartbeat(HEARTBEAT_KEY)
 
     @app_commands.command(name="setrole", description="Set the role to be given to new members")
     @app_commands.describe(
@@ -84,16 +139,5 @@ class AutoRole(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        auto_role = await self.config.get_auto_role(member.guild.id)
-        if auto_role and await self.config.is_auto_role_enabled(member.guild.id):
-            try:
-                role = member.guild.get_role(auto_role)
-                if role:
-                    await member.add_roles(role)
-            except discord.Forbidden:
-                pass  # Bot doesn't have permission to add roles
-
 async def setup(bot):
     await bot.add_cog(AutoRole(bot))
@@ -2,6 +2,8 @@ import discord
 from discord.ext import commands
 import datetime
 from utils.config_manager import ConfigManager
+from utils.metrics import metrics
+from utils.welcome_aggregator import WelcomeAggregator
 import asyncio
 
 class SetupEvents(commands.Cog):
@@ -9,40 +11,85 @@ class SetupEvents(commands.Cog):
         self.bot = bot
         self.config = ConfigManager()
         asyncio.create_task(self.config.init())
+        self.welcomes = WelcomeAggregator()
+
+    @staticmethod
+    async def _timed(name: str, coro):
+        with metrics.timer(name):
+            await coro
+
+    @staticmethod
+    def _log_channel_id(config):
+        return config['log_channel_id'] if config['log_enabled'] else None
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        # Handle auto-role
-        auto_role_id = await self.config.get_auto_role(member.guild.id)
-        if auto_role_id:  # get_auto_role now returns None if disabled
-            role = member.guild.get_role(auto_role_id)
-            if role and role < member.guild.me.top_role:
-                try:
-                    await member.add_roles(role)
-                except discord.Forbidden:
-                    pass  # Silently fail if we can't add the role
+        with metrics.timer("join.total"):
+            # One config read serves every stage of the pipeline
+            with metrics.timer("join.config"):
+                config = await self.config.get_guild_config(member.guild.id)
+            if config is None:
+                return
 
-        # Handle welcome message
-        welcome_channel_id = await self.config.get_welcome_channel(member.guild.id)
-        is_welcome_enabled = await self.config.is_welcome_enabled(member.guild.id)
-        if welcome_channel_id and is_welcome_enabled:
-            channel = member.guild.get_channel(welcome_channel_id)
-            if channel:
-                try:
-                    embed = discord.Embed(
-                        title="Welcome!",
-                        description=f"Welcome {member.mention} to {member.guild.name}! 🎉",
-                        color=discord.Color.green(),
-                        timestamp=datetime.datetime.now(datetime.timezone.utc)
-                    )
-                    embed.set_thumbnail(url=member.display_avatar.url)
-                    embed.add_field(name="Account Created", value=discord.utils.format_dt(member.created_at, style='R'))
-                    embed.set_footer(text=f"Member #{len(member.guild.members)}")
-                    await channel.send(embed=embed)
-                except discord.Forbidden:
-                    pass  # Silently fail if we can't send the welcome message
+            raid = self.bot.get_cog("RaidMode")
+            if raid and raid.record_join(member, config):
+                # During a raid, welcomes are merged, per-join logs are suppressed and auto-role waits for the raid to end
+                if config['auto_role_enabled'] and config['auto_role_id']:
+                    raid.defer_auto_role(member)
+                await self._timed("join.welcome", self._send_welcome(member, config, coalesce=True))
+                return
+
+            results = await asyncio.gather(
+                self._timed("join.auto_role", self._assign_auto_role(member, config)),
+                self._timed("join.welcome", self._send_welcome(member, config)),
+                self._timed("join.log", self._log_join(member, config)),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"Error in member join pipeline: {result}")
+
+    async def _assign_auto_role(self, member: discord.Member, config):
+        if not (config['auto_role_enabled'] and config['auto_role_id']):
+            return
+
+        role = member.guild.get_role(config['auto_role_id'])
+        if role and role < member.guild.me.top_role:
+            # The queue paces member updates and retries failures instead of dropping them
+            self.bot.get_cog("AutoRole").role_queue.add(member, role, reason="Auto-role")
+
+    async def _send_welcome(self, member: discord.Member, config, coalesce: bool = False):
+        if not (config['welcome_enabled'] and config['welcome_channel_id']):
+            return
+
+        channel = member.guild.get_channel(config['welcome_channel_id'])
+        if channel:
+            # Above the configured join rate, welcomes are merged into one message per few seconds
+            joins = self.welcomes.record(member.guild.id)
+            threshold = config['welcome_coalesce_rate']
+            if coalesce or self.welcomes.is_batching(member.guild.id) or (threshold and joins > threshold):
+                self.welcomes.add(channel, member)
+                return
+
+            try:
+                embed = discord.Embed(
+                    title="Welcome!",
+                    description=f"Welcome {member.mention} to {member.guild.name}! 🎉",
+                    color=discord.Color.green(),
+                    timestamp=datetime.datetime.now(datetime.timezone.utc)
+                )
+                embed.set_thumbnail(url=member.display_avatar.url)
+                embed.add_field(name="Account Created", value=discord.utils.format_dt(member.created_at, style='R'))
+                embed.set_footer(text=f"Member #{member.guild.member_count}")
+                await channel.send(embed=embed)
+            except discord.Forbidden:
+                pass  # Silently fail if we can't send the welcome message
+
+    async def _log_join(self, member: discord.Member, config):
+        log_channel_id = self._log_channel_id(config)
+        if not log_channel_id:
+            return
 
-        # Log the join
         log_embed = discord.Embed(
             title="Member Joined",
             description=f"{member.mention} joined the server",
@@ -51,15 +98,17 @@ class SetupEvents(commands.Cog):
         )
         log_embed.add_field(name="Account Created", value=discord.utils.format_dt(member.created_at, style='R'))
         log_embed.set_thumbnail(url=member.display_avatar.url)
-        await self.config.send_log(member.guild, log_embed)
+        await self.config.send_log_to(member.guild, log_channel_id, log_embed)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
+        config = await self.config.get_guild_config(member.guild.id)
+        if config is None:
+            return
+
         # Handle leave message
-        welcome_channel_id = await self.config.get_welcome_channel(member.guild.id)
-        is_welcome_enabled = await self.config.is_welcome_enabled(member.guild.id)
-        if welcome_channel_id and is_welcome_enabled:
-            channel = member.guild.get_channel(welcome_channel_id)
+        if config['welcome_enabled'] and config['welcome_channel_id']:
+            channel = member.guild.get_channel(config['welcome_channel_id'])
             if channel:
                 try:
                     embed = discord.Embed(
@@ -71,7 +120,7 @@ class SetupEvents(commands.Cog):
                     embed.set_thumbnail(url=member.display_avatar.url)
                     if member.joined_at:
                         embed.add_field(name="Joined Server", value=discord.utils.format_dt(member.joined_at, style='R'))
-                    embed.set_footer(text=f"Now at {len(member.guild.members)} members")
+                    embed.set_footer(text=f"Now at {member.guild.member_count} members")
                     await channel.send(embed=embed)
                 except discord.Forbidden:
                     pass  # Silently fail if we can't send the leave message
@@ -86,7 +135,7 @@ class SetupEvents(commands.Cog):
         if member.joined_at:
             log_embed.add_field(name="Joined Server", value=discord.utils.format_dt(member.joined_at, style='R'))
         log_embed.set_thumbnail(url=member.display_avatar.url)
-        await self.config.send_log(member.guild, log_embed)
+        await self.config.send_log_to(member.guild, self._log_channel_id(config), log_embed)
 
 async def setup(bot):
     await bot.add_cog(SetupEvents(bot))
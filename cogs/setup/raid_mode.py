@@ -0,0 +1,329 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+import datetime
+import time
+from typing import Literal
+from utils.config_manager import ConfigManager
+from utils.command_permissions import admin_command, mod_command
+from utils.concurrency import run_bounded
+from utils.raid_detector import JoinRateDetector, is_new_account
+import asyncio
+
+class RaidState:
+    def __init__(self, manual: bool = False):
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.last_trigger = time.monotonic()
+        self.manual = manual
+        self.joins = 0
+        self.suspicious = set()  # new accounts that joined during the raid
+        self.deferred_roles = set()  # members waiting for the auto-role
+        self.previous_verification = None
+
+class RaidMode(commands.Cog):
+    # Raid mode ends after this many seconds without the join rate crossing the threshold
+    QUIET_PERIOD = 300
+    # Concurrent kicks/bans during raid clean-up
+    ACTION_CONCURRENCY = 5
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+        self.detector = JoinRateDetector()
+        self.raids = {}
+        self.last_raids = {}
+        self.check_raids.start()
+
+    def cog_unload(self):
+        self.check_raids.cancel()
+
+    def is_raid(self, guild_id: int) -> bool:
+        return guild_id in self.raids
+
+    def record_join(self, member: discord.Member, config) -> bool:
+        """Feed a join into the detector and return whether the guild is in raid mode."""
+        guild_id = member.guild.id
+        state = self.raids.get(guild_id)
+        if not config['raid_detection_enabled']:
+            return state is not None
+
+        new_account = is_new_account(member, config['raid_account_age_days'])
+        joins, new_joins = self.detector.record(guild_id, member.id, config['raid_window_seconds'], new_account)
+        threshold = config['raid_join_threshold']
+        # New accounts are the usual raid signature, so they trip the detector at half the rate
+        triggered = joins >= threshold or new_joins >= max(1, threshold // 2)
+
+        if state is None and triggered:
+            state = RaidState()
+            state.suspicious.update(self.detector.recent_new_accounts(guild_id))
+            self.raids[guild_id] = state
+            asyncio.create_task(self._on_raid_start(member.guild, config, state, joins))
+        if state is None:
+            return False
+
+        state.joins += 1
+        if triggered:
+            state.last_trigger = time.monotonic()
+        if new_account:
+            state.suspicious.add(member.id)
+        return True
+
+    def defer_auto_role(self, member: discord.Member):
+        state = self.raids.get(member.guild.id)
+        if state:
+            state.deferred_roles.add(member.id)
+
+    async def _on_raid_start(self, guild: discord.Guild, config, state: RaidState, joins: int):
+        if config and config['raid_lockdown_enabled'] and guild.verification_level < discord.VerificationLevel.highest:
+            try:
+                state.previous_verification = guild.verification_level
+                await guild.edit(verification_level=discord.VerificationLevel.highest, reason="Raid mode lockdown")
+            except discord.Forbidden:
+                state.previous_verification = None
+
+        log_embed = discord.Embed(
+            title="Raid Mode Enabled",
+            description="Welcome messages are merged, join logs are paused and auto-role is deferred.",
+            color=discord.Color.dark_red(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        if joins:
+            log_embed.add_field(name="Trigger", value=f"{joins} joins in {config['raid_window_seconds']} seconds")
+        if state.previous_verification is not None:
+            log_embed.add_field(name="Lockdown", value="Verification level raised to highest")
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        await self.config.send_log(guild, log_embed)
+
+    async def end_raid(self, guild: discord.Guild):
+        state = self.raids.pop(guild.id, None)
+        if state is None:
+            return
+        self.last_raids[guild.id] = state
+
+        if state.previous_verification is not None:
+            try:
+                await guild.edit(verification_level=state.previous_verification, reason="Raid mode ended")
+            except discord.Forbidden:
+                pass
+
+        # Queue the auto-role for members who joined during the raid and are still here
+        granted = 0
+        auto_role_id = await self.config.get_auto_role(guild.id)
+        role = guild.get_role(auto_role_id) if auto_role_id else None
+        if role and role < guild.me.top_role:
+            role_queue = self.bot.get_cog("AutoRole").role_queue
+            for member_id in state.deferred_roles:
+                member = guild.get_member(member_id)
+                if member and role not in member.roles:
+                    role_queue.add(member, role, reason="Deferred auto-role after raid")
+                    granted += 1
+
+        log_embed = discord.Embed(
+            title="Raid Mode Disabled",
+            color=discord.Color.green(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        log_embed.add_field(name="Started", value=discord.utils.format_dt(state.started_at, style='R'))
+        log_embed.add_field(name="Joins During Raid", value=str(state.joins))
+        log_embed.add_field(name="Suspicious Accounts", value=str(len(state.suspicious)))
+        if granted:
+            log_embed.add_field(name="Deferred Auto-Roles Queued", value=str(granted))
+        log_embed.set_author(
+            name=self.bot.user.display_name,
+            icon_url=self.bot.user.display_avatar.url
+        )
+        await self.config.send_log(guild, log_embed)
+
+    @tasks.loop(seconds=30)
+    async def check_raids(self):
+        """End raid mode in guilds that have been quiet for QUIET_PERIOD seconds"""
+        try:
+            now = time.monotonic()
+            for guild_id, state in list(self.raids.items()):
+                if state.manual or now - state.last_trigger < self.QUIET_PERIOD:
+                    continue
+                guild = self.bot.get_guild(guild_id)
+                if guild:
+                    await self.end_raid(guild)
+                else:
+                    self.raids.pop(guild_id, None)
+
+            # Drop join windows for guilds that have gone quiet
+            for guild_id in list(self.detector.joins):
+                self.detector.rate(guild_id, self.QUIET_PERIOD, now)
+        except Exception as e:
+            print(f"Error in check_raids: {e}")
+
+    @check_raids.before_loop
+    async def before_check_raids(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="raidmode", description="View or manually toggle raid mode")
+    @app_commands.describe(
+        enabled="Turn raid mode on or off (leave empty to view status)"
+    )
+    @mod_command()
+    async def raidmode(self, interaction: discord.Interaction, enabled: bool = None):
+        try:
+            state = self.raids.get(interaction.guild.id)
+            if enabled is None:
+                config = await self.config.get_guild_config(interaction.guild.id)
+                status = f"**Status:** {'🔴 Raid mode active' if state else '🟢 Normal'}\n"
+                if state:
+                    status += f"**Since:** {discord.utils.format_dt(state.started_at, style='R')}\n"
+                    status += f"**Joins:** {state.joins} ({len(state.suspicious)} suspicious)\n"
+                if config:
+                    status += f"**Detection:** {'Enabled' if config['raid_detection_enabled'] else 'Disabled'}\n"
+                    status += f"**Threshold:** {config['raid_join_threshold']} joins in {config['raid_window_seconds']}s\n"
+                    status += f"**New Account Age:** under {config['raid_account_age_days']} days\n"
+                    status += f"**Lockdown:** {'Enabled' if config['raid_lockdown_enabled'] else 'Disabled'}"
+
+                embed = discord.Embed(
+                    title="Raid Mode Status",
+                    description=status,
+                    color=discord.Color.red() if state else discord.Color.blue(),
+                    timestamp=datetime.datetime.now(datetime.timezone.utc)
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+
+            await interaction.response.defer(ephemeral=True)
+            if enabled and not state:
+                config = await self.config.get_guild_config(interaction.guild.id)
+                state = RaidState(manual=True)
+                state.suspicious.update(self.detector.recent_new_accounts(interaction.guild.id))
+                self.raids[interaction.guild.id] = state
+                await self._on_raid_start(interaction.guild, config, state, 0)
+            elif enabled:
+                state.manual = True
+            elif state:
+                await self.end_raid(interaction.guild)
+
+            await interaction.followup.send(f"Raid mode is now **{'on' if enabled else 'off'}**.", ephemeral=True)
+
+        except Exception as e:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(name="raidconfig", description="Configure automatic raid detection")
+    @app_commands.describe(
+        enabled="Enable or disable automatic raid detection",
+        threshold="Joins within the window that trigger raid mode",
+        window="Length of the join window in seconds",
+        account_age="Accounts younger than this many days count as suspicious",
+        lockdown="Raise the verification level while raid mode is active"
+    )
+    @admin_command()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def raidconfig(
+        self,
+        interaction: discord.Interaction,
+        enabled: bool = None,
+        threshold: app_commands.Range[int, 2, 1000] = None,
+        window: app_commands.Range[int, 5, 3600] = None,
+        account_age: app_commands.Range[int, 0, 365] = None,
+        lockdown: bool = None
+    ):
+        try:
+            if not await self.config.set_raid_config(
+                interaction.guild.id,
+                detection_enabled=enabled,
+                join_threshold=threshold,
+                window_seconds=window,
+                account_age_days=account_age,
+                lockdown_enabled=lockdown
+            ):
+                await interaction.response.send_message("Could not save the raid detection settings.", ephemeral=True)
+                return
+
+            embed = discord.Embed(
+                title="Raid Detection Updated",
+                description="Raid detection settings have been saved. Use `/raidmode` to view them.",
+                color=discord.Color.green(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description="updated raid detection settings",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @app_commands.command(name="raidclean", description="Kick or ban the suspicious accounts from the current or last raid")
+    @app_commands.describe(
+        action="Whether to kick or ban the suspicious accounts",
+        reason="Reason recorded in the audit log"
+    )
+    @mod_command()
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def raidclean(self, interaction: discord.Interaction, action: Literal['kick', 'ban'], reason: str = None):
+        try:
+            state = self.raids.get(interaction.guild.id) or self.last_raids.get(interaction.guild.id)
+            if not state or not state.suspicious:
+                await interaction.response.send_message("There are no suspicious accounts from a recent raid.", ephemeral=True)
+                return
+
+            await interaction.response.defer(ephemeral=True)
+            reason_text = reason or "Raid clean-up"
+            guild = interaction.guild
+            members = (guild.get_member(member_id) for member_id in list(state.suspicious))
+            targets = (member for member in members if member and member.top_role < guild.me.top_role)
+
+            if action == 'ban':
+                worker = lambda member: member.ban(reason=reason_text, delete_message_days=1)
+            else:
+                worker = lambda member: member.kick(reason=reason_text)
+            results = await run_bounded(targets, worker, self.ACTION_CONCURRENCY)
+
+            done = [member for member, result in results if not isinstance(result, Exception)]
+            state.suspicious.difference_update(member.id for member in done)
+            verb = "banned" if action == 'ban' else "kicked"
+
+            embed = discord.Embed(
+                title="Raid Clean-up Complete",
+                description=f"{len(done)} suspicious accounts have been {verb}.",
+                color=discord.Color.red(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            failed = len(results) - len(done)
+            if failed:
+                embed.add_field(name="Failed", value=str(failed))
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"{verb} {len(done)} suspicious accounts after a raid",
+                color=discord.Color.red(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            log_embed.add_field(name="Reason", value=reason_text)
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(interaction.guild, log_embed)
+
+        except Exception as e:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(RaidMode(bot))
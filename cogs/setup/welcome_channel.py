@@ -15,20 +15,25 @@ class WelcomeChannel(commands.Cog):
     @app_commands.command(name="setwelcome", description="Set the channel for welcome messages")
     @app_commands.describe(
         channel="The channel to use for welcome messages",
-        enabled="Whether to enable or disable welcome messages"
+        enabled="Whether to enable or disable welcome messages",
+        burst_rate="Joins per minute above which welcomes are merged into one message (0 to never merge)"
     )
     @admin_command()
     @app_commands.checks.has_permissions(manage_guild=True)
-    async def setwelcome(self, interaction: discord.Interaction, channel: discord.TextChannel = None, enabled: bool = None):
+    async def setwelcome(self, interaction: discord.Interaction, channel: discord.TextChannel = None, enabled: bool = None, burst_rate: app_commands.Range[int, 0, 1000] = None):
         try:
-            if channel is None and enabled is None:
+            if channel is None and enabled is None and burst_rate is None:
                 # Check current status
-                current_channel_id = await self.config.get_welcome_channel(interaction.guild.id)
-                is_enabled = await self.config.is_welcome_enabled(interaction.guild.id)
+                config = await self.config.get_guild_config(interaction.guild.id)
+                current_channel_id = config['welcome_channel_id'] if config else None
+                is_enabled = config['welcome_enabled'] if config else False
                 
                 current_channel = interaction.guild.get_channel(current_channel_id) if current_channel_id else None
                 status = f"**Status:** {'🟢 Enabled' if is_enabled else '🔴 Disabled'}\n"
                 status += f"**Channel:** {current_channel.mention if current_channel else 'Not set'}"
+                if config:
+                    rate = config['welcome_coalesce_rate']
+                    status += f"\n**Merge Welcomes:** {f'above {rate} joins/minute' if rate else 'Never'}"
                 
                 embed = discord.Embed(
                     title="Welcome Channel Status",
@@ -74,6 +79,23 @@ class WelcomeChannel(commands.Cog):
                         timestamp=datetime.datetime.now()
                     )
                     await interaction.response.send_message(embed=embed)
+
+            if burst_rate is not None:
+                if not await self.config.set_welcome_coalesce_rate(interaction.guild.id, burst_rate):
+                    message = "Could not save the welcome burst rate."
+                    if interaction.response.is_done():
+                        await interaction.followup.send(message, ephemeral=True)
+                    else:
+                        await interaction.response.send_message(message, ephemeral=True)
+                    return
+                if not channel and enabled is None:
+                    embed = discord.Embed(
+                        title="Welcome Channel Updated",
+                        description=f"Welcome messages will {f'be merged above {burst_rate} joins per minute' if burst_rate else 'never be merged'}!",
+                        color=discord.Color.green(),
+                        timestamp=datetime.datetime.now()
+                    )
+                    await interaction.response.send_message(embed=embed)
             
             # Create log embed
             log_embed = discord.Embed(
@@ -5,8 +5,12 @@ async def setup(bot: commands.Bot):
     from .help import Help
     from .userinfo import UserInfo
     from .guildinfo import GuildInfo
+    from .stats import Stats
+    from .export import Export
 
     # Add all cogs to the bot
     await bot.add_cog(Help(bot))
     await bot.add_cog(UserInfo(bot))
     await bot.add_cog(GuildInfo(bot))
+    await bot.add_cog(Stats(bot))
+    await bot.add_cog(Export(bot))
@@ -0,0 +1,101 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+import os
+from typing import Literal
+from utils.config_manager import ConfigManager
+from utils.command_permissions import admin_command
+from utils.export import ExportWriter
+import asyncio
+
+class Export(commands.Cog):
+    # Discord accepts at most ten attachments per message
+    FILES_PER_MESSAGE = 10
+
+    @classmethod
+    def _batches(cls, parts: list, limit: int) -> list:
+        """Group part indexes into messages whose combined size stays under the upload limit.
+
+        The limit applies to the whole request, and parts are cut close to it,
+        so most messages carry a single part.
+        """
+        batches, batch, batch_bytes = [], [], 0
+        for index, part in enumerate(parts):
+            size = os.fstat(part.fileno()).st_size
+            if batch and (batch_bytes + size >= limit or len(batch) >= cls.FILES_PER_MESSAGE):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(index)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = ConfigManager()
+        asyncio.create_task(self.config.init())
+        # Guilds with an export in progress; one at a time per guild
+        self.running = set()
+
+    @app_commands.command(name="export", description="Export the server's moderation history as compressed files")
+    @app_commands.describe(
+        data="Which history to export",
+        format="File format of the export"
+    )
+    @admin_command()
+    async def export(self, interaction: discord.Interaction, data: Literal['warnings', 'cases', 'tempbans'], format: Literal['csv', 'jsonl'] = 'csv'):
+        guild = interaction.guild
+        if guild.id in self.running:
+            await interaction.response.send_message("An export is already running for this server.", ephemeral=True)
+            return
+
+        self.running.add(guild.id)
+        writer = ExportWriter(format, guild.filesize_limit)
+        try:
+            await interaction.response.defer(ephemeral=True, thinking=True)
+
+            async for record in self.config.iter_export(guild.id, data):
+                await writer.write(record)
+            parts = await writer.close()
+
+            if not writer.rows:
+                await interaction.followup.send(f"There are no {data} to export.", ephemeral=True)
+                return
+
+            stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d-%H%M%S')
+            files = [
+                discord.File(
+                    part,
+                    filename=f"{data}-{guild.id}-{stamp}{f'-part{index + 1}' if len(parts) > 1 else ''}.{format}.gz"
+                )
+                for index, part in enumerate(parts)
+            ]
+            for number, batch in enumerate(self._batches(parts, guild.filesize_limit)):
+                await interaction.followup.send(
+                    f"Exported {writer.rows:,} {data} rows." if number == 0 else None,
+                    files=[files[index] for index in batch],
+                    ephemeral=True
+                )
+
+            # Create log embed
+            log_embed = discord.Embed(
+                description=f"exported {writer.rows:,} {data} rows as {format}",
+                color=discord.Color.blue(),
+                timestamp=datetime.datetime.now(datetime.timezone.utc)
+            )
+            log_embed.set_author(
+                name=interaction.user.display_name,
+                icon_url=interaction.user.display_avatar.url
+            )
+            await self.config.send_log(guild, log_embed)
+
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+        finally:
+            writer.discard()
+            self.running.discard(guild.id)
+
+async def setup(bot):
+    await bot.add_cog(Export(bot))
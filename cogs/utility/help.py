@@ -23,6 +23,10 @@ class Help(commands.Cog):
         `/setwelcome` - Set the welcome channel
         `/setrole` - Set auto-role for new members
         `/antiinvite` - Toggle anti-invite system
+        `/allowinvite` - Allow invites to another server
+        `/raidconfig` - Configure raid detection
+        `/escalation` - Set automatic actions for repeated warnings
+        `/warnexpiry` - Set when warnings expire
         """
         embed.add_field(name="⚙️ Setup Commands", value=setup_cmds.strip(), inline=False)
 
@@ -32,18 +36,34 @@ class Help(commands.Cog):
         `/warns` - View member's warnings
         `/clearwarn` - Clear a specific warning
         `/clearwarns` - Clear all warnings
+        `/escalations` - List warning escalation policies
         `/kick` - Kick a member
         `/ban` - Ban a member
         `/unban` - Unban a user
         `/tempban` - Temporarily ban a member
+        `/massban` - Ban many users by ID
+        `/masskick` - Kick many members by ID
         `/softban` - Ban and unban to clear messages
         `/timeout` - Timeout a member
         `/unmute` - Remove timeout from a member
         `/clear` - Clear messages
+        `/purge` - Delete messages matching filters
+        `/purgeuser` - Delete a user's messages in every channel
         `/slowmode` - Set channel slowmode
+        `/autoslowmode` - Adjust slowmode automatically from the message rate
         `/nickname` - Change member nickname
-        `/lock` - Lock a channel
+        `/dehoist` - Clean hoisted and unreadable names server-wide
+        `/temprole` - Give a member a temporary role
+        `/role all add` - Give a role to every matching member
+        `/role all remove` - Remove a role from every matching member
+        `/lock` - Lock a channel, optionally for a set time
         `/unlock` - Unlock a channel
+        `/lockdown` - Lock every channel in the server or a category
+        `/unlockdown` - Restore the channels locked by /lockdown
+        `/jobs list` - Show background jobs and their progress
+        `/jobs cancel` - Cancel a background job
+        `/raidmode` - View or toggle raid mode
+        `/raidclean` - Kick or ban suspicious raid accounts
         """
         embed.add_field(name="🛡️ Moderation Commands", value=mod_cmds.strip(), inline=False)
 
@@ -52,6 +72,8 @@ class Help(commands.Cog):
         `/help` - Show this help message
         `/userinfo` - Show user information
         `/guildinfo` - Show server information
+        `/stats` - Show bot performance metrics
+        `/export` - Export moderation history as files
         """
         embed.add_field(name="🔍 Utility Commands", value=utility_cmds.strip(), inline=False)
 
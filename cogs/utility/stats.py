@@ -0,0 +1,48 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+from utils.command_permissions import admin_command
+from utils.metrics import metrics
+
+class Stats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="stats", description="Show bot performance metrics")
+    @admin_command()
+    async def stats(self, interaction: discord.Interaction):
+        embed = discord.Embed(
+            title="Bot Metrics",
+            color=discord.Color.blue(),
+            timestamp=datetime.datetime.now()
+        )
+
+        # Invite cache
+        embed.add_field(name="Invite Cache", value=f"""
+        🎯 Hit rate: {metrics.hit_rate('invite_cache'):.1%}
+        ✅ Hits: {metrics.counters['invite_cache.hit']}
+        ❌ Misses: {metrics.counters['invite_cache.miss']}
+        🌐 API calls: {metrics.counters['invite_cache.api_call']}
+        """, inline=True)
+
+        # Role queue
+        embed.add_field(name="Role Queue", value=f"""
+        ✅ Applied: {metrics.counters['role_queue.applied']}
+        ⏭️ Skipped: {metrics.counters['role_queue.skipped']}
+        🔁 Retried: {metrics.counters['role_queue.retried']}
+        ❌ Failed: {metrics.counters['role_queue.failed']}
+        """, inline=True)
+
+        # Timings
+        timings = "\n".join(
+            f"`{name}` {count}× avg {total / count * 1000:.1f}ms max {peak * 1000:.1f}ms"
+            for name, (count, total, peak) in sorted(metrics.timings.items())
+        )
+        if timings:
+            embed.add_field(name="Timings", value=timings[:1024], inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Stats(bot))
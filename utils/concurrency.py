@@ -0,0 +1,21 @@
+import asyncio
+
+
+async def run_bounded(items, worker, limit: int) -> list:
+    """Run ``worker(item)`` for every item with at most ``limit`` calls in flight.
+
+    Items are pulled lazily, so ``items`` may be a generator over a large member list.
+    Returns ``(item, result)`` pairs where result is the exception if the call failed.
+    """
+    iterator = iter(items)
+    results = []
+
+    async def drain():
+        for item in iterator:
+            try:
+                results.append((item, await worker(item)))
+            except Exception as e:
+                results.append((item, e))
+
+    await asyncio.gather(*(drain() for _ in range(max(1, limit))))
+    return results
@@ -6,6 +6,7 @@ import logging
 import sys
 import discord
 import asyncio
+import json
 from typing import Optional
 
 # Configure logging
@@ -86,6 +87,36 @@ class ConfigManager:
                         anti_invite_enabled BOOLEAN DEFAULT false
                     )
                 ''')
+
+                # Add raid protection settings to existing guild_config tables
+                await conn.execute('''
+                    ALTER TABLE guild_config
+                        ADD COLUMN IF NOT EXISTS raid_detection_enabled BOOLEAN DEFAULT false,
+                        ADD COLUMN IF NOT EXISTS raid_join_threshold INTEGER DEFAULT 15,
+                        ADD COLUMN IF NOT EXISTS raid_window_seconds INTEGER DEFAULT 60,
+                        ADD COLUMN IF NOT EXISTS raid_account_age_days INTEGER DEFAULT 7,
+                        ADD COLUMN IF NOT EXISTS raid_lockdown_enabled BOOLEAN DEFAULT false
+                ''')
+                # Raid detection is opt-in; tables that got the column with the old default keep their rows
+                await conn.execute('ALTER TABLE guild_config ALTER COLUMN raid_detection_enabled SET DEFAULT false')
+
+                # Joins per minute above which welcome messages are merged (0 disables merging)
+                await conn.execute('''
+                    ALTER TABLE guild_config
+                        ADD COLUMN IF NOT EXISTS welcome_coalesce_rate INTEGER DEFAULT 10
+                ''')
+
+                # Keep member display names dehoisted and readable as they change
+                await conn.execute('''
+                    ALTER TABLE guild_config
+                        ADD COLUMN IF NOT EXISTS dehoist_enforced BOOLEAN DEFAULT false
+                ''')
+
+                # Warnings older than this many days stop counting and are archived (0 keeps them forever)
+                await conn.execute('''
+                    ALTER TABLE guild_config
+                        ADD COLUMN IF NOT EXISTS warning_expiry_days INTEGER DEFAULT 0
+                ''')
                 
                 # Create warnings table
                 await conn.execute('''
@@ -104,6 +135,29 @@ class ConfigManager:
                     END $$;
                 ''')
                 
+                # Newest-first lookups and keyset pagination of a member's warnings
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS warnings_guild_user_timestamp_idx
+                    ON warnings (guild_id, user_id, timestamp DESC, id DESC)
+                ''')
+                # Oldest-first scan of a guild's warnings for compaction
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS warnings_guild_timestamp_idx
+                    ON warnings (guild_id, timestamp)
+                ''')
+
+                # Create warnings_archive table: expired warnings, kept for history but no longer counted
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS warnings_archive (
+                        id BIGINT PRIMARY KEY,
+                        guild_id BIGINT,
+                        user_id BIGINT,
+                        moderator_id BIGINT,
+                        reason TEXT,
+                        timestamp TIMESTAMP WITH TIME ZONE
+                    )
+                ''')
+                
                 # Create tempbans table
                 await conn.execute('''
                     DO $$ 
@@ -123,6 +177,185 @@ class ConfigManager:
                     END $$;
                 ''')
                 
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS tempbans_active_unban_time_idx
+                    ON tempbans (unban_time) WHERE active
+                ''')
+                
+                # Create scheduled_actions table
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS scheduled_actions (
+                        id BIGSERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        action TEXT NOT NULL,
+                        payload JSONB NOT NULL DEFAULT '{}',
+                        due_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                        idempotency_key TEXT UNIQUE,
+                        attempts INTEGER DEFAULT 0,
+                        last_error TEXT,
+                        completed_at TIMESTAMP WITH TIME ZONE,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                # Lease columns so several bot processes can share the table
+                await conn.execute('''
+                    ALTER TABLE scheduled_actions
+                        ADD COLUMN IF NOT EXISTS claimed_by TEXT,
+                        ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP WITH TIME ZONE
+                ''')
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS scheduled_actions_due_idx
+                    ON scheduled_actions (due_at) WHERE completed_at IS NULL
+                ''')
+
+                # Move tempbans scheduled before the scheduled_actions table existed
+                await conn.execute('''
+                    INSERT INTO scheduled_actions (guild_id, action, payload, due_at, idempotency_key)
+                    SELECT guild_id, 'unban',
+                        json_build_object(
+                            'tempban_id', id, 'user_id', user_id, 'reason', reason,
+                            'banned_at', timestamp, 'unban_time', unban_time
+                        )::jsonb,
+                        unban_time, 'tempban:' || id
+                    FROM tempbans
+                    WHERE active = true
+                    ON CONFLICT (idempotency_key) DO NOTHING
+                ''')
+                
+                # Create bot_state table (process heartbeats and other singletons)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS bot_state (
+                        key TEXT PRIMARY KEY,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Create invite_allowlist table
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS invite_allowlist (
+                        guild_id BIGINT,
+                        target_guild_id BIGINT,
+                        PRIMARY KEY (guild_id, target_guild_id)
+                    )
+                ''')
+
+                # Create warning_counters table: warnings per member per UTC day, kept in step with warnings
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS warning_counters (
+                        guild_id BIGINT,
+                        user_id BIGINT,
+                        day DATE,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (guild_id, user_id, day)
+                    )
+                ''')
+                # Backfill from warnings the first time the table is created
+                await conn.execute('''
+                    INSERT INTO warning_counters (guild_id, user_id, day, count)
+                    SELECT guild_id, user_id, (timestamp AT TIME ZONE 'UTC')::date, COUNT(*)
+                    FROM warnings
+                    WHERE NOT EXISTS (SELECT 1 FROM warning_counters)
+                    GROUP BY 1, 2, 3
+                    ON CONFLICT DO NOTHING
+                ''')
+                
+                # Create escalation_policies table
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS escalation_policies (
+                        guild_id BIGINT,
+                        threshold INTEGER,
+                        window_days INTEGER,
+                        action TEXT NOT NULL,
+                        duration_seconds BIGINT,
+                        PRIMARY KEY (guild_id, threshold, window_days)
+                    )
+                ''')
+
+                # Create cases table: one row per moderation action (or per batch of them)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS cases (
+                        id BIGSERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        action TEXT NOT NULL,
+                        target_id BIGINT,
+                        moderator_id BIGINT,
+                        reason TEXT,
+                        details JSONB,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS cases_guild_id_idx
+                    ON cases (guild_id, id)
+                ''')
+
+                # Create bans table: mirror of each guild's ban list, kept in sync from gateway events
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS bans (
+                        guild_id BIGINT,
+                        user_id BIGINT,
+                        username TEXT,
+                        reason TEXT,
+                        synced_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (guild_id, user_id)
+                    )
+                ''')
+
+                # Create channel_locks table: @everyone overwrites saved when a channel is locked, restored on unlock
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS channel_locks (
+                        guild_id BIGINT,
+                        channel_id BIGINT,
+                        permissions JSONB,
+                        lockdown BOOLEAN DEFAULT false,
+                        locked_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (guild_id, channel_id)
+                    )
+                ''')
+
+                # Create auto_slowmode table: channels whose slowmode follows their message rate
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS auto_slowmode (
+                        guild_id BIGINT,
+                        channel_id BIGINT,
+                        min_delay INTEGER DEFAULT 0,
+                        max_delay INTEGER DEFAULT 30,
+                        threshold REAL DEFAULT 1.0,
+                        PRIMARY KEY (guild_id, channel_id)
+                    )
+                ''')
+
+                # Create jobs table: long-running moderation operations, checkpointed so they resume after a restart
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id BIGSERIAL PRIMARY KEY,
+                        guild_id BIGINT NOT NULL,
+                        kind TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        params JSONB NOT NULL DEFAULT '{}',
+                        state JSONB NOT NULL DEFAULT '{}',
+                        done INTEGER DEFAULT 0,
+                        total INTEGER,
+                        created_by BIGINT,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        finished_at TIMESTAMP WITH TIME ZONE,
+                        cancel_requested BOOLEAN DEFAULT false,
+                        claimed_by TEXT,
+                        claimed_until TIMESTAMP WITH TIME ZONE,
+                        error TEXT
+                    )
+                ''')
+                # Only unfinished jobs are ever polled
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS jobs_active_idx
+                    ON jobs (guild_id, id) WHERE status IN ('pending', 'running')
+                ''')
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS jobs_guild_id_idx
+                    ON jobs (guild_id, id DESC)
+                ''')
+
                 logger.info("Database tables initialized successfully")
 
     async def close(self):
@@ -150,6 +383,20 @@ class ConfigManager:
             logger.error(f"Error ensuring guild exists: {str(e)}")
             return False
 
+    async def get_guild_config(self, guild_id: int):
+        """Fetch the whole guild_config row in one query (None if the guild has no config yet)."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchrow('SELECT * FROM guild_config WHERE guild_id = $1', guild_id)
+        except Exception as e:
+            logger.error(f"Error getting guild config: {str(e)}")
+            return None
+
     # Log Channel Methods
     async def set_log_channel(self, guild_id: int, channel_id: int):
         await self._ensure_guild_exists(guild_id)
@@ -288,6 +535,21 @@ class ConfigManager:
             logger.error(f"Error checking welcome status: {str(e)}")
             return False
 
+    async def set_welcome_coalesce_rate(self, guild_id: int, rate: int) -> bool:
+        await self._ensure_guild_exists(guild_id)
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('UPDATE guild_config SET welcome_coalesce_rate = $2 WHERE guild_id = $1', guild_id, rate)
+            return True
+        except Exception as e:
+            logger.error(f"Error setting welcome coalesce rate: {str(e)}")
+            return False
+
     # Auto Role Methods
     async def set_auto_role(self, guild_id: int, role_id: int):
         await self._ensure_guild_exists(guild_id)
@@ -324,6 +586,24 @@ class ConfigManager:
             logger.error(f"Error getting auto role: {str(e)}")
             return None
 
+    async def get_auto_role_guilds(self) -> list:
+        """Return (guild_id, auto_role_id) for every guild with auto-role enabled."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetch('''
+                    SELECT guild_id, auto_role_id
+                    FROM guild_config
+                    WHERE auto_role_enabled = true AND auto_role_id IS NOT NULL
+                ''')
+        except Exception as e:
+            logger.error(f"Error getting auto role guilds: {str(e)}")
+            return []
+
     async def toggle_auto_role(self, guild_id: int, enabled: bool):
         await self._ensure_guild_exists(guild_id)
         pool = await self.get_pool()
@@ -393,26 +673,137 @@ class ConfigManager:
             logger.error(f"Error checking anti invite status: {str(e)}")
             return False
 
+    async def add_invite_allow(self, guild_id: int, target_guild_id: int) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO invite_allowlist (guild_id, target_guild_id)
+                    VALUES ($1, $2)
+                    ON CONFLICT DO NOTHING
+                ''', guild_id, target_guild_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error adding invite allow rule: {str(e)}")
+            return False
+
+    async def remove_invite_allow(self, guild_id: int, target_guild_id: int) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        try:
+            async with pool.acquire() as conn:
+                result = await conn.execute(
+                    'DELETE FROM invite_allowlist WHERE guild_id = $1 AND target_guild_id = $2',
+                    guild_id, target_guild_id
+                )
+            return result != 'DELETE 0'
+        except Exception as e:
+            logger.error(f"Error removing invite allow rule: {str(e)}")
+            return False
+
+    async def get_invite_allowlist(self, guild_id: int) -> set:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return set()
+
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch('SELECT target_guild_id FROM invite_allowlist WHERE guild_id = $1', guild_id)
+                return {record['target_guild_id'] for record in records}
+        except Exception as e:
+            logger.error(f"Error getting invite allowlist: {str(e)}")
+            return set()
+
+    # Raid protection methods
+    async def set_raid_config(self, guild_id: int, **settings) -> bool:
+        """Update raid settings; keys are guild_config column names without the ``raid_`` prefix."""
+        columns = {
+            'detection_enabled', 'join_threshold', 'window_seconds',
+            'account_age_days', 'lockdown_enabled'
+        }
+        settings = {key: value for key, value in settings.items() if value is not None}
+        if not settings:
+            return True
+        if not settings.keys() <= columns:
+            raise ValueError(f"Unknown raid settings: {', '.join(settings.keys() - columns)}")
+
+        await self._ensure_guild_exists(guild_id)
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        assignments = ", ".join(f"raid_{key} = ${index}" for index, key in enumerate(settings, start=2))
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    f'UPDATE guild_config SET {assignments} WHERE guild_id = $1',
+                    guild_id, *settings.values()
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error setting raid config: {str(e)}")
+            return False
+
     # Warning Methods
-    async def add_warning(self, guild_id: int, user_id: int, moderator_id: int, reason: str) -> int:
+    async def add_warning(self, guild_id: int, user_id: int, moderator_id: int, reason: str) -> tuple:
+        """Store a warning and return (warning_id, escalation policy triggered by it or None).
+
+        The member's daily counter is bumped in the same transaction, and a policy
+        triggers when the warnings within its window reach its threshold.
+        """
         await self._ensure_guild_exists(guild_id)
         pool = await self.get_pool()
         if not pool:
             logger.error("Database pool not available")
-            return None
+            return None, None
             
         try:
+            now = datetime.datetime.now(datetime.timezone.utc)
             async with pool.acquire() as conn:
-                cursor = await conn.execute('''
-                    INSERT INTO warnings (guild_id, user_id, moderator_id, reason, timestamp)
-                    VALUES ($1, $2, $3, $4, $5)
-                ''', guild_id, user_id, moderator_id, reason, datetime.datetime.now(datetime.timezone.utc))
-                return cursor.fetchone()[0]
+                async with conn.transaction():
+                    warning_id = await conn.fetchval('''
+                        INSERT INTO warnings (guild_id, user_id, moderator_id, reason, timestamp)
+                        VALUES ($1, $2, $3, $4, $5)
+                        RETURNING id
+                    ''', guild_id, user_id, moderator_id, reason, now)
+                    await conn.execute('''
+                        INSERT INTO warning_counters (guild_id, user_id, day, count)
+                        VALUES ($1, $2, $3, 1)
+                        ON CONFLICT (guild_id, user_id, day)
+                        DO UPDATE SET count = warning_counters.count + 1
+                    ''', guild_id, user_id, now.date())
+                    # At most one counter row per day of the window is read for each policy
+                    policy = await conn.fetchrow('''
+                        SELECT p.threshold, p.window_days, p.action, p.duration_seconds
+                        FROM escalation_policies p
+                        JOIN guild_config g ON g.guild_id = p.guild_id
+                        CROSS JOIN LATERAL (
+                            SELECT COALESCE(SUM(c.count), 0) AS total
+                            FROM warning_counters c
+                            WHERE c.guild_id = p.guild_id AND c.user_id = $2
+                                -- Expired warnings stop counting even if they are not archived yet
+                                AND c.day > $3::date - LEAST(p.window_days, COALESCE(NULLIF(g.warning_expiry_days, 0), p.window_days))
+                        ) counted
+                        WHERE p.guild_id = $1 AND counted.total = p.threshold
+                        ORDER BY p.threshold DESC
+                        LIMIT 1
+                    ''', guild_id, user_id, now.date())
+                return warning_id, policy
         except Exception as e:
             logger.error(f"Error adding warning: {str(e)}")
-            return None
+            return None, None
 
-    async def get_warnings(self, guild_id: int, user_id: int) -> list:
+    async def get_warning_summaries(self, guild_id: int) -> list:
+        """id, user_id and a reason excerpt for every live warning in a guild, for autocomplete indexes"""
         pool = await self.get_pool()
         if not pool:
             logger.error("Database pool not available")
@@ -421,13 +812,56 @@ class ConfigManager:
         try:
             async with pool.acquire() as conn:
                 return await conn.fetch('''
-                    SELECT id, moderator_id, reason, timestamp
+                    SELECT id, user_id, left(reason, 60) AS reason
                     FROM warnings
+                    WHERE guild_id = $1
+                ''', guild_id)
+        except Exception as e:
+            logger.error(f"Error getting warning summaries: {str(e)}")
+            return []
+
+    async def count_warnings(self, guild_id: int, user_id: int) -> int:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return 0
+            
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchval('''
+                    SELECT COUNT(*) FROM warnings
                     WHERE guild_id = $1 AND user_id = $2
-                    ORDER BY timestamp DESC
                 ''', guild_id, user_id)
         except Exception as e:
-            logger.error(f"Error getting warnings: {str(e)}")
+            logger.error(f"Error counting warnings: {str(e)}")
+            return 0
+
+    async def get_warnings_page(self, guild_id: int, user_id: int, limit: int, before: tuple = None) -> list:
+        """Return up to ``limit`` warnings, newest first, that come after the ``(timestamp, id)`` cursor ``before``"""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+            
+        try:
+            async with pool.acquire() as conn:
+                if before is None:
+                    return await conn.fetch('''
+                        SELECT id, moderator_id, reason, timestamp
+                        FROM warnings
+                        WHERE guild_id = $1 AND user_id = $2
+                        ORDER BY timestamp DESC, id DESC
+                        LIMIT $3
+                    ''', guild_id, user_id, limit)
+                return await conn.fetch('''
+                    SELECT id, moderator_id, reason, timestamp
+                    FROM warnings
+                    WHERE guild_id = $1 AND user_id = $2 AND (timestamp, id) < ($3, $4)
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT $5
+                ''', guild_id, user_id, before[0], before[1], limit)
+        except Exception as e:
+            logger.error(f"Error getting warnings page: {str(e)}")
             return []
 
     async def remove_warning(self, warning_id: int, guild_id: int) -> bool:
@@ -438,7 +872,17 @@ class ConfigManager:
             
         try:
             async with pool.acquire() as conn:
-                await conn.execute('DELETE FROM warnings WHERE id = $1 AND guild_id = $2', warning_id, guild_id)
+                async with conn.transaction():
+                    removed = await conn.fetchrow(
+                        'DELETE FROM warnings WHERE id = $1 AND guild_id = $2 RETURNING user_id, timestamp',
+                        warning_id, guild_id
+                    )
+                    if removed is None:
+                        return False
+                    await conn.execute('''
+                        UPDATE warning_counters SET count = count - 1
+                        WHERE guild_id = $1 AND user_id = $2 AND day = ($3 AT TIME ZONE 'UTC')::date AND count > 0
+                    ''', guild_id, removed['user_id'], removed['timestamp'])
             return True
         except Exception as e:
             logger.error(f"Error removing warning: {str(e)}")
@@ -452,79 +896,906 @@ class ConfigManager:
             
         try:
             async with pool.acquire() as conn:
-                await conn.execute('DELETE FROM warnings WHERE guild_id = $1 AND user_id = $2', guild_id, user_id)
-            return 1
+                async with conn.transaction():
+                    result = await conn.execute('DELETE FROM warnings WHERE guild_id = $1 AND user_id = $2', guild_id, user_id)
+                    await conn.execute('DELETE FROM warning_counters WHERE guild_id = $1 AND user_id = $2', guild_id, user_id)
+            return int(result.split()[-1])
         except Exception as e:
             logger.error(f"Error clearing warnings: {str(e)}")
             return 0
 
-    # Tempban Methods
-    async def add_tempban(self, guild_id: int, user_id: int, moderator_id: int, reason: str, unban_time: datetime.datetime) -> int:
+    async def set_warning_expiry(self, guild_id: int, days: int) -> bool:
+        await self._ensure_guild_exists(guild_id)
         pool = await self.get_pool()
         if not pool:
             logger.error("Database pool not available")
-            return None
+            return False
             
         try:
             async with pool.acquire() as conn:
-                cursor = await conn.execute('''
-                    INSERT INTO tempbans (guild_id, user_id, moderator_id, reason, unban_time, timestamp)
-                    VALUES ($1, $2, $3, $4, $5, $6)
-                ''', guild_id, user_id, moderator_id, reason, unban_time, datetime.datetime.now(datetime.timezone.utc))
-                return cursor.fetchone()[0]
+                await conn.execute('UPDATE guild_config SET warning_expiry_days = $2 WHERE guild_id = $1', guild_id, days)
+            return True
         except Exception as e:
-            logger.error(f"Error adding tempban: {str(e)}")
-            return None
+            logger.error(f"Error setting warning expiry: {str(e)}")
+            return False
 
-    async def get_active_tempbans(self, guild_id: int = None) -> list:
+    async def archive_warnings(self, guild_id: int, before: datetime.datetime, limit: int) -> int:
+        """Move up to ``limit`` of a guild's warnings older than ``before`` to warnings_archive.
+
+        Each call is one short transaction, so compaction never holds locks on
+        the hot table for long. Returns the number of warnings moved.
+        """
         pool = await self.get_pool()
         if not pool:
             logger.error("Database pool not available")
-            return []
+            return 0
             
         try:
             async with pool.acquire() as conn:
-                if guild_id:
-                    query = '''
-                        SELECT guild_id, user_id, moderator_id, reason, unban_time, timestamp 
-                        FROM tempbans 
-                        WHERE guild_id = $1 AND active = true AND unban_time > $2
-                    '''
-                    params = (guild_id, datetime.datetime.now(datetime.timezone.utc))
-                else:
-                    query = '''
-                        SELECT guild_id, user_id, moderator_id, reason, unban_time, timestamp 
-                        FROM tempbans 
-                        WHERE active = true AND unban_time > $1
-                    '''
-                    params = (datetime.datetime.now(datetime.timezone.utc),)
-                
-                return await conn.fetch(query, *params)
+                async with conn.transaction():
+                    # Counted from the DELETE: rows already archived by an earlier, interrupted run
+                    # are skipped by the INSERT but still leave the hot table
+                    moved = await conn.fetchval('''
+                        WITH moved AS (
+                            DELETE FROM warnings
+                            WHERE id IN (
+                                SELECT id FROM warnings
+                                WHERE guild_id = $1 AND timestamp < $2
+                                ORDER BY timestamp
+                                LIMIT $3
+                                FOR UPDATE SKIP LOCKED
+                            )
+                            RETURNING id, guild_id, user_id, moderator_id, reason, timestamp
+                        ), archived AS (
+                            INSERT INTO warnings_archive (id, guild_id, user_id, moderator_id, reason, timestamp)
+                            SELECT id, guild_id, user_id, moderator_id, reason, timestamp FROM moved
+                            ON CONFLICT (id) DO NOTHING
+                        )
+                        SELECT count(*) FROM moved
+                    ''', guild_id, before, limit)
+                    await conn.execute('''
+                        DELETE FROM warning_counters
+                        WHERE guild_id = $1 AND day < ($2 AT TIME ZONE 'UTC')::date
+                    ''', guild_id, before)
+            return moved
         except Exception as e:
-            logger.error(f"Error getting active tempbans: {str(e)}")
-            return []
+            logger.error(f"Error archiving warnings: {str(e)}")
+            return 0
 
-    async def deactivate_tempban(self, guild_id: int, user_id: int) -> bool:
+    # Ban Mirror Methods
+    async def upsert_bans(self, guild_id: int, entries: list, synced_at: datetime.datetime = None) -> bool:
+        """Insert or refresh ``(user_id, username, reason)`` entries in one statement."""
+        if not entries:
+            return True
         pool = await self.get_pool()
         if not pool:
             logger.error("Database pool not available")
             return False
             
         try:
+            user_ids, usernames, reasons = zip(*entries)
             async with pool.acquire() as conn:
-                await conn.execute('UPDATE tempbans SET active = false WHERE guild_id = $1 AND user_id = $2 AND active = true', guild_id, user_id)
+                await conn.execute('''
+                    INSERT INTO bans (guild_id, user_id, username, reason, synced_at)
+                    SELECT $1, entry.user_id, entry.username, entry.reason, $5
+                    FROM unnest($2::bigint[], $3::text[], $4::text[]) AS entry(user_id, username, reason)
+                    ON CONFLICT (guild_id, user_id)
+                    DO UPDATE SET username = EXCLUDED.username, reason = EXCLUDED.reason, synced_at = EXCLUDED.synced_at
+                ''', guild_id, list(user_ids), list(usernames), list(reasons), synced_at or datetime.datetime.now(datetime.timezone.utc))
             return True
         except Exception as e:
-            logger.error(f"Error deactivating tempban: {str(e)}")
+            logger.error(f"Error upserting bans: {str(e)}")
             return False
 
-    # Utility method for sending logs
-    async def send_log(self, guild: discord.Guild, embed: discord.Embed):
-        log_channel_id = await self.get_log_channel(guild.id)
+    async def remove_ban(self, guild_id: int, user_id: int):
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return
+            
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('DELETE FROM bans WHERE guild_id = $1 AND user_id = $2', guild_id, user_id)
+        except Exception as e:
+            logger.error(f"Error removing ban: {str(e)}")
+
+    async def prune_bans(self, guild_id: int, synced_before: datetime.datetime) -> int:
+        """Drop mirror rows a full reconciliation did not see (unbans missed while offline)."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return 0
+            
+        try:
+            async with pool.acquire() as conn:
+                result = await conn.execute(
+                    'DELETE FROM bans WHERE guild_id = $1 AND synced_at < $2',
+                    guild_id, synced_before
+                )
+            return int(result.split()[-1])
+        except Exception as e:
+            logger.error(f"Error pruning bans: {str(e)}")
+            return 0
+
+    async def get_banned_ids(self, guild_id: int) -> set:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return set()
+            
+        try:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch('SELECT user_id FROM bans WHERE guild_id = $1', guild_id)
+            return {row['user_id'] for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting banned ids: {str(e)}")
+            return set()
+
+    async def get_bans(self, guild_id: int) -> list:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+            
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetch('SELECT user_id, username FROM bans WHERE guild_id = $1', guild_id)
+        except Exception as e:
+            logger.error(f"Error getting bans: {str(e)}")
+            return []
+
+    # Channel Lock Methods
+    async def save_channel_locks(self, guild_id: int, snapshots: dict, lockdown: bool = False) -> bool:
+        """Store ``channel_id -> permissions`` snapshots in one statement.
+
+        A channel that already has a snapshot keeps it, so locking twice never
+        overwrites the pre-lock state with the locked one.
+        """
+        if not snapshots:
+            return True
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+            
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO channel_locks (guild_id, channel_id, permissions, lockdown)
+                    SELECT $1, entry.channel_id, entry.permissions::jsonb, $4
+                    FROM unnest($2::bigint[], $3::text[]) AS entry(channel_id, permissions)
+                    ON CONFLICT (guild_id, channel_id) DO NOTHING
+                ''', guild_id, list(snapshots), [json.dumps(permissions) for permissions in snapshots.values()], lockdown)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving channel locks: {str(e)}")
+            return False
+
+    async def get_channel_lock(self, guild_id: int, channel_id: int) -> Optional[dict]:
+        """The saved permissions of a locked channel, or None if it is not locked.
+
+        Database errors are raised, so callers do not mistake them for an unlocked channel.
+        """
+        pool = await self.get_pool()
+        if not pool:
+            raise RuntimeError("Database pool not available")
+
+        try:
+            async with pool.acquire() as conn:
+                permissions = await conn.fetchval(
+                    'SELECT permissions FROM channel_locks WHERE guild_id = $1 AND channel_id = $2',
+                    guild_id, channel_id
+                )
+            return json.loads(permissions) if permissions is not None else None
+        except Exception as e:
+            logger.error(f"Error getting channel lock: {str(e)}")
+            raise
+
+    async def get_channel_locks(self, guild_id: int, lockdown: bool = None) -> dict:
+        """``channel_id -> permissions`` for the guild's locked channels, optionally only lockdown ones."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return {}
+            
+        try:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT channel_id, permissions FROM channel_locks
+                    WHERE guild_id = $1 AND ($2::boolean IS NULL OR lockdown = $2)
+                ''', guild_id, lockdown)
+            return {row['channel_id']: json.loads(row['permissions']) for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting channel locks: {str(e)}")
+            return {}
+
+    async def remove_channel_locks(self, guild_id: int, channel_ids: list) -> bool:
+        if not channel_ids:
+            return True
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+            
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    'DELETE FROM channel_locks WHERE guild_id = $1 AND channel_id = ANY($2::bigint[])',
+                    guild_id, list(channel_ids)
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error removing channel locks: {str(e)}")
+            return False
+
+    # Auto-slowmode Methods
+    async def set_auto_slowmode(self, guild_id: int, channel_id: int, min_delay: int, max_delay: int, threshold: float) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+            
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO auto_slowmode (guild_id, channel_id, min_delay, max_delay, threshold)
+                    VALUES ($1, $2, $3, $4, $5)
+                    ON CONFLICT (guild_id, channel_id)
+                    DO UPDATE SET min_delay = $3, max_delay = $4, threshold = $5
+                ''', guild_id, channel_id, min_delay, max_delay, threshold)
+            return True
+        except Exception as e:
+            logger.error(f"Error setting auto-slowmode: {str(e)}")
+            return False
+
+    async def remove_auto_slowmode(self, guild_id: int, channel_id: int) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+            
+        try:
+            async with pool.acquire() as conn:
+                result = await conn.execute(
+                    'DELETE FROM auto_slowmode WHERE guild_id = $1 AND channel_id = $2',
+                    guild_id, channel_id
+                )
+            return result != 'DELETE 0'
+        except Exception as e:
+            logger.error(f"Error removing auto-slowmode: {str(e)}")
+            return False
+
+    async def get_auto_slowmodes(self) -> list:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+            
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetch('SELECT guild_id, channel_id, min_delay, max_delay, threshold FROM auto_slowmode')
+        except Exception as e:
+            logger.error(f"Error getting auto-slowmode channels: {str(e)}")
+            return []
+
+    # Dehoist Methods
+    async def set_dehoist_enforced(self, guild_id: int, enabled: bool):
+        await self._ensure_guild_exists(guild_id)
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return
+            
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO guild_config (guild_id, dehoist_enforced)
+                    VALUES ($1, $2)
+                    ON CONFLICT (guild_id)
+                    DO UPDATE SET dehoist_enforced = $2
+                ''', guild_id, enabled)
+        except Exception as e:
+            logger.error(f"Error setting dehoist enforcement: {str(e)}")
+
+    async def get_dehoist_guilds(self) -> set:
+        """Return the ids of guilds that enforce dehoisting on name changes."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return set()
+
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch('SELECT guild_id FROM guild_config WHERE dehoist_enforced = true')
+                return {record['guild_id'] for record in records}
+        except Exception as e:
+            logger.error(f"Error getting dehoist guilds: {str(e)}")
+            return set()
+
+    # Case Methods
+    async def add_case(self, guild_id: int, action: str, target_id: Optional[int], moderator_id: Optional[int], reason: str = None, details: dict = None) -> int:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+            
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchval('''
+                    INSERT INTO cases (guild_id, action, target_id, moderator_id, reason, details)
+                    VALUES ($1, $2, $3, $4, $5, $6::jsonb)
+                    RETURNING id
+                ''', guild_id, action, target_id, moderator_id, reason, json.dumps(details) if details is not None else None)
+        except Exception as e:
+            logger.error(f"Error adding case: {str(e)}")
+            return None
+
+    # Export Methods
+    EXPORT_QUERIES = {
+        'warnings': '''
+            SELECT id, user_id, moderator_id, reason, timestamp, false AS archived
+            FROM warnings WHERE guild_id = $1
+            UNION ALL
+            SELECT id, user_id, moderator_id, reason, timestamp, true AS archived
+            FROM warnings_archive WHERE guild_id = $1
+        ''',
+        'cases': '''
+            SELECT id, action, target_id, moderator_id, reason, details::text AS details, created_at
+            FROM cases WHERE guild_id = $1
+            ORDER BY id
+        ''',
+        'tempbans': '''
+            SELECT id, user_id, moderator_id, reason, timestamp, unban_time, active
+            FROM tempbans WHERE guild_id = $1
+            ORDER BY id
+        ''',
+    }
+
+    async def iter_export(self, guild_id: int, kind: str, prefetch: int = 1000):
+        """Yield a guild's ``kind`` rows from a server-side cursor, ``prefetch`` rows per round trip.
+
+        Runs in one read-only snapshot and holds a pool connection until the
+        generator is exhausted or closed. Unlike the other methods, database
+        errors are raised, so a partial export is never mistaken for a complete one.
+        """
+        pool = await self.get_pool()
+        if not pool:
+            raise RuntimeError("Database pool not available")
+
+        async with pool.acquire() as conn:
+            async with conn.transaction(isolation='repeatable_read', readonly=True):
+                async for record in conn.cursor(self.EXPORT_QUERIES[kind], guild_id, prefetch=prefetch):
+                    yield record
+
+    # Escalation Policy Methods
+    async def set_escalation_policy(self, guild_id: int, threshold: int, window_days: int, action: str, duration_seconds: int = None) -> bool:
+        await self._ensure_guild_exists(guild_id)
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+            
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO escalation_policies (guild_id, threshold, window_days, action, duration_seconds)
+                    VALUES ($1, $2, $3, $4, $5)
+                    ON CONFLICT (guild_id, threshold, window_days)
+                    DO UPDATE SET action = $4, duration_seconds = $5
+                ''', guild_id, threshold, window_days, action, duration_seconds)
+            return True
+        except Exception as e:
+            logger.error(f"Error setting escalation policy: {str(e)}")
+            return False
+
+    async def remove_escalation_policy(self, guild_id: int, threshold: int, window_days: int) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+            
+        try:
+            async with pool.acquire() as conn:
+                result = await conn.execute(
+                    'DELETE FROM escalation_policies WHERE guild_id = $1 AND threshold = $2 AND window_days = $3',
+                    guild_id, threshold, window_days
+                )
+            return result != 'DELETE 0'
+        except Exception as e:
+            logger.error(f"Error removing escalation policy: {str(e)}")
+            return False
+
+    async def get_escalation_policies(self, guild_id: int) -> list:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+            
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetch('''
+                    SELECT threshold, window_days, action, duration_seconds
+                    FROM escalation_policies
+                    WHERE guild_id = $1
+                    ORDER BY window_days, threshold
+                ''', guild_id)
+        except Exception as e:
+            logger.error(f"Error getting escalation policies: {str(e)}")
+            return []
+
+    # Tempban Methods
+    async def add_tempban(self, guild_id: int, user_id: int, moderator_id: int, reason: str, unban_time: datetime.datetime) -> int:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+            
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchval('''
+                    INSERT INTO tempbans (guild_id, user_id, moderator_id, reason, unban_time, timestamp)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    RETURNING id
+                ''', guild_id, user_id, moderator_id, reason, unban_time, datetime.datetime.now(datetime.timezone.utc))
+        except Exception as e:
+            logger.error(f"Error adding tempban: {str(e)}")
+            return None
+
+    async def get_active_tempbans(self, guild_id: int = None) -> list:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+            
+        try:
+            async with pool.acquire() as conn:
+                if guild_id:
+                    query = '''
+                        SELECT guild_id, user_id, moderator_id, reason, unban_time, timestamp 
+                        FROM tempbans 
+                        WHERE guild_id = $1 AND active = true AND unban_time > $2
+                    '''
+                    params = (guild_id, datetime.datetime.now(datetime.timezone.utc))
+                else:
+                    query = '''
+                        SELECT guild_id, user_id, moderator_id, reason, unban_time, timestamp 
+                        FROM tempbans 
+                        WHERE active = true AND unban_time > $1
+                    '''
+                    params = (datetime.datetime.now(datetime.timezone.utc),)
+                
+                return await conn.fetch(query, *params)
+        except Exception as e:
+            logger.error(f"Error getting active tempbans: {str(e)}")
+            return []
+
+    async def deactivate_tempbans(self, tempban_ids: list) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('UPDATE tempbans SET active = false WHERE id = ANY($1::bigint[])', tempban_ids)
+            return True
+        except Exception as e:
+            logger.error(f"Error deactivating tempbans: {str(e)}")
+            return False
+
+    async def deactivate_tempban(self, guild_id: int, user_id: int) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+            
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('UPDATE tempbans SET active = false WHERE guild_id = $1 AND user_id = $2 AND active = true', guild_id, user_id)
+            return True
+        except Exception as e:
+            logger.error(f"Error deactivating tempban: {str(e)}")
+            return False
+
+    # Job Methods
+    JOB_COLUMNS = 'id, guild_id, kind, status, params, state, done, total, created_by, created_at, updated_at, finished_at, cancel_requested, error'
+
+    @staticmethod
+    def _job_record(record) -> dict:
+        job = dict(record)
+        job['params'] = json.loads(job['params'])
+        job['state'] = json.loads(job['state'])
+        return job
+
+    async def create_job(self, guild_id: int, kind: str, params: dict, created_by: int = None, total: int = None) -> Optional[dict]:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        try:
+            async with pool.acquire() as conn:
+                record = await conn.fetchrow(f'''
+                    INSERT INTO jobs (guild_id, kind, params, created_by, total)
+                    VALUES ($1, $2, $3::jsonb, $4, $5)
+                    RETURNING {self.JOB_COLUMNS}
+                ''', guild_id, kind, json.dumps(params), created_by, total)
+                return self._job_record(record)
+        except Exception as e:
+            logger.error(f"Error creating job: {str(e)}")
+            return None
+
+    async def get_runnable_jobs(self, shard_ids: list, shard_count: int, per_guild: int, limit: int) -> list:
+        """Oldest unclaimed (or abandoned) jobs for guilds on the given shards, at most ``per_guild`` per guild."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetch('''
+                    SELECT id, guild_id, kind FROM (
+                        SELECT id, guild_id, kind, claimed_until,
+                            ROW_NUMBER() OVER (PARTITION BY guild_id ORDER BY id) AS position
+                        FROM jobs
+                        WHERE status IN ('pending', 'running')
+                          AND (guild_id >> 22) % $2 = ANY($1::bigint[])
+                    ) AS active
+                    WHERE position <= $3 AND (claimed_until IS NULL OR claimed_until < CURRENT_TIMESTAMP)
+                    ORDER BY id
+                    LIMIT $4
+                ''', shard_ids, shard_count, per_guild, limit)
+        except Exception as e:
+            logger.error(f"Error getting runnable jobs: {str(e)}")
+            return []
+
+    async def claim_job(self, job_id: int, instance_id: str, lease: datetime.timedelta) -> Optional[dict]:
+        """Take a job for this process; None if another process holds it or it was cancelled meanwhile."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            async with pool.acquire() as conn:
+                record = await conn.fetchrow(f'''
+                    UPDATE jobs
+                    SET status = 'running', claimed_by = $2, claimed_until = $3, updated_at = $4
+                    WHERE id = $1 AND status IN ('pending', 'running')
+                      AND (claimed_until IS NULL OR claimed_until < $4)
+                    RETURNING {self.JOB_COLUMNS}
+                ''', job_id, instance_id, now + lease, now)
+                return self._job_record(record) if record else None
+        except Exception as e:
+            logger.error(f"Error claiming job: {str(e)}")
+            return None
+
+    async def checkpoint_job(self, job_id: int, instance_id: str, state: dict, done: int, total: Optional[int], lease: datetime.timedelta) -> Optional[bool]:
+        """Save a job's progress and extend its lease; returns whether cancellation was requested.
+
+        Returns None if this process no longer holds the job (its lease was taken
+        over by another process). Database errors are raised, so they are not
+        mistaken for a lost lease.
+        """
+        pool = await self.get_pool()
+        if not pool:
+            raise RuntimeError("Database pool not available")
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchval('''
+                    UPDATE jobs
+                    SET state = $3::jsonb, done = $4, total = $5, claimed_until = $6, updated_at = $7
+                    WHERE id = $1 AND claimed_by = $2
+                    RETURNING cancel_requested
+                ''', job_id, instance_id, json.dumps(state), done, total, now + lease, now)
+        except Exception as e:
+            logger.error(f"Error checkpointing job: {str(e)}")
+            raise
+
+    async def renew_jobs(self, job_ids: list, instance_id: str, lease: datetime.timedelta) -> Optional[dict]:
+        """Extend the leases of this process's running jobs.
+
+        Returns ``job_id -> cancel_requested`` for the jobs this process still
+        holds (a missing id lost its lease), or None if the database failed.
+        """
+        if not job_ids:
+            return {}
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch('''
+                    UPDATE jobs
+                    SET claimed_until = $3
+                    WHERE id = ANY($1::bigint[]) AND claimed_by = $2
+                    RETURNING id, cancel_requested
+                ''', list(job_ids), instance_id, datetime.datetime.now(datetime.timezone.utc) + lease)
+                return {record['id']: record['cancel_requested'] for record in records}
+        except Exception as e:
+            logger.error(f"Error renewing jobs: {str(e)}")
+            return None
+
+    async def finish_job(self, job_id: int, instance_id: str, status: str, state: dict, done: int, error: str = None):
+        """Record a job's outcome, unless another process has taken it over meanwhile."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    UPDATE jobs
+                    SET status = $2, state = $3::jsonb, done = $4, error = $5,
+                        finished_at = $6, updated_at = $6, claimed_by = NULL, claimed_until = NULL
+                    WHERE id = $1 AND claimed_by = $7
+                ''', job_id, status, json.dumps(state), done, error, now, instance_id)
+        except Exception as e:
+            logger.error(f"Error finishing job: {str(e)}")
+
+    async def cancel_job(self, guild_id: int, job_id: int) -> Optional[str]:
+        """Cancel a pending job outright, or ask a running one to stop; returns the job's kind."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchval('''
+                    UPDATE jobs
+                    SET cancel_requested = true,
+                        status = CASE WHEN status = 'pending' THEN 'cancelled' ELSE status END,
+                        finished_at = CASE WHEN status = 'pending' THEN CURRENT_TIMESTAMP END
+                    WHERE guild_id = $1 AND id = $2 AND status IN ('pending', 'running')
+                    RETURNING kind
+                ''', guild_id, job_id)
+        except Exception as e:
+            logger.error(f"Error cancelling job: {str(e)}")
+            return None
+
+    async def get_jobs(self, guild_id: int, active_only: bool = False, kinds: list = None, limit: int = 10) -> list:
+        """The guild's most recent jobs, newest first."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch(f'''
+                    SELECT {self.JOB_COLUMNS} FROM jobs
+                    WHERE guild_id = $1
+                      AND (NOT $2 OR status IN ('pending', 'running'))
+                      AND ($3::text[] IS NULL OR kind = ANY($3::text[]))
+                    ORDER BY id DESC
+                    LIMIT $4
+                ''', guild_id, active_only, kinds, limit)
+                return [self._job_record(record) for record in records]
+        except Exception as e:
+            logger.error(f"Error getting jobs: {str(e)}")
+            return []
+
+    # Scheduled action methods
+    @staticmethod
+    def _action_record(record) -> dict:
+        action = dict(record)
+        action['payload'] = json.loads(action['payload'])
+        return action
+
+    async def schedule_action(self, guild_id: int, action: str, due_at: datetime.datetime, payload: dict, key: str = None) -> Optional[dict]:
+        """Insert a scheduled action; an existing row with the same idempotency key is re-armed instead."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        try:
+            async with pool.acquire() as conn:
+                record = await conn.fetchrow('''
+                    INSERT INTO scheduled_actions (guild_id, action, payload, due_at, idempotency_key)
+                    VALUES ($1, $2, $3::jsonb, $4, $5)
+                    ON CONFLICT (idempotency_key)
+                    DO UPDATE SET payload = $3::jsonb, due_at = $4, attempts = 0,
+                                  last_error = NULL, completed_at = NULL,
+                                  claimed_by = NULL, claimed_until = NULL
+                    RETURNING id, guild_id, action, payload, due_at, attempts
+                ''', guild_id, action, json.dumps(payload), due_at, key)
+                return self._action_record(record)
+        except Exception as e:
+            logger.error(f"Error scheduling action: {str(e)}")
+            return None
+
+    async def cancel_scheduled_action(self, key: str) -> Optional[int]:
+        """Complete a pending action by idempotency key and return its id."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchval('''
+                    UPDATE scheduled_actions
+                    SET completed_at = $2, last_error = 'cancelled'
+                    WHERE idempotency_key = $1 AND completed_at IS NULL
+                    RETURNING id
+                ''', key, datetime.datetime.now(datetime.timezone.utc))
+        except Exception as e:
+            logger.error(f"Error cancelling scheduled action: {str(e)}")
+            return None
+
+    async def get_due_actions(self, before: datetime.datetime, shard_ids: list, shard_count: int) -> list:
+        """Pending actions due before ``before`` for guilds on the given shards, read through the partial due_at index."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch('''
+                    SELECT id, guild_id, action, payload, due_at, attempts
+                    FROM scheduled_actions
+                    WHERE completed_at IS NULL AND due_at <= $1
+                      AND (guild_id >> 22) % $3 = ANY($2::bigint[])
+                    ORDER BY due_at
+                ''', before, shard_ids, shard_count)
+                return [self._action_record(record) for record in records]
+        except Exception as e:
+            logger.error(f"Error getting due actions: {str(e)}")
+            return []
+
+    async def claim_due_actions(self, instance_id: str, shard_ids: list, shard_count: int, limit: int, lease: datetime.timedelta) -> list:
+        """Lease up to ``limit`` due actions for this process.
+
+        SKIP LOCKED lets concurrent claimers pass over each other's rows, and the
+        lease keeps a claimed row away from other processes until it expires, so a
+        crashed process's actions are picked up again later.
+        """
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return []
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch('''
+                    UPDATE scheduled_actions
+                    SET claimed_by = $1, claimed_until = $2
+                    WHERE id IN (
+                        SELECT id FROM scheduled_actions
+                        WHERE completed_at IS NULL AND due_at <= $3
+                          AND (claimed_until IS NULL OR claimed_until < $3)
+                          AND (guild_id >> 22) % $5 = ANY($4::bigint[])
+                        ORDER BY due_at
+                        LIMIT $6
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, guild_id, action, payload, due_at, attempts
+                ''', instance_id, now + lease, now, shard_ids, shard_count, limit)
+                return sorted((self._action_record(record) for record in records), key=lambda action: action['due_at'])
+        except Exception as e:
+            logger.error(f"Error claiming due actions: {str(e)}")
+            return []
+
+    async def complete_action(self, action_id: int, error: str = None) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    UPDATE scheduled_actions
+                    SET completed_at = $2, last_error = $3, claimed_by = NULL, claimed_until = NULL
+                    WHERE id = $1
+                ''', action_id, datetime.datetime.now(datetime.timezone.utc), error)
+            return True
+        except Exception as e:
+            logger.error(f"Error completing scheduled action: {str(e)}")
+            return False
+
+    async def complete_actions(self, action_ids: list) -> bool:
+        """Mark a batch of actions completed in one statement."""
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    UPDATE scheduled_actions
+                    SET completed_at = $2, last_error = NULL, claimed_by = NULL, claimed_until = NULL
+                    WHERE id = ANY($1::bigint[])
+                ''', action_ids, datetime.datetime.now(datetime.timezone.utc))
+            return True
+        except Exception as e:
+            logger.error(f"Error completing scheduled actions: {str(e)}")
+            return False
+
+    async def reschedule_action(self, action_id: int, due_at: datetime.datetime, attempts: int = 0, error: str = None) -> bool:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return False
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    UPDATE scheduled_actions
+                    SET due_at = $2, attempts = $3, last_error = $4, claimed_by = NULL, claimed_until = NULL
+                    WHERE id = $1
+                ''', action_id, due_at, attempts, error)
+            return True
+        except Exception as e:
+            logger.error(f"Error rescheduling action: {str(e)}")
+            return False
+
+    # Bot state methods
+    async def touch_heartbeat(self, key: str):
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO bot_state (key, updated_at)
+                    VALUES ($1, $2)
+                    ON CONFLICT (key)
+                    DO UPDATE SET updated_at = $2
+                ''', key, datetime.datetime.now(datetime.timezone.utc))
+        except Exception as e:
+            logger.error(f"Error updating heartbeat: {str(e)}")
+
+    async def get_heartbeat(self, key: str) -> Optional[datetime.datetime]:
+        pool = await self.get_pool()
+        if not pool:
+            logger.error("Database pool not available")
+            return None
+
+        try:
+            async with pool.acquire() as conn:
+                return await conn.fetchval('SELECT updated_at FROM bot_state WHERE key = $1', key)
+        except Exception as e:
+            logger.error(f"Error getting heartbeat: {str(e)}")
+            return None
+
+    # Utility method for sending logs
+    async def send_log(self, guild: discord.Guild, embed: discord.Embed, file: discord.File = None):
+        log_channel_id = await self.get_log_channel(guild.id)
+        await self.send_log_to(guild, log_channel_id, embed, file)
+
+    async def send_logs(self, guild: discord.Guild, embeds: list):
+        """Send many log embeds with one channel lookup, ten embeds per message."""
+        log_channel_id = await self.get_log_channel(guild.id)
+        channel = guild.get_channel(log_channel_id) if log_channel_id else None
+        if channel:
+            for start in range(0, len(embeds), 10):
+                try:
+                    await channel.send(embeds=embeds[start:start + 10])
+                except discord.Forbidden:
+                    return
+
+    async def send_log_to(self, guild: discord.Guild, log_channel_id: Optional[int], embed: discord.Embed, file: discord.File = None):
+        """Send a log embed, with an optional attachment, to an already looked-up log channel."""
         if log_channel_id:
             channel = guild.get_channel(log_channel_id)
             if channel:
                 try:
-                    await channel.send(embed=embed)
+                    await channel.send(embed=embed, file=file)
                 except discord.Forbidden:
                     pass
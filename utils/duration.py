@@ -0,0 +1,121 @@
+import datetime
+import re
+
+import discord
+from discord import app_commands
+
+UNIT_SECONDS = {
+    'w': 604800,
+    'd': 86400,
+    'h': 3600,
+    'm': 60,
+    's': 1,
+}
+
+# Compiled once at import; each part is a number followed by a unit such as "2d", "3 hours" or "15min"
+_PART = re.compile(
+    r'(\d+)\s*(w(?:eeks?|ks?)?|d(?:ays?)?|h(?:ours?|rs?)?|m(?:inutes?|ins?)?|s(?:econds?|ecs?)?)',
+    re.IGNORECASE
+)
+# Parts are separated by a comma (with optional spaces), spaces, or nothing. Every separator
+# can only match one way, so a near-miss fails in linear time instead of backtracking.
+_COMPOUND = re.compile(rf'{_PART.pattern}(?:(?:\s*,\s*|\s+)?{_PART.pattern})*,?', re.IGNORECASE)
+_ISO8601 = re.compile(
+    r'P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?',
+    re.IGNORECASE
+)
+
+PRESETS = ['10m', '1h', '6h', '1d', '3d', '1w', '4w']
+
+# Longer input is rejected before any regex runs
+MAX_INPUT_LENGTH = 64
+# Checked before building the timedelta, which overflows on absurd values
+MAX_DURATION = datetime.timedelta(days=3650)
+
+
+def _is_number(text: str) -> bool:
+    # str.isdigit() also accepts digits such as "²" that int() rejects
+    return text.isascii() and text.isdigit()
+
+
+def parse_duration(text: str) -> datetime.timedelta:
+    """Parse "1w2d3h", "90m", "2 days 4h", "PT1H30M" or a bare number of minutes.
+
+    Raises ValueError for anything else, including zero-length durations and
+    durations longer than MAX_DURATION.
+    """
+    text = text.strip()
+    if len(text) > MAX_INPUT_LENGTH:
+        raise ValueError(f"Durations can be at most {MAX_INPUT_LENGTH} characters long.")
+    if _is_number(text):
+        seconds = int(text) * 60
+    elif _COMPOUND.fullmatch(text):
+        seconds = sum(int(amount) * UNIT_SECONDS[unit[0].lower()] for amount, unit in _PART.findall(text))
+    else:
+        match = _ISO8601.fullmatch(text)
+        if not match or not any(match.groups()):
+            raise ValueError(f"`{text}` is not a valid duration. Use e.g. 30m, 2h, 1d12h, 1w or PT90M.")
+        weeks, days, hours, minutes, secs = (float(group or 0) for group in match.groups())
+        seconds = weeks * 604800 + days * 86400 + hours * 3600 + minutes * 60 + secs
+
+    if seconds <= 0:
+        raise ValueError("Duration must be longer than zero.")
+    if seconds > MAX_DURATION.total_seconds():
+        raise ValueError(f"Duration can be at most {MAX_DURATION.days // 365} years.")
+    return datetime.timedelta(seconds=seconds)
+
+
+def format_duration(delta: datetime.timedelta) -> str:
+    """Render a timedelta as e.g. "1 week, 2 days, 3 hours"."""
+    remaining = int(delta.total_seconds())
+    parts = []
+    for name, seconds in (('week', 604800), ('day', 86400), ('hour', 3600), ('minute', 60), ('second', 1)):
+        amount, remaining = divmod(remaining, seconds)
+        if amount:
+            parts.append(f"{amount} {name}{'s' if amount != 1 else ''}")
+    return ", ".join(parts) or "0 seconds"
+
+
+class InvalidDuration(app_commands.AppCommandError):
+    """Raised by DurationTransformer; the message is shown to the user."""
+
+
+class DurationTransformer(app_commands.Transformer):
+    """App-command option that accepts a duration string and hands the command a timedelta."""
+
+    def __init__(self, minimum: datetime.timedelta = None, maximum: datetime.timedelta = None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    async def transform(self, interaction: discord.Interaction, value: str) -> datetime.timedelta:
+        try:
+            delta = parse_duration(value)
+        except ValueError as e:
+            raise InvalidDuration(str(e)) from None
+        if self.minimum and delta < self.minimum:
+            raise InvalidDuration(f"Duration must be at least {format_duration(self.minimum)}.")
+        if self.maximum and delta > self.maximum:
+            raise InvalidDuration(f"Duration can be at most {format_duration(self.maximum)}.")
+        return delta
+
+    async def autocomplete(self, interaction: discord.Interaction, value: str) -> list:
+        value = value.strip()
+        if not value:
+            candidates = PRESETS
+        elif _is_number(value):
+            # Offer the typed number in each unit
+            candidates = [f"{value}{unit}" for unit in ('m', 'h', 'd', 'w')]
+        else:
+            candidates = [value]
+
+        choices = []
+        for candidate in candidates:
+            try:
+                delta = await self.transform(interaction, candidate)
+            except InvalidDuration:
+                continue
+            choices.append(app_commands.Choice(name=f"{candidate} ({format_duration(delta)})"[:100], value=candidate))
+        return choices
+
+
+Duration = app_commands.Transform[datetime.timedelta, DurationTransformer(minimum=datetime.timedelta(minutes=1))]
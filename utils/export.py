@@ -0,0 +1,82 @@
+import asyncio
+import csv
+import datetime
+import gzip
+import io
+import json
+import tempfile
+
+
+class ExportWriter:
+    """Streams rows into gzip-compressed CSV or JSONL temp files.
+
+    Rows are encoded into an in-memory chunk that is compressed in a worker
+    thread once it reaches ``CHUNK_BYTES``, so memory use stays flat however
+    many rows are written. When a file gets close to ``max_bytes`` (the upload
+    limit), a new part is started; every part is a complete file on its own.
+    """
+
+    CHUNK_BYTES = 256 * 1024
+    # Headroom for the chunk still being compressed into the current part
+    PART_MARGIN = 512 * 1024
+
+    def __init__(self, fmt: str, max_bytes: int):
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.parts = []
+        self.rows = 0
+        self.columns = None
+        self.buffer = io.StringIO()
+        self.raw = None
+        self.gzip = None
+
+    def _open_part(self):
+        self.raw = tempfile.TemporaryFile()
+        self.gzip = gzip.GzipFile(fileobj=self.raw, mode='wb')
+        self.parts.append(self.raw)
+        if self.fmt == 'csv':
+            csv.writer(self.buffer).writerow(self.columns)
+
+    async def _close_part(self):
+        await self._flush_chunk()
+        await asyncio.to_thread(self.gzip.close)
+        self.raw.seek(0)
+        self.gzip = None
+
+    async def _flush_chunk(self):
+        data = self.buffer.getvalue()
+        if data:
+            self.buffer = io.StringIO()
+            await asyncio.to_thread(self.gzip.write, data.encode('utf-8'))
+
+    async def write(self, record):
+        if self.columns is None:
+            self.columns = list(record.keys())
+        if self.gzip is None:
+            self._open_part()
+
+        if self.fmt == 'csv':
+            csv.writer(self.buffer).writerow(
+                value.isoformat() if isinstance(value, datetime.datetime) else value
+                for value in record.values()
+            )
+        else:
+            self.buffer.write(json.dumps(dict(record), default=str))
+            self.buffer.write('\n')
+        self.rows += 1
+
+        if self.buffer.tell() >= self.CHUNK_BYTES:
+            await self._flush_chunk()
+            if self.raw.tell() >= self.max_bytes - self.PART_MARGIN:
+                await self._close_part()
+
+    async def close(self) -> list:
+        """Finish the current part and return every part file, rewound for reading."""
+        if self.gzip is not None:
+            await self._close_part()
+        return self.parts
+
+    def discard(self):
+        for part in self.parts:
+            part.close()
+        self.parts = []
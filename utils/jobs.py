@@ -0,0 +1,227 @@
+import asyncio
+import datetime
+import logging
+import os
+import socket
+from collections import Counter
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised from ``Job.checkpoint`` once the job has been asked to stop."""
+
+
+class JobLeaseLost(Exception):
+    """Raised from ``Job.checkpoint`` once another process has taken the job over."""
+
+
+class Job:
+    """A claimed ``jobs`` row as seen by its handler.
+
+    Handlers keep whatever they need to resume in ``state`` and call
+    ``checkpoint`` after each unit of work; on restart the handler is called
+    again with the last saved state.
+    """
+
+    def __init__(self, manager: 'JobManager', record: dict, guild):
+        self.manager = manager
+        self.id = record['id']
+        self.kind = record['kind']
+        self.guild = guild
+        self.params = record['params']
+        self.state = record['state']
+        self.done = record['done'] or 0
+        self.total = record['total']
+        self.created_by = record['created_by']
+        # Set on cancellation and on a lost lease, so long waits inside handlers can stop early
+        self.cancelled = asyncio.Event()
+        self.lease_lost = False
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.state)
+
+    def lose_lease(self):
+        self.lease_lost = True
+        self.cancelled.set()
+
+    async def checkpoint(self, done: int = None, total: int = None, **state):
+        """Persist progress, then raise JobLeaseLost or JobCancelled if the job must stop.
+
+        A failed write is logged and skipped; the lease is still renewed by the
+        manager's poll, and the next checkpoint saves the progress.
+        """
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        self.state.update(state)
+        try:
+            cancel_requested = await self.manager.config.checkpoint_job(
+                self.id, self.manager.instance_id, self.state, self.done, self.total, self.manager.LEASE
+            )
+        except Exception as e:
+            logger.error(f"Could not checkpoint job {self.id}: {str(e)}")
+        else:
+            if cancel_requested is None:
+                self.lose_lease()
+            elif cancel_requested:
+                self.cancelled.set()
+        if self.lease_lost:
+            raise JobLeaseLost()
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+
+class JobManager:
+    """Runs persisted ``jobs`` rows on a pool of tasks in the event loop.
+
+    Cogs register a handler per job kind; a handler is called as
+    ``await handler(job)`` and reports progress through ``job.checkpoint``.
+    At most ``WORKERS`` jobs run at once, and at most ``GUILD_CONCURRENCY``
+    per guild, so one guild's long scan cannot hold up everyone else.
+
+    Like the action scheduler, a running job holds a lease that this process
+    renews every poll. A job whose lease ran out (its process died) is picked
+    up again by the next poll, on this or another process, and resumes from
+    its last checkpoint. A process that finds its lease gone stops the job
+    at its next checkpoint and leaves the row to the new owner. Cancellation
+    sets a flag on the row, so it reaches the job on whichever process runs it.
+    """
+
+    WORKERS = 4
+    GUILD_CONCURRENCY = 2
+    POLL_INTERVAL = 10
+    LEASE = datetime.timedelta(minutes=2)
+
+    def __init__(self, bot, config):
+        self.bot = bot
+        self.config = config
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.handlers = {}
+        # job id -> (Job, task) for jobs running in this process
+        self.running = {}
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def register(self, kind: str, handler):
+        self.handlers[kind] = handler
+
+    def unregister(self, kind: str):
+        self.handlers.pop(kind, None)
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+        # Running jobs keep their lease and resume from their checkpoint on the next start
+        for _, task in self.running.values():
+            task.cancel()
+
+    async def submit(self, guild_id: int, kind: str, params: dict, created_by: int = None, total: int = None):
+        """Persist a job and wake the pool; returns the job row (None if it could not be stored)."""
+        record = await self.config.create_job(guild_id, kind, params, created_by, total)
+        if record is not None:
+            self.wakeup.set()
+        return record
+
+    async def cancel(self, guild_id: int, job_id: int):
+        """Cancel a job; returns its kind, or None if there was no such unfinished job."""
+        kind = await self.config.cancel_job(guild_id, job_id)
+        if kind is not None and job_id in self.running:
+            self.running[job_id][0].cancelled.set()
+        return kind
+
+    def _shards(self) -> tuple:
+        """Return (shard ids served by this process, total shard count)."""
+        shard_count = self.bot.shard_count or 1
+        shard_ids = getattr(self.bot, 'shard_ids', None) or [self.bot.shard_id or 0]
+        return list(shard_ids), shard_count
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                self.wakeup.clear()
+                await self._renew()
+                await self._fill()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=self.POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in job manager: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def _renew(self):
+        held = await self.config.renew_jobs(list(self.running), self.instance_id, self.LEASE)
+        if held is None:
+            return
+        for job_id, (job, _) in list(self.running.items()):
+            if job_id not in held:
+                # Another process took the job over; stop without touching its row
+                job.lose_lease()
+            elif held[job_id]:
+                job.cancelled.set()
+
+    async def _fill(self):
+        """Claim runnable jobs until the pool or every guild's share of it is full."""
+        free = self.WORKERS - len(self.running)
+        if free <= 0:
+            return
+
+        per_guild = Counter(job.guild.id for job, _ in self.running.values())
+        candidates = await self.config.get_runnable_jobs(*self._shards(), self.GUILD_CONCURRENCY, self.WORKERS * 4)
+        for candidate in candidates:
+            if free <= 0:
+                break
+            guild = self.bot.get_guild(candidate['guild_id'])
+            if (
+                candidate['id'] in self.running
+                or candidate['kind'] not in self.handlers
+                or guild is None
+                or per_guild[guild.id] >= self.GUILD_CONCURRENCY
+            ):
+                continue
+
+            record = await self.config.claim_job(candidate['id'], self.instance_id, self.LEASE)
+            if record is None:
+                continue
+            job = Job(self, record, guild)
+            self.running[job.id] = (job, asyncio.create_task(self._execute(job)))
+            per_guild[guild.id] += 1
+            free -= 1
+
+    async def _execute(self, job: Job):
+        status, error = 'completed', None
+        try:
+            with metrics.timer(f"jobs.{job.kind}"):
+                await self.handlers[job.kind](job)
+        except JobCancelled:
+            status = 'cancelled'
+        except JobLeaseLost:
+            status = None
+            logger.warning(f"Job {job.id} ({job.kind}) was taken over by another process")
+        except asyncio.CancelledError:
+            # Shutdown or unload: leave the row running so it resumes elsewhere once the lease lapses
+            self.running.pop(job.id, None)
+            raise
+        except Exception as e:
+            status, error = 'failed', str(e)
+            logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+
+        if status is None or job.lease_lost:
+            metrics.incr("jobs.lease_lost")
+        else:
+            metrics.incr(f"jobs.{status}")
+            await self.config.finish_job(job.id, self.instance_id, status, job.state, job.done, error)
+        self.running.pop(job.id, None)
+        # A slot is free again
+        self.wakeup.set()
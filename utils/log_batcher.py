@@ -0,0 +1,21 @@
+import discord
+
+
+class LogBatcher:
+    """Collects log embeds per guild and delivers them together on flush.
+
+    Each guild costs one log-channel lookup per flush and one message per ten
+    embeds (Discord's per-message limit) instead of one of each per event.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.pending = {}
+
+    def add(self, guild: discord.Guild, embed: discord.Embed):
+        self.pending.setdefault(guild.id, (guild, []))[1].append(embed)
+
+    async def flush(self):
+        pending, self.pending = self.pending, {}
+        for guild, embeds in pending.values():
+            await self.config.send_logs(guild, embeds)
@@ -0,0 +1,77 @@
+import math
+import time
+from typing import Optional
+
+# Delays the Discord client offers for slowmode; auto-slowmode steps along these
+SLOWMODE_STEPS = (0, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 21600)
+
+
+class DecayingRate:
+    """Events per second as an exponentially decaying counter.
+
+    Each event adds one to the count, and the count halves every ``half_life``
+    seconds. At a steady rate ``r`` the count settles at ``r / decay``, so the
+    rate is read back as ``count * decay``. Two floats per counter, however busy
+    the channel is, instead of a window of timestamps.
+    """
+
+    __slots__ = ('decay', 'count', 'updated')
+
+    def __init__(self, half_life: float):
+        self.decay = math.log(2) / half_life
+        self.count = 0.0
+        self.updated = time.monotonic()
+
+    def _decayed(self, now: float) -> float:
+        return self.count * math.exp(-self.decay * (now - self.updated))
+
+    def hit(self, now: float = None):
+        now = time.monotonic() if now is None else now
+        self.count = self._decayed(now) + 1
+        self.updated = now
+
+    def rate(self, now: float = None) -> float:
+        now = time.monotonic() if now is None else now
+        return self._decayed(now) * self.decay
+
+
+class SlowmodeController:
+    """Picks a channel's slowmode delay from its message rate, one step at a time.
+
+    The delay goes up a step when the rate is above ``threshold`` and only comes
+    down once it falls below ``threshold * LOWER_RATIO``; in between nothing
+    changes. Raising is allowed every RAISE_COOLDOWN seconds and lowering every
+    LOWER_COOLDOWN, so a channel is edited a few times an hour at most.
+    """
+
+    HALF_LIFE = 20.0
+    LOWER_RATIO = 0.4
+    RAISE_COOLDOWN = 30.0
+    LOWER_COOLDOWN = 300.0
+
+    __slots__ = ('steps', 'threshold', 'rate', 'level', 'last_change', 'busy')
+
+    def __init__(self, minimum: int, maximum: int, threshold: float, current_delay: int = 0):
+        self.steps = sorted({minimum, maximum, *(step for step in SLOWMODE_STEPS if minimum < step < maximum)})
+        self.threshold = threshold
+        self.rate = DecayingRate(self.HALF_LIFE)
+        self.level = 0
+        self.last_change = time.monotonic() - self.LOWER_COOLDOWN
+        # Set while a channel edit is in flight
+        self.busy = False
+        self.sync(current_delay)
+
+    def sync(self, delay: int):
+        """Follow the channel's actual delay, which moderators may have changed by hand."""
+        self.level = max((index for index, step in enumerate(self.steps) if step <= delay), default=0)
+
+    def next_delay(self, now: float = None) -> Optional[int]:
+        """The delay to switch to now, or None to leave the channel alone."""
+        now = time.monotonic() if now is None else now
+        rate = self.rate.rate(now)
+        elapsed = now - self.last_change
+        if rate > self.threshold and self.level < len(self.steps) - 1 and elapsed >= self.RAISE_COOLDOWN:
+            return self.steps[self.level + 1]
+        if rate < self.threshold * self.LOWER_RATIO and self.level > 0 and elapsed >= self.LOWER_COOLDOWN:
+            return self.steps[self.level - 1]
+        return None
@@ -0,0 +1,37 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class Metrics:
+    """In-process counters and timings, shown by the /stats command."""
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.timings = {}
+
+    def incr(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def observe(self, name: str, seconds: float):
+        """Record one duration sample as (count, total, max)."""
+        count, total, peak = self.timings.get(name, (0, 0.0, 0.0))
+        self.timings[name] = (count + 1, total + seconds, max(peak, seconds))
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def hit_rate(self, prefix: str) -> float:
+        """Return hits / (hits + misses) for counters named ``<prefix>.hit`` and ``<prefix>.miss``."""
+        hits = self.counters.get(f"{prefix}.hit", 0)
+        misses = self.counters.get(f"{prefix}.miss", 0)
+        total = hits + misses
+        return hits / total if total else 0.0
+
+
+metrics = Metrics()
@@ -0,0 +1,96 @@
+import re
+import string
+import unicodedata
+
+# Nicknames are limited to 32 characters
+MAX_NICKNAME = 32
+FALLBACK_NICKNAME = "Moderated Nickname"
+
+# Zero-width and formatting characters, and control characters
+STRIPPED_CATEGORIES = {'Cc', 'Cf', 'Co', 'Cs'}
+# Except the joiner and variation selectors that emoji sequences are built from
+KEPT_CHARACTERS = frozenset('\u200d\ufe0e\ufe0f')
+COMBINING_CATEGORIES = {'Mn', 'Me'}
+# Scripts such as Devanagari, Thai, Hebrew and Arabic put a mark or two on a letter;
+# only longer runs (the stacked "zalgo" kind) are trimmed
+MAX_COMBINING = 2
+# ASCII punctuation that sorts above letters in the member list ({, |, } and ~ sort below them)
+HOIST_CHARACTERS = frozenset(char for char in string.punctuation + " " if char < 'a')
+# A closing bracket left behind once its opener is stripped is dropped too
+BRACKETS = {'(': ')', '[': ']', '<': '>'}
+# Styled letters and digits: fullwidth ASCII and the mathematical alphanumerics (bold, script, ...)
+STYLED_RANGES = ((0xFF01, 0xFF5E), (0x1D400, 0x1D7FF))
+WHITESPACE = re.compile(r'\s+')
+
+
+def _fold(char: str) -> str:
+    """Plain form of a styled letter or digit; other characters are left alone."""
+    code = ord(char)
+    if any(low <= code <= high for low, high in STYLED_RANGES):
+        return unicodedata.normalize('NFKC', char)
+    return char
+
+
+def _drop_closer(name: str, opener: str, closer: str) -> str:
+    """Remove the first ``closer`` that has no matching ``opener`` before it."""
+    depth = 0
+    for index, char in enumerate(name):
+        if char == opener:
+            depth += 1
+        elif char == closer:
+            if not depth:
+                return name[:index] + name[index + 1:]
+            depth -= 1
+    return name
+
+
+def normalize_name(name: str) -> str:
+    """Readable, unhoisted form of a display name ('' if nothing readable is left).
+
+    Styled letters (fullwidth, mathematical bold/script, ...) are folded back
+    to plain ones, invisible characters are dropped, combining marks beyond
+    MAX_COMBINING on one character are dropped, and leading punctuation that
+    sorts to the top of the member list is removed along with the closing
+    bracket it leaves behind. Everything else is kept as written, so readable
+    names are not renamed.
+
+    >>> normalize_name("!!!aaa"), normalize_name("𝓑𝓸𝓫"), normalize_name("ｆｕｌｌ"), normalize_name("z̷̢̛a")
+    ('aaa', 'Bob', 'full', 'z̷̢a')
+    >>> normalize_name("(Alex)"), normalize_name("[Mod] Alex"), normalize_name("(Alex (AFK))"), normalize_name("~Bob")
+    ('Alex', 'Mod Alex', 'Alex (AFK)', '~Bob')
+    >>> [normalize_name(name) for name in ("x²", "Ⅻ", "ｶﾀｶﾅ", "Ｘ²")]
+    ['x²', 'Ⅻ', 'ｶﾀｶﾅ', 'X²']
+    >>> [normalize_name(name) for name in ("नमस्ते", "สวัสดี", "שָׁלוֹם", "محمّد", "❤️Bob")]
+    ['नमस्ते', 'สวัสดี', 'שָׁלוֹם', 'محمّد', '❤️Bob']
+    """
+    kept = []
+    marks = 0
+    for char in map(_fold, name or ""):
+        category = unicodedata.category(char)
+        if char in KEPT_CHARACTERS:
+            kept.append(char)
+        elif category in COMBINING_CATEGORIES:
+            marks += 1
+            if marks <= MAX_COMBINING:
+                kept.append(char)
+        elif category not in STRIPPED_CATEGORIES:
+            marks = 0
+            kept.append(char)
+    name = "".join(kept)
+    name = WHITESPACE.sub(" ", name)
+    start = 0
+    while start < len(name) and name[start] in HOIST_CHARACTERS:
+        start += 1
+    stripped, name = name[:start], name[start:]
+    for opener in stripped:
+        if opener in BRACKETS:
+            name = _drop_closer(name, opener, BRACKETS[opener])
+    return WHITESPACE.sub(" ", name)[:MAX_NICKNAME].strip()
+
+
+def dehoisted_nickname(display_name: str, username: str) -> str:
+    """The nickname to give a member, or None if their display name is already clean."""
+    cleaned = normalize_name(display_name)
+    if cleaned == display_name:
+        return None
+    return cleaned or normalize_name(username) or FALLBACK_NICKNAME
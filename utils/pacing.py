@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import discord
+
+
+class Pacer:
+    """Adaptive delay between calls on one rate-limited route.
+
+    discord.py reads the rate-limit headers itself and sleeps inside the request
+    when a bucket runs dry, so a slow call is our signal that the route is
+    saturated. The delay backs off on slow calls and 429s and decays again
+    while calls are fast.
+    """
+
+    MAX_DELAY = 10.0
+    # Calls slower than this were almost certainly held back by the rate limiter
+    SLOW_CALL = 1.0
+
+    def __init__(self):
+        self.delay = 0.0
+
+    async def wait(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    def record(self, elapsed: float):
+        if elapsed > self.SLOW_CALL:
+            self.delay = min(self.MAX_DELAY, max(self.delay * 2, 0.25))
+        else:
+            self.delay = self.delay * 0.8 if self.delay > 0.05 else 0.0
+
+    def backoff(self, retry_after: float):
+        self.delay = min(self.MAX_DELAY, max(self.delay * 2, retry_after, 0.5))
+
+
+def retry_after(error: discord.HTTPException) -> float:
+    """Seconds the API asked us to wait in a failed response, or 0 if it did not say."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After') or headers.get('X-RateLimit-Reset-After') or 0)
+    except ValueError:
+        return 0.0
+
+
+async def call_paced(pacer: Pacer, call, attempts: int = 3):
+    """Await ``call()`` after the pacer's delay, retrying rate limits and server errors.
+
+    Forbidden and NotFound are raised straight away, since retrying cannot fix them.
+    """
+    for attempt in range(1, attempts + 1):
+        await pacer.wait()
+        start = time.monotonic()
+        try:
+            result = await call()
+        except (discord.Forbidden, discord.NotFound):
+            raise
+        except discord.HTTPException as e:
+            wait = retry_after(e)
+            pacer.backoff(wait)
+            if attempt == attempts:
+                raise
+            await asyncio.sleep(wait or 2 ** attempt)
+        else:
+            pacer.record(time.monotonic() - start)
+            return result
@@ -0,0 +1,63 @@
+from bisect import bisect_left, insort
+
+
+class PrefixIndex:
+    """Sorted ``(key, item_id)`` pairs, searched by prefix with bisect.
+
+    An item can be found under several keys (e.g. a user ID and a username).
+    Keys are case-insensitive. Lookups cost O(log n + results); adding or
+    removing an item shifts the underlying list, which stays cheap at the
+    tens-of-thousands scale of ban lists and warning histories.
+    """
+
+    def __init__(self):
+        self.keys = []
+        # item_id -> (label, keys it is indexed under)
+        self.items = {}
+
+    @classmethod
+    def build(cls, entries) -> 'PrefixIndex':
+        """Build from ``(item_id, keys, label)`` entries with one sort instead of repeated inserts."""
+        index = cls()
+        for item_id, keys, label in entries:
+            keys = tuple({key.lower() for key in keys if key})
+            index.items[item_id] = (label, keys)
+            index.keys.extend((key, item_id) for key in keys)
+        index.keys.sort()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self.items
+
+    def add(self, item_id, keys, label: str):
+        self.remove(item_id)
+        keys = tuple({key.lower() for key in keys if key})
+        self.items[item_id] = (label, keys)
+        for key in keys:
+            insort(self.keys, (key, item_id))
+
+    def remove(self, item_id):
+        entry = self.items.pop(item_id, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            position = bisect_left(self.keys, (key, item_id))
+            if position < len(self.keys) and self.keys[position] == (key, item_id):
+                del self.keys[position]
+
+    def search(self, prefix: str, limit: int = 25) -> list:
+        """Return up to ``limit`` ``(item_id, label)`` pairs with a key starting with ``prefix``."""
+        prefix = prefix.lower()
+        results = {}
+        position = bisect_left(self.keys, (prefix,))
+        while position < len(self.keys) and len(results) < limit:
+            key, item_id = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            if item_id not in results:
+                results[item_id] = self.items[item_id][0]
+            position += 1
+        return list(results.items())
@@ -0,0 +1,138 @@
+import asyncio
+import datetime
+import re
+
+import discord
+
+from utils.pacing import Pacer, call_paced
+
+LINK_PATTERN = re.compile(r'https?://|discord(?:\.gg|(?:app)?\.com/invite)/', re.IGNORECASE)
+# Discord snowflakes are 17-20 digits; anything else in the input is ignored
+ID_PATTERN = re.compile(r'\b\d{17,20}\b')
+
+# Bulk delete rejects messages older than 14 days; keep a margin for long scans
+BULK_DELETE_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=10)
+BULK_DELETE_SIZE = 100
+
+
+def extract_ids(text: str) -> list:
+    """Unique user/message IDs (plain or inside mentions) in the order they appear."""
+    return list(dict.fromkeys(int(match) for match in ID_PATTERN.findall(text or "")))
+
+
+class PurgeFilter:
+    """Decides which scanned messages are deleted.
+
+    Author filters (users, bots) match if any of them does; every other
+    filter that is set must match as well. With no filters, everything matches.
+    """
+
+    def __init__(self, user_ids=None, bots: bool = False, links: bool = False, attachments: bool = False, contains: str = None):
+        self.user_ids = set(user_ids or ())
+        self.bots = bots
+        self.links = links
+        self.attachments = attachments
+        self.contains = contains.lower() if contains else None
+
+    def __call__(self, message: discord.Message) -> bool:
+        if self.user_ids or self.bots:
+            if message.author.id not in self.user_ids and not (self.bots and message.author.bot):
+                return False
+        if self.links and not LINK_PATTERN.search(message.content):
+            return False
+        if self.attachments and not message.attachments:
+            return False
+        if self.contains and self.contains not in message.content.lower():
+            return False
+        return True
+
+    def describe(self) -> str:
+        parts = []
+        if self.user_ids:
+            parts.append(f"from {', '.join(f'<@{user_id}>' for user_id in self.user_ids)}")
+        if self.bots:
+            parts.append("from bots")
+        if self.links:
+            parts.append("containing links")
+        if self.attachments:
+            parts.append("with attachments")
+        if self.contains:
+            parts.append(f"containing `{self.contains}`")
+        return ", ".join(parts) or "all messages"
+
+
+class PurgeProgress:
+    def __init__(self):
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+
+
+async def purge_channel(
+    channel,
+    check,
+    limit: int,
+    after: datetime.datetime = None,
+    max_scan: int = None,
+    progress: PurgeProgress = None,
+    cancel: asyncio.Event = None,
+    pacer: Pacer = None,
+    on_deleted=None
+) -> PurgeProgress:
+    """Delete up to ``limit`` messages passing ``check``, newest first.
+
+    History is streamed page by page and never held in full. ``after`` turns
+    into a snowflake bound on the history request, so the scan stops at that
+    time without reading older pages; ``max_scan`` caps how many messages are
+    examined. Matches younger than 14 days are deleted 100 at a time with bulk
+    delete, older ones one by one. Setting ``cancel`` stops after the current
+    chunk. ``await on_deleted(messages)`` is called after each successful delete.
+    """
+    progress = progress or PurgeProgress()
+    pacer = pacer or Pacer()
+    bulk_cutoff = datetime.datetime.now(datetime.timezone.utc) - BULK_DELETE_AGE
+    chunk = []
+    deleted = 0
+
+    async def delete(messages):
+        try:
+            if len(messages) == 1:
+                await call_paced(pacer, messages[0].delete)
+            else:
+                await call_paced(pacer, lambda: channel.delete_messages(messages))
+            progress.deleted += len(messages)
+            if on_deleted:
+                await on_deleted(messages)
+        except discord.NotFound:
+            pass  # Already deleted by someone else
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException:
+            progress.failed += len(messages)
+
+    async for message in channel.history(limit=max_scan, after=after, oldest_first=False):
+        if cancel and cancel.is_set():
+            break
+        progress.scanned += 1
+        if not check(message):
+            continue
+
+        deleted += 1
+        if message.created_at > bulk_cutoff:
+            chunk.append(message)
+            if len(chunk) >= BULK_DELETE_SIZE:
+                await delete(chunk)
+                chunk = []
+        else:
+            # History is newest first, so everything from here on is too old for bulk delete
+            if chunk:
+                await delete(chunk)
+                chunk = []
+            await delete([message])
+
+        if deleted >= limit:
+            break
+
+    if chunk:
+        await delete(chunk)
+    return progress
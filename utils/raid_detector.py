@@ -0,0 +1,46 @@
+import datetime
+import time
+from collections import defaultdict, deque
+
+import discord
+
+
+def is_new_account(member: discord.Member, min_age_days: int) -> bool:
+    """Whether the account was created less than ``min_age_days`` days ago."""
+    return discord.utils.utcnow() - member.created_at < datetime.timedelta(days=min_age_days)
+
+
+class JoinRateDetector:
+    """Per-guild sliding window of join times, tracking new accounts separately."""
+
+    def __init__(self):
+        # guild_id -> deque of (monotonic time, member id, is_new_account)
+        self.joins = defaultdict(deque)
+
+    def record(self, guild_id: int, member_id: int, window: float, new_account: bool, now: float = None) -> tuple:
+        """Record a join and return ``(joins, new_account_joins)`` inside the window."""
+        now = time.monotonic() if now is None else now
+        joins = self.joins[guild_id]
+        joins.append((now, member_id, new_account))
+        self._expire(joins, now - window)
+        return len(joins), sum(1 for _, _, new in joins if new)
+
+    def recent_new_accounts(self, guild_id: int) -> list:
+        """Member ids of new accounts still inside the window."""
+        return [member_id for _, member_id, new in self.joins.get(guild_id, ()) if new]
+
+    def rate(self, guild_id: int, window: float, now: float = None) -> int:
+        """Number of joins inside the window, without recording a new one."""
+        joins = self.joins.get(guild_id)
+        if not joins:
+            return 0
+        now = time.monotonic() if now is None else now
+        self._expire(joins, now - window)
+        if not joins:
+            del self.joins[guild_id]
+        return len(joins)
+
+    @staticmethod
+    def _expire(joins: deque, cutoff: float):
+        while joins and joins[0][0] < cutoff:
+            joins.popleft()
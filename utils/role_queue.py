@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import discord
+
+from utils.metrics import metrics
+from utils.pacing import Pacer, retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class RoleAssignmentQueue:
+    """Per-guild queues of role changes, each drained by one worker.
+
+    Each guild's worker spaces its calls with a Pacer, which adapts to how the
+    member-update route is being rate limited.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.queues = {}
+        self.pending = set()
+        self.workers = {}
+        self.pacers = {}
+
+    def add(self, member: discord.Member, role: discord.Role, reason: str = None):
+        self._enqueue(member.guild.id, member.id, role.id, True, reason)
+
+    def remove(self, member: discord.Member, role: discord.Role, reason: str = None):
+        self._enqueue(member.guild.id, member.id, role.id, False, reason)
+
+    def queued(self, guild_id: int) -> int:
+        return len(self.queues.get(guild_id, ()))
+
+    def _enqueue(self, guild_id: int, member_id: int, role_id: int, add: bool, reason: str):
+        key = (guild_id, member_id, role_id, add)
+        if key in self.pending:
+            return
+        self.pending.add(key)
+        self.queues.setdefault(guild_id, deque()).append((key, reason))
+
+        if guild_id not in self.workers:
+            self.workers[guild_id] = asyncio.create_task(self._worker(guild_id))
+
+    async def _worker(self, guild_id: int):
+        queue = self.queues[guild_id]
+        pacer = self.pacers.setdefault(guild_id, Pacer())
+        try:
+            while queue:
+                key, reason = queue.popleft()
+                self.pending.discard(key)
+                await self._apply(key, reason, pacer)
+                await pacer.wait()
+        finally:
+            self.workers.pop(guild_id, None)
+            if not queue:
+                self.queues.pop(guild_id, None)
+                self.pacers.pop(guild_id, None)
+
+    async def _apply(self, key: tuple, reason: str, pacer: Pacer):
+        guild_id, member_id, role_id, add = key
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild else None
+        role = guild.get_role(role_id) if guild else None
+        # Skip members who left, deleted roles and changes that are already in place
+        if not member or not role or (role in member.roles) == add:
+            metrics.incr("role_queue.skipped")
+            return
+
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            start = time.monotonic()
+            try:
+                if add:
+                    await member.add_roles(role, reason=reason)
+                else:
+                    await member.remove_roles(role, reason=reason)
+                pacer.record(time.monotonic() - start)
+                metrics.incr("role_queue.applied")
+                return
+            except (discord.Forbidden, discord.NotFound) as e:
+                metrics.incr("role_queue.failed")
+                logger.warning(f"Cannot {'add' if add else 'remove'} role {role_id} for {member_id} in {guild_id}: {e}")
+                return
+            except discord.HTTPException as e:
+                wait = retry_after(e)
+                pacer.backoff(wait)
+                if attempt == self.MAX_ATTEMPTS:
+                    metrics.incr("role_queue.failed")
+                    logger.error(f"Giving up on role {role_id} for {member_id} in {guild_id}: {e}")
+                    return
+                metrics.incr("role_queue.retried")
+                await asyncio.sleep(wait or 2 ** attempt)
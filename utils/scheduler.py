@@ -0,0 +1,230 @@
+import asyncio
+import datetime
+import heapq
+import logging
+import os
+import socket
+from collections import defaultdict
+
+from utils.log_batcher import LogBatcher
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ActionScheduler:
+    """Runs persisted ``scheduled_actions`` rows at their due time.
+
+    Cogs register a handler per action name; a handler is called as
+    ``await handler(guild, payload)`` and may return a datetime to run the same
+    action again at that time. Rows are only completed after the handler
+    succeeds, so execution is at-least-once and handlers must tolerate repeats.
+
+    Only actions due within ``HORIZON`` are kept in the in-memory heap, and
+    only for guilds on this process's shards. The window is refilled by an
+    indexed due-time scan every half horizon, which also acts as a safety net
+    for anything scheduled by another process. The heap only decides when to
+    wake up: due rows are then leased with ``FOR UPDATE SKIP LOCKED``, so
+    several processes can run side by side without executing a row twice.
+
+    Each claimed batch runs in parallel across guilds (at most ``CONCURRENCY``
+    handlers at once) but in due order within a guild. Completions, flush hooks
+    and log embeds queued on ``self.logs`` are written once per batch.
+    """
+
+    HORIZON = datetime.timedelta(hours=1)
+    MAX_ATTEMPTS = 5
+    CLAIM_BATCH = 100
+    CONCURRENCY = 10
+    # How long a claimed row stays reserved for this process
+    LEASE = datetime.timedelta(minutes=5)
+
+    def __init__(self, bot, config):
+        self.bot = bot
+        self.config = config
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.handlers = {}
+        # Min-heap of (due_at, action_id); actions maps id -> row for entries still pending
+        self.heap = []
+        self.actions = {}
+        self.in_flight = set()
+        self.horizon_end = None
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.completed = []
+        self.flush_hooks = []
+        self.logs = LogBatcher(config)
+
+    def register(self, action: str, handler):
+        self.handlers[action] = handler
+
+    def unregister(self, action: str):
+        self.handlers.pop(action, None)
+
+    def add_flush_hook(self, hook):
+        """Register ``await hook()`` to run after every batch, for handlers that buffer their own writes."""
+        self.flush_hooks.append(hook)
+
+    def remove_flush_hook(self, hook):
+        if hook in self.flush_hooks:
+            self.flush_hooks.remove(hook)
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    async def schedule(self, guild_id: int, action: str, due_at: datetime.datetime, payload: dict, key: str = None):
+        """Persist an action and return its id (None if it could not be stored)."""
+        record = await self.config.schedule_action(guild_id, action, due_at, payload, key)
+        if record is None:
+            return None
+        self._push(record)
+        return record['id']
+
+    async def cancel(self, key: str) -> bool:
+        action_id = await self.config.cancel_scheduled_action(key)
+        if action_id is None:
+            return False
+        self.actions.pop(action_id, None)
+        return True
+
+    def _push(self, record: dict):
+        if record['id'] in self.in_flight:
+            return
+        if self.horizon_end is None or record['due_at'] > self.horizon_end:
+            # Picked up by a later scan; drop any copy armed for an earlier time
+            self.actions.pop(record['id'], None)
+            return
+        self.actions[record['id']] = record
+        heapq.heappush(self.heap, (record['due_at'], record['id']))
+        if self.heap[0][1] == record['id']:
+            self.wakeup.set()
+
+    def _shards(self) -> tuple:
+        """Return (shard ids served by this process, total shard count)."""
+        shard_count = self.bot.shard_count or 1
+        shard_ids = getattr(self.bot, 'shard_ids', None) or [self.bot.shard_id or 0]
+        return list(shard_ids), shard_count
+
+    async def refresh(self):
+        """Reload every action due within the horizon."""
+        horizon_end = datetime.datetime.now(datetime.timezone.utc) + self.HORIZON
+        records = await self.config.get_due_actions(horizon_end, *self._shards())
+        self.horizon_end = horizon_end
+        self.actions = {record['id']: record for record in records if record['id'] not in self.in_flight}
+        self.heap = [(record['due_at'], record['id']) for record in self.actions.values()]
+        heapq.heapify(self.heap)
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                self.wakeup.clear()
+                now = datetime.datetime.now(datetime.timezone.utc)
+                next_scan = self.horizon_end - self.HORIZON / 2 if self.horizon_end else now
+                if now >= next_scan:
+                    await self.refresh()
+                    next_scan = self.horizon_end - self.HORIZON / 2
+
+                due = False
+                while self.heap and self.heap[0][0] <= now:
+                    due_at, action_id = heapq.heappop(self.heap)
+                    record = self.actions.get(action_id)
+                    # Skip entries that were cancelled or re-armed with a different due time
+                    if record is None or record['due_at'] != due_at:
+                        continue
+                    del self.actions[action_id]
+                    due = True
+                if due:
+                    await self._drain()
+
+                deadline = min(self.heap[0][0], next_scan) if self.heap else next_scan
+                timeout = max(0.0, (deadline - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in action scheduler: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def _drain(self):
+        """Claim and run due actions in batches until none are left for this process."""
+        shard_ids, shard_count = self._shards()
+        while True:
+            records = await self.config.claim_due_actions(
+                self.instance_id, shard_ids, shard_count, self.CLAIM_BATCH, self.LEASE
+            )
+            # Records arrive in due order, so each guild's list keeps that order
+            by_guild = defaultdict(list)
+            for record in records:
+                self.actions.pop(record['id'], None)
+                by_guild[record['guild_id']].append(record)
+
+            semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+            async def run_guild(guild_records):
+                for record in guild_records:
+                    async with semaphore:
+                        await self._execute(record)
+
+            await asyncio.gather(*(run_guild(guild_records) for guild_records in by_guild.values()))
+            await self._flush()
+            if len(records) < self.CLAIM_BATCH:
+                break
+
+    async def _flush(self):
+        completed, self.completed = self.completed, []
+        if completed:
+            await self.config.complete_actions(completed)
+        for hook in list(self.flush_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"Error in scheduler flush hook: {str(e)}")
+        await self.logs.flush()
+
+    async def _execute(self, record: dict):
+        action_id = record['id']
+        handler = self.handlers.get(record['action'])
+        guild = self.bot.get_guild(record['guild_id'])
+
+        self.in_flight.add(action_id)
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for '{record['action']}'")
+            if guild is None:
+                raise RuntimeError(f"Guild {record['guild_id']} is not available")
+
+            with metrics.timer(f"scheduler.{record['action']}"):
+                next_run = await handler(guild, record['payload'])
+            if isinstance(next_run, datetime.datetime):
+                await self.config.reschedule_action(action_id, next_run)
+                record.update(due_at=next_run, attempts=0)
+                self.in_flight.discard(action_id)
+                self._push(record)
+            else:
+                # Written together with the rest of the batch in _flush
+                self.completed.append(action_id)
+            metrics.incr("scheduler.completed")
+
+        except Exception as e:
+            attempts = record['attempts'] + 1
+            metrics.incr("scheduler.failed")
+            logger.error(f"Scheduled action {action_id} ({record['action']}) failed, attempt {attempts}: {str(e)}")
+            if attempts >= self.MAX_ATTEMPTS:
+                await self.config.complete_action(action_id, error=str(e))
+            else:
+                # Exponential backoff: 1, 2, 4, 8 minutes
+                retry_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=2 ** (attempts - 1))
+                await self.config.reschedule_action(action_id, retry_at, attempts, str(e))
+                record.update(due_at=retry_at, attempts=attempts)
+                self.in_flight.discard(action_id)
+                self._push(record)
+        finally:
+            self.in_flight.discard(action_id)
@@ -0,0 +1,141 @@
+import asyncio
+import gzip
+import html
+import json
+import tempfile
+
+import discord
+
+HTML_HEADER = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; background: #313338; color: #dbdee1; margin: 2em; }}
+.message {{ margin: 0 0 1em; }}
+.meta {{ color: #949ba4; font-size: 0.85em; }}
+.author {{ color: #f2f3f5; font-weight: bold; }}
+.content {{ white-space: pre-wrap; }}
+a {{ color: #00a8fc; }}
+</style></head><body>
+<h1>{title}</h1>
+"""
+HTML_FOOTER = "</body></html>\n"
+
+
+class TranscriptWriter:
+    """Writes deleted messages to gzip-compressed JSONL or HTML temp files as they go.
+
+    Each batch is encoded and compressed straight away, so memory use does not
+    grow with the size of the purge. Once a file gets close to ``max_bytes``
+    (the upload limit) writing moves on to a new part; after ``MAX_PARTS``
+    parts further messages are only counted in ``unrecorded``.
+    """
+
+    # zlib holds back some output, so stop well before the limit
+    MARGIN = 1024 * 1024
+    # Each part is a separate upload in the log channel
+    MAX_PARTS = 5
+
+    def __init__(self, fmt: str, title: str, max_bytes: int):
+        self.fmt = fmt
+        self.title = title
+        self.max_bytes = max_bytes
+        self.messages = 0
+        # Messages deleted after the last part filled up
+        self.unrecorded = 0
+        self.full = False
+        # Temp files of the finished parts, and the attachments made from them by ``close``
+        self.parts = []
+        self.files = []
+        # Concurrent purges (one per channel) share the writer
+        self.lock = asyncio.Lock()
+        self._open_part()
+
+    def _open_part(self):
+        self.raw = tempfile.TemporaryFile()
+        self.gzip = gzip.GzipFile(fileobj=self.raw, mode='wb')
+        self.part_messages = 0
+        if self.fmt == 'html':
+            title = self.title if not self.parts else f"{self.title} (part {len(self.parts) + 1})"
+            self.gzip.write(HTML_HEADER.format(title=html.escape(title)).encode('utf-8'))
+
+    def _finish_part(self):
+        if self.fmt == 'html':
+            self.gzip.write(HTML_FOOTER.encode('utf-8'))
+        self.gzip.close()
+        if self.part_messages:
+            self.parts.append(self.raw)
+        else:
+            self.raw.close()
+
+    def _encode(self, message: discord.Message) -> str:
+        attachments = [attachment.url for attachment in message.attachments]
+        if self.fmt == 'jsonl':
+            return json.dumps({
+                'id': message.id,
+                'channel_id': message.channel.id,
+                'author_id': message.author.id,
+                'author': str(message.author),
+                'created_at': message.created_at.isoformat(),
+                'content': message.content,
+                'attachments': attachments
+            }) + "\n"
+
+        links = "".join(
+            f'<div><a href="{html.escape(url)}">{html.escape(url.rsplit("/", 1)[-1])}</a></div>'
+            for url in attachments
+        )
+        return (
+            '<div class="message">'
+            f'<div class="meta"><span class="author">{html.escape(str(message.author))}</span> '
+            f'({message.author.id}) in #{html.escape(getattr(message.channel, "name", str(message.channel.id)))} '
+            f'at {message.created_at.strftime("%Y-%m-%d %H:%M:%S UTC")}</div>'
+            f'<div class="content">{html.escape(message.content)}</div>{links}</div>\n'
+        )
+
+    async def write(self, messages: list):
+        async with self.lock:
+            if self.full:
+                self.unrecorded += len(messages)
+                return
+            data = "".join(self._encode(message) for message in messages).encode('utf-8')
+            await asyncio.to_thread(self.gzip.write, data)
+            self.messages += len(messages)
+            self.part_messages += len(messages)
+            if self.raw.tell() >= self.max_bytes - self.MARGIN:
+                await asyncio.to_thread(self._finish_part)
+                if len(self.parts) < self.MAX_PARTS:
+                    self._open_part()
+                else:
+                    self.full = True
+
+    @property
+    def truncated(self) -> bool:
+        return self.unrecorded > 0
+
+    def discard(self):
+        """Close every temp file; the attachments from ``close`` are unreadable afterwards."""
+        self.full = True
+        if not self.gzip.closed:
+            self.gzip.close()
+        self.raw.close()
+        # discord.File swaps out the file's close() for a no-op; this puts it back
+        for file in self.files:
+            file.close()
+        self.files = []
+        for raw in self.parts:
+            raw.close()
+        self.parts = []
+
+    async def close(self, filename: str) -> list:
+        """Finish the transcript and return its parts as attachments (empty if nothing was written)."""
+        async with self.lock:
+            if not self.full:
+                await asyncio.to_thread(self._finish_part)
+                self.full = True
+            files = []
+            for number, raw in enumerate(self.parts, start=1):
+                raw.seek(0)
+                name = filename if len(self.parts) == 1 else f"{filename}-part{number}"
+                files.append(discord.File(raw, filename=f"{name}.{self.fmt}.gz"))
+            self.files = files
+            return files
@@ -0,0 +1,85 @@
+import asyncio
+import datetime
+import time
+from collections import defaultdict, deque
+
+import discord
+
+
+class WelcomeBatch:
+    # Members named in the message; the rest are summarised as "and N others"
+    MAX_MENTIONS = 10
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.mentions = []
+        self.count = 0
+
+    def add(self, member: discord.Member):
+        if len(self.mentions) < self.MAX_MENTIONS:
+            self.mentions.append(member.mention)
+        self.count += 1
+
+    def describe(self) -> str:
+        others = self.count - len(self.mentions)
+        if others:
+            names = f"{', '.join(self.mentions)} and {others} other{'s' if others != 1 else ''}"
+        elif len(self.mentions) > 1:
+            names = f"{', '.join(self.mentions[:-1])} and {self.mentions[-1]}"
+        else:
+            names = self.mentions[0]
+        return f"Welcome {names}"
+
+
+class WelcomeAggregator:
+    """Merges welcome messages into one per ``flush_delay`` seconds while joins arrive in bursts."""
+
+    WINDOW = 60.0
+
+    def __init__(self, flush_delay: float = 5.0):
+        self.flush_delay = flush_delay
+        self.joins = defaultdict(deque)
+        self.pending = {}
+        self.last_sweep = time.monotonic()
+
+    def record(self, guild_id: int) -> int:
+        """Record a join and return the number of joins in the last minute."""
+        now = time.monotonic()
+        joins = self.joins[guild_id]
+        joins.append(now)
+        while joins[0] < now - self.WINDOW:
+            joins.popleft()
+        # Once a window, drop the guilds that have had no joins since the last one
+        if now - self.last_sweep >= self.WINDOW:
+            self.last_sweep = now
+            for quiet_id in [key for key, times in self.joins.items() if times[-1] < now - self.WINDOW]:
+                del self.joins[quiet_id]
+        return len(joins)
+
+    def is_batching(self, guild_id: int) -> bool:
+        return guild_id in self.pending
+
+    def add(self, channel: discord.abc.Messageable, member: discord.Member):
+        batch = self.pending.get(member.guild.id)
+        if batch is None:
+            batch = self.pending[member.guild.id] = WelcomeBatch(channel)
+            asyncio.create_task(self._flush_later(member.guild))
+        batch.add(member)
+
+    async def _flush_later(self, guild: discord.Guild):
+        await asyncio.sleep(self.flush_delay)
+        batch = self.pending.pop(guild.id, None)
+        if not batch:
+            return
+
+        embed = discord.Embed(
+            title="Welcome!",
+            description=f"{batch.describe()} to {guild.name}! 🎉",
+            color=discord.Color.green(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc)
+        )
+        embed.set_footer(text=f"Now at {guild.member_count} members")
+        try:
+            await batch.channel.send(embed=embed)
+        except discord.HTTPException:
+            pass  # Silently fail if we can't send the welcome message